@@ -1,16 +1,18 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 import os
 
 
 class Settings(BaseSettings):
     # OpenAI Configuration
-    openai_api_key: str
+    openai_api_key: Optional[str] = None  # required only once enrichment runs
     openai_model: str = "gpt-4o-mini"
+    openai_base_url: Optional[str] = None  # OpenAI-compatible endpoint (proxy, local stand-in)
     
     # Firebase Configuration
     firebase_project_id: Optional[str] = None
     firebase_credentials_path: str = "./firebase-credentials.json"
+    firestore_emulator_host: Optional[str] = None  # e.g. localhost:8080; uses the emulator instead of credentials
     
     # Application Settings
     environment: str = "development"
@@ -22,10 +24,130 @@ class Settings(BaseSettings):
     default_location: str = "Tucson, AZ"
     default_radius_miles: int = 50
     scraping_delay_seconds: int = 2
+    keep_raw_html: bool = False  # retain listing card HTML on RawListing (debugging only)
+    
+    # Ingestion Jobs
+    ingestion_max_concurrent_jobs: int = 2
+    ingestion_max_queued_jobs: int = 20
+    ingestion_job_history: int = 100  # finished jobs kept in memory for status lookups
+    ingestion_job_persist_interval_seconds: float = 5.0
+    
+    # Distributed Ingestion
+    ingestion_backend: str = "local"  # "local": run in the API process; "queue": enqueue for ingest-worker processes
+    work_queue_url: str = "sqlite:///./work_queue.sqlite3"  # or redis://host:6379/0
+    work_queue_page_size: int = 25
+    work_queue_lease_seconds: int = 120
+    work_queue_max_attempts: int = 3
+    work_queue_retry_delay_seconds: int = 30
+    worker_concurrency: int = 4
+    worker_poll_interval_seconds: float = 2.0
+    
+    # Scheduled Ingestion (one recurring crawl per source x region shard)
+    scheduler_enabled: bool = False
+    scheduler_regions: List[str] = ["Tucson, AZ"]
+    scheduler_sources: List[str] = ["cars.com"]
+    scheduler_interval_minutes: int = 360
+    scheduler_source_interval_minutes: Dict[str, int] = {}  # per-source override, keyed by source value
+    scheduler_source_concurrency: Dict[str, int] = {}  # concurrent shards per source (default 1)
+    scheduler_jitter_seconds: int = 300
+    scheduler_misfire_grace_seconds: int = 3600
+    scheduler_max_listings: int = 50
+    scheduler_jobstore_path: str = "./scheduler_jobs.sqlite3"
+    
+    # Geocoding
+    geocode_cache_path: str = "./geocode_cache.sqlite3"
+    geocode_cache_ttl_seconds: int = 30 * 24 * 3600
+    geocode_negative_ttl_seconds: int = 24 * 3600
+    geocode_offline_only: bool = False
+    
+    # Geo Queries
+    geohash_precision: int = 9
+    geo_max_cover_cells: int = 64  # finer covers scan less area outside the query
+    geo_scan_page_size: int = 1000
+    geo_default_window_days: int = 30  # date window of geo queries without start_date
+    geo_max_window_days: int = 90  # longer geo query windows are rejected before any read
+    geo_scan_concurrency: int = 8  # geohash ranges scanned in parallel per query
+    
+    # Logging (see utils/logger.py)
+    log_format: str = "text"  # or "json": one structured record per line
+    log_file: Optional[str] = "consumer_intent_detector.log"  # empty disables the file
+    log_queue_size: int = 10000  # records waiting for the writer thread; overflow is dropped
+    log_sample_rates: Dict[str, float] = {  # share of per-listing event records kept
+        "listing.normalized": 0.01,
+        "listing.enrich": 0.1,
+        "listing.enriched": 0.1
+    }
+    log_event_rate_limit: int = 20  # records per second per event; 0 disables
+    
+    # Observability
+    metrics_enabled: bool = True  # GET /metrics; PROMETHEUS_MULTIPROC_DIR aggregates multiple workers
+    
+    # Admin API (X-Admin-Key header); unset disables /api/v1/admin and profiling headers
+    admin_api_key: Optional[str] = None
+    
+    # Profiling (opt-in; see utils/profiling.py)
+    profiling_enabled: bool = False
+    profiling_dir: str = "./profiles"
+    profiling_kinds: List[str] = ["cpu"]  # for X-Profile: 1, sampled requests and profiled jobs
+    profiling_request_sample_rate: float = 0.0
+    profiling_ingestion_jobs: bool = False  # profile every ingestion job / worker task
+    profiling_interval_ms: float = 1.0
+    profiling_memory_top_lines: int = 30
+    profiling_max_files: int = 200
     
     # Rate Limiting
     max_requests_per_minute: int = 10
     
+    # Intent Read Cache
+    cache_enabled: bool = True
+    cache_intent_ttl_seconds: int = 300
+    cache_query_ttl_seconds: int = 15
+    cache_max_entries: int = 10000
+    cache_max_bytes: int = 64 * 1024 * 1024
+    cache_redis_url: Optional[str] = None
+    
+    # Lead Ranking (sort=score; see services/ranking.py)
+    ranking_weights: Dict[str, float] = {
+        "confidence": 0.35,
+        "urgency": 0.25,
+        "freshness": 0.2,
+        "contact": 0.1,
+        "budget_fit": 0.05,
+        "deal": 0.05  # listing priced low for its market segment
+    }
+    ranking_freshness_half_life_hours: float = 72.0
+    ranking_max_age_days: float = 30.0  # older intents are not ranked
+    ranking_refresh_seconds: float = 30.0  # pick up intents saved by other processes; 0 disables
+    ranking_refresh_overlap_seconds: float = 300.0  # re-read window for intents committed late
+    ranking_preload: bool = False  # load the snapshot at startup instead of on the first sort=score query
+    
+    # Market Price Index (deal detection; see services/market_prices.py)
+    market_prices_enabled: bool = True
+    market_lookback_days: float = 90.0  # listings scraped earlier are not counted
+    market_year_bucket: int = 3  # model years per segment
+    market_mileage_bucket: int = 25000  # miles per segment
+    market_min_samples: int = 5  # fewer listings fall back to a coarser segment
+    market_refresh_seconds: float = 300.0  # pick up listings saved by other processes; 0 disables
+    market_refresh_overlap_seconds: float = 300.0  # re-read window for listings committed late
+    
+    # Live Intent Feed (SSE / WebSocket subscriptions)
+    live_feed_enabled: bool = True
+    live_feed_buffer_size: int = 256  # events buffered per subscriber before it is dropped as lagged
+    live_feed_replay_size: int = 1000  # recent events kept for resuming from Last-Event-ID
+    live_feed_heartbeat_seconds: float = 15.0
+    live_feed_redis_url: Optional[str] = None  # Redis stream shared by API and ingest-worker processes
+    
+    # Database I/O
+    db_executor_max_workers: int = 8
+    db_batch_get_size: int = 300  # documents per Firestore get_all call in bulk lookups
+    stats_counter_shards: int = 10
+    stats_breakdown_days: int = 30  # days in the /stats/summary by_day breakdown without ?days=
+    
+    # Analytics Export
+    export_dir: str = "./exports"
+    export_chunk_size: int = 5000
+    export_overlap_seconds: float = 600.0  # re-read window for intents committed late
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -1,19 +1,114 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from typing import List, Optional, Dict, Any, Callable, Iterator, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import asyncio
+import functools
 from app.config import settings
 from app.models import NormalizedListing, ConsumerIntent
+from app.records import ListingRecord
+from services.cache import intent_cache, MISSING
+from services.aggregates import IntentAggregates
+from services.live_feed import get_intent_feed
+from services.market_prices import MARKET_PRICE_FIELDS, MarketPriceIndex
+from services.ranking import RANKING_FIELDS, LeadRanker
+from utils.helpers import LazySingleton
+from utils.logger import logger
+from utils.metrics import DB_OPERATION_DURATION
 import json
 
 
+# Paths accepted by `fields=` projections: top-level intent fields and source_listing.<field>
+INTENT_FIELD_PATHS = frozenset(ConsumerIntent.model_fields) | frozenset(
+    f"source_listing.{name}" for name in NormalizedListing.model_fields
+)
+# Read by the in-memory part of geo queries (and geo_day_key by the page cursor), so always fetched
+GEO_FILTER_FIELDS = ('latitude', 'longitude', 'confidence_score', 'detected_at', 'geo_day_key')
+
+
+class QueryTooBroadError(Exception):
+    """Raised, before anything is read, when a geo query's date window exceeds geo_max_window_days"""
+
+
+def geo_day_key(detected_at: Any, geohash: str) -> str:
+    """
+    Key geo queries range-scan: detection day, then geohash, so one key range
+    is one covering cell on one day ("2026-10-19#9tbq...")
+    """
+    return f"{str(detected_at)[:10]}#{geohash}"
+
+
+def normalize_field_paths(fields: Optional[List[str]]) -> Optional[Tuple[str, ...]]:
+    """Validated, sorted field paths (intent_id always included); None means whole documents"""
+    if not fields:
+        return None
+    paths = {field.strip() for field in fields if field.strip()}
+    unknown = sorted(paths - INTENT_FIELD_PATHS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    paths.add('intent_id')
+    # A whole sub-document already covers its nested paths
+    paths = {path for path in paths if '.' not in path or path.split('.')[0] not in paths}
+    return tuple(sorted(paths))
+
+
+def project_document(doc: Dict[str, Any], field_paths: Tuple[str, ...]) -> Dict[str, Any]:
+    """New dict with only the given field paths (the input, often a cached document, is not modified)"""
+    projected: Dict[str, Any] = {}
+    for path in field_paths:
+        head, _, rest = path.partition('.')
+        if head not in doc:
+            continue
+        if not rest:
+            projected[head] = doc[head]
+        elif isinstance(doc[head], dict) and rest in doc[head]:
+            projected.setdefault(head, {})[rest] = doc[head][rest]
+    return projected
+
+
 class DatabaseManager:
     def __init__(self):
         self.db = None
+        self.cache = intent_cache
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.db_executor_max_workers,
+            thread_name_prefix="firestore-io"
+        )
+        # Separate from _executor: geo queries already run on it and fan out from there
+        self._scan_executor = ThreadPoolExecutor(
+            max_workers=settings.geo_scan_concurrency,
+            thread_name_prefix="firestore-geo-scan"
+        )
         self._initialize_firestore()
+        self.aggregates = IntentAggregates(
+            self.db,
+            num_shards=settings.stats_counter_shards,
+            breakdown_days=settings.stats_breakdown_days
+        )
+        self.ranker = LeadRanker.from_settings(
+            lambda since: self.stream_intents_since(since, fields=RANKING_FIELDS)
+        )
+        self.market_prices = MarketPriceIndex.from_settings(
+            lambda since: self.stream_listings_since(since, fields=MARKET_PRICE_FIELDS)
+        )
     
     def _initialize_firestore(self):
         """Initialize Firestore connection"""
+        if settings.firestore_emulator_host:
+            # Local emulator (development, benchmarks): no service account needed
+            import os
+            from google.auth.credentials import AnonymousCredentials
+            from google.cloud import firestore as cloud_firestore
+            
+            os.environ.setdefault('FIRESTORE_EMULATOR_HOST', settings.firestore_emulator_host)
+            self.db = cloud_firestore.Client(
+                project=settings.firebase_project_id or 'demo-consumer-intents',
+                credentials=AnonymousCredentials()
+            )
+            return
+        
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+        
         if not firebase_admin._apps:
             cred = credentials.Certificate(settings.firebase_credentials_path)
             firebase_admin.initialize_app(cred, {
@@ -21,18 +116,121 @@ class DatabaseManager:
             })
         self.db = firestore.client()
     
+    @DB_OPERATION_DURATION.labels('save_normalized_listing').time()
     def save_normalized_listing(self, listing: NormalizedListing) -> str:
         """Save normalized listing to Firestore"""
         doc_ref = self.db.collection('normalized_listings').document(listing.listing_id)
-        doc_ref.set(json.loads(listing.model_dump_json()))
+        doc = json.loads(listing.model_dump_json())
+        doc_ref.set(doc)
+        self.market_prices.on_listing_saved(doc)
         return listing.listing_id
     
+    @DB_OPERATION_DURATION.labels('save_listing_record').time()
+    def save_listing_record(self, record: ListingRecord) -> str:
+        """Save a pipeline ListingRecord without going through pydantic"""
+        doc_ref = self.db.collection('normalized_listings').document(record.listing_id)
+        doc = record.to_document()
+        doc_ref.set(doc)
+        self.market_prices.on_listing_saved(doc)
+        return record.listing_id
+    
+    @DB_OPERATION_DURATION.labels('save_consumer_intent').time()
     def save_consumer_intent(self, intent: ConsumerIntent) -> str:
-        """Save consumer intent to Firestore"""
+        """Save consumer intent and its aggregate counter updates in one batch"""
         doc_ref = self.db.collection('consumer_intents').document(intent.intent_id)
-        doc_ref.set(json.loads(intent.model_dump_json()))
+        doc = json.loads(intent.model_dump_json())
+        if doc.get('geohash') is None and intent.latitude is not None and intent.longitude is not None:
+            from services.spatial_index import encode_geohash
+            doc['geohash'] = encode_geohash(intent.latitude, intent.longitude, settings.geohash_precision)
+        if doc.get('geohash') is not None:
+            doc['geo_day_key'] = geo_day_key(doc['detected_at'], doc['geohash'])
+        batch = self.db.batch()
+        batch.set(doc_ref, doc)
+        self.aggregates.add_to_batch(batch, doc)
+        batch.commit()
+        self.cache.on_intent_saved(doc)
+        self.ranker.on_intent_saved(doc)
+        if settings.live_feed_enabled:
+            get_intent_feed().publish(doc)
         return intent.intent_id
     
+    def backfill_geo_day_keys(self, page_size: int = 500) -> int:
+        """
+        Set geo_day_key on stored intents that have a geohash but predate it,
+        so geo queries find them; returns how many were updated
+        """
+        updated = 0
+        batch = self.db.batch()
+        pending = 0
+        for snapshot in self.db.collection('consumer_intents').select(['detected_at', 'geohash', 'geo_day_key']).stream():
+            doc = snapshot.to_dict()
+            if not doc.get('geohash') or doc.get('geo_day_key') or not doc.get('detected_at'):
+                continue
+            batch.update(snapshot.reference, {'geo_day_key': geo_day_key(doc['detected_at'], doc['geohash'])})
+            updated += 1
+            pending += 1
+            if pending >= page_size:
+                batch.commit()
+                batch = self.db.batch()
+                pending = 0
+        if pending:
+            batch.commit()
+        logger.info(f"🗺️ Set geo_day_key on {updated} intents")
+        return updated
+    
+    @DB_OPERATION_DURATION.labels('save_ingestion_job').time()
+    def save_ingestion_job(self, snapshot: Dict[str, Any]) -> str:
+        """Save an ingestion job progress snapshot"""
+        self.db.collection('ingestion_jobs').document(snapshot['job_id']).set(snapshot)
+        return snapshot['job_id']
+    
+    @DB_OPERATION_DURATION.labels('get_ingestion_job').time()
+    def get_ingestion_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Last persisted snapshot of an ingestion job"""
+        doc = self.db.collection('ingestion_jobs').document(job_id).get()
+        return doc.to_dict() if doc.exists else None
+    
+    @staticmethod
+    def _query_filters(
+        location: Optional[str] = None,
+        intent_type: Optional[str] = None,
+        min_confidence: float = 0.5,
+        urgency: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: int = 100,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius_miles: Optional[float] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        order_by_distance: bool = False,
+        fields: Optional[Tuple[str, ...]] = None,
+        sort: str = 'recent'
+    ) -> Dict[str, Any]:
+        """
+        Accepted intent query filters, with defaults; bbox is (min_lat, min_lon, max_lat, max_lon)
+        
+        fields (see normalize_field_paths) limits the returned document fields;
+        it is part of the cache key, so projected results are cached separately.
+        sort is 'recent' (newest first) or 'score' (best leads first, from the ranker).
+        """
+        return {
+            'location': location,
+            'intent_type': intent_type,
+            'min_confidence': min_confidence,
+            'urgency': urgency,
+            'start_date': start_date,
+            'end_date': end_date,
+            'limit': limit,
+            'latitude': latitude,
+            'longitude': longitude,
+            'radius_miles': radius_miles,
+            'bbox': tuple(bbox) if bbox else None,
+            'order_by_distance': order_by_distance,
+            'fields': tuple(fields) if fields else None,
+            'sort': sort
+        }
+    
     def query_intents(
         self,
         location: Optional[str] = None,
@@ -41,42 +239,428 @@ class DatabaseManager:
         urgency: Optional[str] = None,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
-        limit: int = 100
+        limit: int = 100,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius_miles: Optional[float] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        order_by_distance: bool = False,
+        fields: Optional[Tuple[str, ...]] = None,
+        sort: str = 'recent'
     ) -> List[Dict[str, Any]]:
-        """Query consumer intents with filters"""
+        """Query consumer intents with filters (see _query_filters)"""
+        filters = self._query_filters(
+            location, intent_type, min_confidence, urgency, start_date, end_date, limit,
+            latitude, longitude, radius_miles, bbox, order_by_distance, fields, sort
+        )
+        cached = self.cache.get_query(filters)
+        if cached is not MISSING:
+            return cached
+        return self._fetch_intents(filters)
+    
+    def get_intent_by_id(self, intent_id: str, fields: Optional[Tuple[str, ...]] = None) -> Optional[Dict[str, Any]]:
+        """Retrieve a specific consumer intent by ID, optionally projected to `fields`"""
+        intent = self.cache.get_intent(intent_id)
+        if intent is MISSING:
+            intent = self._fetch_intent(intent_id)
+        return project_document(intent, fields) if intent and fields else intent
+    
+    def get_intents_by_ids(
+        self,
+        intent_ids: List[str],
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Intents for many ids in request order (None where not found): cache first, then batched reads"""
+        unique_ids = list(dict.fromkeys(intent_ids))
+        found = self.cache.get_intents(unique_ids)
+        for chunk in self._batch_get_chunks([intent_id for intent_id in unique_ids if intent_id not in found]):
+            found.update(self._fetch_intents_by_ids(chunk))
+        return self._in_request_order(intent_ids, found, fields)
+    
+    @DB_OPERATION_DURATION.labels('query_intents').time()
+    def _fetch_intents(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run an intent query against Firestore and populate the cache"""
+        if filters['sort'] == 'score':
+            results = self._rank_intents(filters)
+            self.cache.set_query(filters, results)
+            return results
+        
+        if filters['radius_miles'] is not None or filters['bbox'] is not None:
+            results = self._fetch_intents_geo(filters)
+            self.cache.set_query(filters, results)
+            return results
+        
         query = self.db.collection('consumer_intents')
+        if filters['fields']:
+            query = query.select(list(filters['fields']))
         
         # Apply filters
-        if location:
-            query = query.where('city', '==', location.split(',')[0].strip())
+        if filters['location']:
+            query = query.where('city', '==', filters['location'].split(',')[0].strip())
         
-        if intent_type:
-            query = query.where('intent_type', '==', intent_type)
+        if filters['intent_type']:
+            query = query.where('intent_type', '==', filters['intent_type'])
         
-        if min_confidence:
-            query = query.where('confidence_score', '>=', min_confidence)
+        if filters['min_confidence']:
+            query = query.where('confidence_score', '>=', filters['min_confidence'])
         
-        if urgency:
-            query = query.where('urgency', '==', urgency)
+        if filters['urgency']:
+            query = query.where('urgency', '==', filters['urgency'])
         
-        if start_date:
-            query = query.where('detected_at', '>=', start_date)
+        if filters['start_date']:
+            query = query.where('detected_at', '>=', filters['start_date'])
         
-        if end_date:
-            query = query.where('detected_at', '<=', end_date)
+        if filters['end_date']:
+            query = query.where('detected_at', '<=', filters['end_date'])
         
         # Execute query
-        query = query.limit(limit).order_by('detected_at', direction=firestore.Query.DESCENDING)
-        results = query.stream()
+        from firebase_admin import firestore
+        query = query.limit(filters['limit']).order_by('detected_at', direction=firestore.Query.DESCENDING)
+        results = [doc.to_dict() for doc in query.stream()]
         
-        return [doc.to_dict() for doc in results]
+        self.cache.set_query(filters, results)
+        return results
     
-    def get_intent_by_id(self, intent_id: str) -> Optional[Dict[str, Any]]:
-        """Retrieve a specific consumer intent by ID"""
+    def _fetch_intents_geo(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Radius / bounding-box query: range scans over geo_day_key, one per
+        covering cell and day of the date window, then exact filtering in
+        memory. Firestore allows range conditions on a single field here, so
+        confidence and exact date filters are applied after the scan.
+        
+        Reads are bounded by the window (start_date, or the last
+        geo_default_window_days), not by the size of the collection: newest
+        first, days are scanned one at a time until `limit` matches are found.
+        Nearest-first queries need the whole window and scan it in one pass.
+        """
+        from services.spatial_index import geohash_cover, geohash_cover_box, geohash_ranges
+        
+        days = self._geo_window_days(filters)
+        if filters['radius_miles'] is not None:
+            prefixes = geohash_cover(
+                filters['latitude'], filters['longitude'], filters['radius_miles'],
+                max_cells=settings.geo_max_cover_cells
+            )
+        else:
+            prefixes = geohash_cover_box(*filters['bbox'], max_cells=settings.geo_max_cover_cells)
+        ranges = geohash_ranges(prefixes)
+        
+        base = self.db.collection('consumer_intents')
+        if filters['fields']:
+            base = base.select(sorted(set(filters['fields']) | set(GEO_FILTER_FIELDS)))
+        if filters['location']:
+            base = base.where('city', '==', filters['location'].split(',')[0].strip())
+        if filters['intent_type']:
+            base = base.where('intent_type', '==', filters['intent_type'])
+        if filters['urgency']:
+            base = base.where('urgency', '==', filters['urgency'])
+        
+        if filters['order_by_distance']:
+            passes = [[(day, low, high) for day in days for low, high in ranges]]
+        else:
+            passes = [[(day, low, high) for low, high in ranges] for day in days]
+        
+        docs: List[Dict[str, Any]] = []
+        for scans in passes:
+            candidates: Dict[str, Dict[str, Any]] = {}
+            for found in self._scan_executor.map(lambda scan: self._scan_geo_day_range(base, *scan), scans):
+                candidates.update(found)
+            docs.extend(self._geo_matches(candidates.values(), filters))
+            # Days are newest first: once `limit` matches are in, older days cannot displace them
+            if not filters['order_by_distance'] and len(docs) >= filters['limit']:
+                break
+        
+        if filters['order_by_distance']:
+            docs.sort(key=lambda doc: doc['distance_miles'])
+        else:
+            docs.sort(key=lambda doc: str(doc.get('detected_at', '')), reverse=True)
+        docs = docs[:filters['limit']]
+        
+        if filters['fields']:
+            docs = [project_document(doc, filters['fields'] + ('distance_miles',)) for doc in docs]
+        return docs
+    
+    @staticmethod
+    def _geo_window_days(filters: Dict[str, Any]) -> List[str]:
+        """Days of a geo query's date window, newest first"""
+        start, end = filters['start_date'], filters['end_date']
+        if end is None:
+            end = datetime.now(start.tzinfo if start is not None else None)
+        if start is None:
+            start = end - timedelta(days=settings.geo_default_window_days)
+        
+        first, last = start.date(), end.date()
+        if (last - first).days + 1 > settings.geo_max_window_days:
+            raise QueryTooBroadError(
+                f"Geo queries cover at most {settings.geo_max_window_days} days; narrow start_date/end_date"
+            )
+        return [(last - timedelta(days=offset)).isoformat() for offset in range((last - first).days + 1)]
+    
+    @staticmethod
+    def _geo_matches(candidates, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Candidates inside the radius or box that pass the confidence and date filters"""
+        from services.spatial_index import haversine_miles
+        import numpy as np
+        
+        start = filters['start_date'].isoformat() if filters['start_date'] else None
+        end = filters['end_date'].isoformat() if filters['end_date'] else None
+        docs = [
+            doc for doc in candidates
+            if doc.get('latitude') is not None and doc.get('longitude') is not None
+            and (doc.get('confidence_score') or 0.0) >= (filters['min_confidence'] or 0.0)
+            and (start is None or str(doc.get('detected_at', '')) >= start)
+            and (end is None or str(doc.get('detected_at', '')) <= end)
+        ]
+        if not docs:
+            return []
+        
+        lats = np.array([doc['latitude'] for doc in docs], dtype=np.float64)
+        lons = np.array([doc['longitude'] for doc in docs], dtype=np.float64)
+        if filters['radius_miles'] is not None:
+            distances = haversine_miles(filters['latitude'], filters['longitude'], lats, lons)
+            keep = np.nonzero(distances <= filters['radius_miles'])[0]
+            return [dict(docs[i], distance_miles=round(float(distances[i]), 2)) for i in keep]
+        
+        min_lat, min_lon, max_lat, max_lon = filters['bbox']
+        in_lon = (lons >= min_lon) & (lons <= max_lon) if min_lon <= max_lon else (lons >= min_lon) | (lons <= max_lon)
+        keep = np.nonzero((lats >= min_lat) & (lats <= max_lat) & in_lon)[0]
+        return [docs[i] for i in keep]
+    
+    @staticmethod
+    def _scan_geo_day_range(base, day: str, low: str, high: str) -> Dict[str, Dict[str, Any]]:
+        """Every intent detected on `day` with low <= geohash < high, read in pages"""
+        query = (
+            base.where('geo_day_key', '>=', f"{day}#{low}")
+            .where('geo_day_key', '<', f"{day}#{high}")
+            .order_by('geo_day_key')
+        )
+        found = {}
+        last_snapshot = None
+        while True:
+            page = query.limit(settings.geo_scan_page_size)
+            if last_snapshot is not None:
+                page = page.start_after(last_snapshot)
+            
+            snapshots = list(page.stream())
+            for snapshot in snapshots:
+                found[snapshot.id] = snapshot.to_dict()
+            
+            if len(snapshots) < settings.geo_scan_page_size:
+                return found
+            last_snapshot = snapshots[-1]
+    
+    @DB_OPERATION_DURATION.labels('rank_intents').time()
+    def _rank_intents(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Top intents by lead score (sort=score): ranked from the in-memory
+        snapshot, documents from the cache or batched reads. Each result
+        carries its `score` (and `distance_miles` for radius queries).
+        """
+        ranked = self.ranker.top_k(filters, filters['limit'])
+        docs = self.get_intents_by_ids([intent_id for intent_id, _, _ in ranked])
+        
+        results = []
+        for (_, score, distance), doc in zip(ranked, docs):
+            if doc is None:
+                continue
+            doc = dict(doc, score=round(score, 4))
+            if distance is not None:
+                doc['distance_miles'] = round(distance, 2)
+            if filters['fields']:
+                doc = project_document(doc, filters['fields'] + ('score', 'distance_miles'))
+            results.append(doc)
+        return results
+    
+    @DB_OPERATION_DURATION.labels('get_intent').time()
+    def _fetch_intent(self, intent_id: str) -> Optional[Dict[str, Any]]:
+        """Read a single intent from Firestore and populate the cache"""
         doc_ref = self.db.collection('consumer_intents').document(intent_id)
         doc = doc_ref.get()
-        return doc.to_dict() if doc.exists else None
+        if not doc.exists:
+            return None
+        
+        intent = doc.to_dict()
+        self.cache.set_intent(intent_id, intent)
+        return intent
+    
+    @DB_OPERATION_DURATION.labels('batch_get_intents').time()
+    def _fetch_intents_by_ids(self, intent_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Read several intents with one Firestore get_all call and populate the cache"""
+        collection = self.db.collection('consumer_intents')
+        found = {}
+        for snapshot in self.db.get_all([collection.document(intent_id) for intent_id in intent_ids]):
+            if snapshot.exists:
+                intent = snapshot.to_dict()
+                self.cache.set_intent(snapshot.id, intent)
+                found[snapshot.id] = intent
+        return found
+    
+    @staticmethod
+    def _batch_get_chunks(intent_ids: List[str]) -> List[List[str]]:
+        size = settings.db_batch_get_size
+        return [intent_ids[start:start + size] for start in range(0, len(intent_ids), size)]
+    
+    @staticmethod
+    def _in_request_order(
+        intent_ids: List[str],
+        found: Dict[str, Dict[str, Any]],
+        fields: Optional[Tuple[str, ...]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        if fields:
+            found = {intent_id: project_document(intent, fields) for intent_id, intent in found.items()}
+        return [found.get(intent_id) for intent_id in intent_ids]
+    
+    def stream_intents_since(
+        self,
+        watermark: Optional[str] = None,
+        chunk_size: int = 5000,
+        fields: Optional[List[str]] = None,
+        inclusive: bool = False
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield intents detected after `watermark` (ISO timestamp; at or after it
+        with inclusive=True), oldest first, in chunks of at most `chunk_size`
+        documents. Each chunk is a separate paginated query, so memory stays
+        bounded by one chunk. With `fields`, only those document fields are read.
+        """
+        return self._stream_since('consumer_intents', 'detected_at', watermark, chunk_size, fields, inclusive)
+    
+    def stream_listings_since(
+        self,
+        watermark: Optional[str] = None,
+        chunk_size: int = 5000,
+        fields: Optional[List[str]] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Yield normalized listings scraped after `watermark`, like stream_intents_since"""
+        return self._stream_since('normalized_listings', 'scraped_at', watermark, chunk_size, fields)
+    
+    def _stream_since(
+        self,
+        collection: str,
+        order_field: str,
+        watermark: Optional[str],
+        chunk_size: int,
+        fields: Optional[List[str]],
+        inclusive: bool = False
+    ) -> Iterator[List[Dict[str, Any]]]:
+        query = self.db.collection(collection).order_by(order_field)
+        if fields:
+            query = query.select(fields)
+        if watermark:
+            query = query.where(order_field, '>=' if inclusive else '>', watermark)
+        
+        last_snapshot = None
+        while True:
+            page = query.limit(chunk_size)
+            if last_snapshot is not None:
+                page = page.start_after(last_snapshot)
+            
+            snapshots = list(page.stream())
+            if not snapshots:
+                return
+            
+            yield [snapshot.to_dict() for snapshot in snapshots]
+            
+            if len(snapshots) < chunk_size:
+                return
+            last_snapshot = snapshots[-1]
+    
+    # ---- Async API ----
+    # Firestore's sync client blocks on network I/O, so async callers hop onto a
+    # dedicated bounded pool instead of stalling the event loop. Cache hits are
+    # answered inline without the thread hop.
+    
+    async def _run(self, func: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    async def asave_normalized_listing(self, listing: NormalizedListing) -> str:
+        """Async variant of save_normalized_listing"""
+        return await self._run(self.save_normalized_listing, listing)
+    
+    async def asave_listing_record(self, record: ListingRecord) -> str:
+        """Async variant of save_listing_record"""
+        return await self._run(self.save_listing_record, record)
+    
+    async def aassess_listing_price(self, listing) -> Optional[Dict[str, Any]]:
+        """Market price lookup for a listing; inline once the index is loaded"""
+        if self.market_prices.loaded:
+            return self.market_prices.assess(listing)
+        return await self._run(self.market_prices.assess, listing)
+    
+    async def asave_consumer_intent(self, intent: ConsumerIntent) -> str:
+        """Async variant of save_consumer_intent"""
+        return await self._run(self.save_consumer_intent, intent)
+    
+    async def asave_ingestion_job(self, snapshot: Dict[str, Any]) -> str:
+        """Async variant of save_ingestion_job"""
+        return await self._run(self.save_ingestion_job, snapshot)
+    
+    async def aget_ingestion_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Async variant of get_ingestion_job"""
+        return await self._run(self.get_ingestion_job, job_id)
+    
+    async def aquery_intents(
+        self,
+        location: Optional[str] = None,
+        intent_type: Optional[str] = None,
+        min_confidence: float = 0.5,
+        urgency: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: int = 100,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius_miles: Optional[float] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        order_by_distance: bool = False,
+        fields: Optional[Tuple[str, ...]] = None,
+        sort: str = 'recent'
+    ) -> List[Dict[str, Any]]:
+        """Async variant of query_intents"""
+        filters = self._query_filters(
+            location, intent_type, min_confidence, urgency, start_date, end_date, limit,
+            latitude, longitude, radius_miles, bbox, order_by_distance, fields, sort
+        )
+        cached = self.cache.get_query(filters)
+        if cached is not MISSING:
+            return cached
+        return await self._run(self._fetch_intents, filters)
+    
+    async def aget_intent_by_id(self, intent_id: str, fields: Optional[Tuple[str, ...]] = None) -> Optional[Dict[str, Any]]:
+        """Async variant of get_intent_by_id"""
+        intent = self.cache.get_intent(intent_id)
+        if intent is MISSING:
+            intent = await self._run(self._fetch_intent, intent_id)
+        return project_document(intent, fields) if intent and fields else intent
+    
+    async def aget_intents_by_ids(
+        self,
+        intent_ids: List[str],
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Async variant of get_intents_by_ids; the batched reads run concurrently"""
+        unique_ids = list(dict.fromkeys(intent_ids))
+        found = self.cache.get_intents(unique_ids)
+        chunks = self._batch_get_chunks([intent_id for intent_id in unique_ids if intent_id not in found])
+        for fetched in await asyncio.gather(*(self._run(self._fetch_intents_by_ids, chunk) for chunk in chunks)):
+            found.update(fetched)
+        return self._in_request_order(intent_ids, found, fields)
+    
+    async def aget_stats_summary(
+        self,
+        city: Optional[str] = None,
+        days: Optional[int] = None,
+        top_cities: int = 0
+    ) -> Dict[str, Any]:
+        """Read materialized intent statistics"""
+        return await self._run(self.aggregates.get_summary, city, days, top_cities)
+    
+    def close(self):
+        """Wait for in-flight database calls and release the I/O pool"""
+        self._executor.shutdown(wait=True)
+        self._scan_executor.shutdown(wait=True)
 
 
-# Singleton instance
-db_manager = DatabaseManager()
+# Singleton, created on first use; routes receive it via Depends(get_db_manager)
+get_db_manager = LazySingleton(DatabaseManager)
@@ -1,9 +1,14 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.routers import ingestion, intents
+from app.database import get_db_manager
+from routers import admin, ingestion, intents, market
+from services.jobs import get_job_registry
+from services.live_feed import get_intent_feed
 from utils.logger import logger
-import uvicorn
+from utils.metrics import MetricsMiddleware, release_process, render_metrics
+from utils.profiling import ProfilingMiddleware
 
 
 app = FastAPI(
@@ -21,9 +26,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in request profiling (X-Profile header from admins, or sampled)
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
+
+# Request latency by route, outermost so it also times the other middleware
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(ingestion.router, prefix="/api/v1/ingestion", tags=["Ingestion"])
 app.include_router(intents.router, prefix="/api/v1/intents", tags=["Intents"])
+app.include_router(market.router, prefix="/api/v1/market", tags=["Market"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["Admin"])
 
 
 @app.on_event("startup")
@@ -31,11 +46,27 @@ async def startup_event():
     logger.info("🚀 Consumer Intent Detector API starting up...")
     logger.info(f"Environment: {settings.environment}")
     logger.info(f"Default Location: {settings.default_location}")
+    if settings.scheduler_enabled:
+        from services.scheduler import get_ingestion_scheduler
+        get_ingestion_scheduler().start()
+    if settings.ranking_preload:
+        # Load the lead ranking snapshot in the background; sort=score queries wait for it
+        asyncio.get_running_loop().run_in_executor(None, get_db_manager().ranker.ensure_loaded)
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("👋 Shutting down Consumer Intent Detector API...")
+    if settings.scheduler_enabled:
+        from services.scheduler import get_ingestion_scheduler
+        get_ingestion_scheduler().shutdown()
+    if get_job_registry.initialized:
+        await get_job_registry().shutdown()
+    if get_intent_feed.initialized:
+        await get_intent_feed().close()
+    if get_db_manager.initialized:
+        get_db_manager().close()
+    release_process()
 
 
 @app.get("/")
@@ -56,7 +87,17 @@ async def health_check():
     }
 
 
+if settings.metrics_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        # Sync handler: runs in the threadpool, since a scrape reads the multiprocess files and queue stats
+        body, content_type = render_metrics()
+        return Response(content=body, headers={"Content-Type": content_type})
+
+
 if __name__ == "__main__":
+    import uvicorn
+    
     uvicorn.run(
         "app.main:app",
         host=settings.api_host,
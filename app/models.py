@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, validator, model_validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -23,6 +23,14 @@ class DataSource(str, Enum):
     CRAIGSLIST = "craigslist.org"
 
 
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
 class RawListing(BaseModel):
     source: DataSource
     url: str
@@ -81,6 +89,7 @@ class ConsumerIntent(BaseModel):
     state: str
     latitude: Optional[float] = None
     longitude: Optional[float] = None
+    geohash: Optional[str] = None  # set on save when coordinates are known
     
     # Intent Details
     urgency: IntentUrgency
@@ -95,6 +104,7 @@ class ConsumerIntent(BaseModel):
     
     # Source Data
     source_listing: NormalizedListing
+    market_price_percentile: Optional[float] = None  # listing price within its market segment, 0-100
     detected_at: datetime
     
     # Contact Information (if available)
@@ -107,14 +117,58 @@ class ConsumerIntent(BaseModel):
         }
 
 
+class IntentSort(str, Enum):
+    RECENT = "recent"  # newest first
+    SCORE = "score"  # best leads first (services/ranking.py)
+
+
+class BoundingBox(BaseModel):
+    min_latitude: float = Field(..., ge=-90.0, le=90.0)
+    min_longitude: float = Field(..., ge=-180.0, le=180.0)
+    max_latitude: float = Field(..., ge=-90.0, le=90.0)
+    max_longitude: float = Field(..., ge=-180.0, le=180.0)
+    
+    @model_validator(mode='after')
+    def check_order(self):
+        if self.min_latitude > self.max_latitude:
+            raise ValueError("min_latitude must not exceed max_latitude")
+        return self
+
+
 class IntentQueryRequest(BaseModel):
-    location: Optional[str] = None
+    location: Optional[str] = None  # city filter, or the search center when radius_miles is set
     intent_type: Optional[IntentType] = None
     min_confidence: float = Field(0.5, ge=0.0, le=1.0)
     urgency: Optional[IntentUrgency] = None
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
     limit: int = Field(100, ge=1, le=1000)
+    
+    # Geo search: a center (coordinates or `location`) plus radius, or a bounding box
+    latitude: Optional[float] = Field(None, ge=-90.0, le=90.0)
+    longitude: Optional[float] = Field(None, ge=-180.0, le=180.0)
+    radius_miles: Optional[float] = Field(None, gt=0.0, le=500.0)
+    bbox: Optional[BoundingBox] = None
+    order_by_distance: bool = False
+    sort: IntentSort = IntentSort.RECENT
+    
+    @model_validator(mode='after')
+    def check_geo_filters(self):
+        if (self.latitude is None) != (self.longitude is None):
+            raise ValueError("latitude and longitude must be given together")
+        if self.radius_miles is not None and self.bbox is not None:
+            raise ValueError("Use either radius_miles or bbox, not both")
+        if self.radius_miles is not None and self.latitude is None and not self.location:
+            raise ValueError("radius_miles needs a center: latitude/longitude or location")
+        if self.order_by_distance and self.radius_miles is None:
+            raise ValueError("order_by_distance requires radius_miles")
+        if self.order_by_distance and self.sort == IntentSort.SCORE:
+            raise ValueError("Use either order_by_distance or sort=score, not both")
+        return self
+
+
+class IntentBatchGetRequest(BaseModel):
+    intent_ids: List[str] = Field(..., min_length=1, max_length=5000)
 
 
 class IngestionRequest(BaseModel):
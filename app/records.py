@@ -0,0 +1,110 @@
+"""
+Compact listing records for the ingestion hot path.
+
+A pydantic model instance carries a per-instance __dict__ plus validation
+state; across a 100k-listing crawl that overhead dominates resident memory.
+ListingRecord is a slotted dataclass holding the same fields as
+NormalizedListing, built with plain type coercion instead of validation.
+Convert with to_model() only where a pydantic model is actually required
+(API responses, ConsumerIntent.source_listing) and with to_document() when
+writing to storage.
+"""
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from app.models import DataSource, NormalizedListing
+
+
+@dataclass(slots=True)
+class ListingRecord:
+    listing_id: str
+    source: DataSource
+    url: str
+
+    # Vehicle Details
+    title: str
+    price: Optional[float] = None
+    year: Optional[int] = None
+    make: Optional[str] = None
+    model: Optional[str] = None
+    mileage: Optional[int] = None
+    condition: Optional[str] = None
+
+    # Location
+    location: str = ''
+    city: Optional[str] = None
+    state: Optional[str] = None
+    zip_code: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+    # Contact Info
+    seller_name: Optional[str] = None
+    seller_type: Optional[str] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None
+
+    # Metadata
+    description: Optional[str] = None
+    images: Tuple[str, ...] = ()
+    listing_date: Optional[datetime] = None
+    scraped_at: Optional[datetime] = None
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "ListingRecord":
+        """Build from a normalizer row, coercing types the way NormalizedListing would"""
+        return cls(
+            listing_id=str(row['listing_id']),
+            source=DataSource(row['source']),
+            url=str(row['url']),
+            title=str(row['title']),
+            price=_optional(float, row.get('price')),
+            year=_optional(int, row.get('year')),
+            make=_optional(str, row.get('make')),
+            model=_optional(str, row.get('model')),
+            mileage=_optional(int, row.get('mileage')),
+            condition=_optional(str, row.get('condition')),
+            location=str(row.get('location') or ''),
+            city=_optional(str, row.get('city')),
+            state=_optional(str, row.get('state')),
+            zip_code=_optional(str, row.get('zip_code')),
+            latitude=_optional(float, row.get('latitude')),
+            longitude=_optional(float, row.get('longitude')),
+            seller_name=_optional(str, row.get('seller_name')),
+            seller_type=_optional(str, row.get('seller_type')),
+            phone=_optional(str, row.get('phone')),
+            email=_optional(str, row.get('email')),
+            description=_optional(str, row.get('description')),
+            images=tuple(row.get('images') or ()),
+            listing_date=row.get('listing_date'),
+            scraped_at=row['scraped_at'],
+        )
+
+    @classmethod
+    def from_model(cls, listing: NormalizedListing) -> "ListingRecord":
+        values = {f.name: getattr(listing, f.name) for f in fields(cls)}
+        values['images'] = tuple(values['images'])
+        return cls(**values)
+
+    def to_model(self) -> NormalizedListing:
+        """Pydantic model for API/storage boundaries (fields are already coerced)"""
+        values = {f.name: getattr(self, f.name) for f in fields(self)}
+        values['images'] = list(self.images)
+        return NormalizedListing.model_construct(**values)
+
+    def to_document(self) -> Dict[str, Any]:
+        """JSON-compatible dict, same shape as json.loads(NormalizedListing.model_dump_json())"""
+        document = {f.name: getattr(self, f.name) for f in fields(self)}
+        document['source'] = self.source.value
+        document['images'] = list(self.images)
+        document['listing_date'] = self.listing_date.isoformat() if self.listing_date else None
+        document['scraped_at'] = self.scraped_at.isoformat() if self.scraped_at else None
+        return document
+
+
+def _optional(cast, value: Any):
+    if value is None:
+        return None
+    if cast is int and isinstance(value, str):
+        return int(float(value))
+    return cast(value)
@@ -0,0 +1,29 @@
+"""
+API process for the load benchmark: the real app, with the Cars.com connector
+pointed at a marketplace fixture server. Other settings come from the
+environment as usual (FIRESTORE_EMULATOR_HOST, OPENAI_BASE_URL, ...).
+
+Usage (normally started by benchmarks.load_benchmark):
+    python -m benchmarks.app_server --port 8765 --marketplace-url http://127.0.0.1:9000
+"""
+import argparse
+import uvicorn
+from app.models import DataSource
+from connectors.registry import get_connector
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API for benchmarks")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--marketplace-url", help="Fixture server standing in for www.cars.com")
+    args = parser.parse_args()
+
+    if args.marketplace_url:
+        get_connector(DataSource.CARS_COM).BASE_URL = args.marketplace_url
+
+    # One process, so the connector override above is the one serving requests
+    uvicorn.run("app.main:app", host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""
+End-to-end load benchmark: the real API, in its own process, against local
+stand-ins, under concurrent query traffic and full ingestion jobs.
+
+Stand-ins:
+- Firestore emulator (required), e.g.
+      gcloud emulators firestore start --host-port=localhost:8080
+  Its data for --project is wiped at the start of each run.
+- fake OpenAI server (benchmarks.standins): --llm-latency-ms, --llm-error-rate
+- marketplace fixture server with Cars.com-style result pages
+
+The report gives throughput and p50/p95/p99 latency for each API scenario and
+for ingestion jobs. If a baseline file exists, any metric worse than the
+baseline by more than --tolerance fails the run (exit status 1).
+Baselines are machine-specific; record one per machine with --save-baseline.
+
+Usage:
+    python -m benchmarks.load_benchmark --emulator localhost:8080
+    python -m benchmarks.load_benchmark --emulator localhost:8080 --requests 20000 --concurrency 64
+    python -m benchmarks.load_benchmark --emulator localhost:8080 --save-baseline
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import httpx
+from benchmarks.normalizer_benchmark import CITIES, synthetic_listings
+from benchmarks.standins import FakeOpenAIServer, MarketplaceFixtureServer
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "load_benchmark.json")
+
+# Compared against the baseline: metric -> True if higher is better
+COMPARED_METRICS = {
+    "rps": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "listings_per_sec": True,
+    "job_p95_s": False,
+}
+
+Request = Tuple[str, str, Optional[Dict[str, Any]]]
+
+
+# ---- API scenarios: name -> (weight, request builder) ----
+
+def _query_city(rng: random.Random, ids: List[str]) -> Request:
+    body = {"location": rng.choice(CITIES), "min_confidence": rng.choice([0.5, 0.6, 0.7, 0.8]), "limit": 100}
+    return "POST", "/api/v1/intents/query", body
+
+
+def _query_radius(rng: random.Random, ids: List[str]) -> Request:
+    body = {"latitude": 32.2226, "longitude": -110.9747, "radius_miles": rng.choice([10, 25, 50]), "limit": 100}
+    return "POST", "/api/v1/intents/query", body
+
+
+def _query_projected(rng: random.Random, ids: List[str]) -> Request:
+    body = {"location": rng.choice(CITIES), "limit": 500}
+    return "POST", "/api/v1/intents/query?fields=intent_id,urgency,confidence_score,city", body
+
+
+def _get_intent(rng: random.Random, ids: List[str]) -> Request:
+    return "GET", f"/api/v1/intents/{rng.choice(ids)}", None
+
+
+def _batch_get(rng: random.Random, ids: List[str]) -> Request:
+    return "POST", "/api/v1/intents/batch-get", {"intent_ids": rng.sample(ids, min(100, len(ids)))}
+
+
+def _stats_summary(rng: random.Random, ids: List[str]) -> Request:
+    return "GET", "/api/v1/intents/stats/summary", None
+
+
+SCENARIOS: Dict[str, Tuple[int, Callable[[random.Random, List[str]], Request]]] = {
+    "query_city": (30, _query_city),
+    "query_radius": (15, _query_radius),
+    "query_projected": (10, _query_projected),
+    "get_intent": (25, _get_intent),
+    "batch_get": (10, _batch_get),
+    "stats_summary": (10, _stats_summary),
+}
+
+
+# ---- measurement helpers ----
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    total = len(latencies) + errors
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "rps": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+# ---- stand-in data and processes ----
+
+def reset_emulator(emulator: str, project: str):
+    """Delete all documents of the project in the Firestore emulator"""
+    response = httpx.delete(f"http://{emulator}/emulator/v1/projects/{project}/databases/(default)/documents")
+    response.raise_for_status()
+
+
+def seed_intents(count: int, seed: int = 0) -> List[str]:
+    """Store `count` synthetic intents (through DatabaseManager, so aggregates are kept too)"""
+    from app.database import get_db_manager
+    from app.models import ConsumerIntent, IntentType, IntentUrgency
+    from services.normalizer import DataNormalizer
+
+    rng = random.Random(seed)
+    db_manager = get_db_manager()
+    intents = [
+        ConsumerIntent(
+            intent_id=f"bench-{index}",
+            intent_type=IntentType.CAR_BUYER,
+            location=listing.location,
+            city=listing.city or "Unknown",
+            state=listing.state or "Unknown",
+            latitude=listing.latitude,
+            longitude=listing.longitude,
+            urgency=rng.choice(list(IntentUrgency)),
+            confidence_score=round(rng.uniform(0.4, 1.0), 2),
+            keywords=["low mileage"],
+            source_listing=listing,
+            detected_at=listing.scraped_at,
+            contact_available=bool(listing.phone or listing.email)
+        )
+        for index, listing in enumerate(DataNormalizer.normalize_batch(synthetic_listings(count, seed)))
+    ]
+
+    async def save_all():
+        for start in range(0, len(intents), 200):
+            await asyncio.gather(*(db_manager.asave_consumer_intent(intent) for intent in intents[start:start + 200]))
+
+    asyncio.run(save_all())
+    db_manager.close()
+    return [intent.intent_id for intent in intents]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_api(port: int, env: Dict[str, str], marketplace_url: str, timeout: float = 60.0) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.app_server", "--port", str(port), "--marketplace-url", marketplace_url],
+        env={**os.environ, **env}
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API process exited with status {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("API did not become healthy in time")
+
+
+# ---- load phases ----
+
+async def run_api_load(base_url: str, ids: List[str], total: int, concurrency: int, seed: int = 0) -> Dict[str, Any]:
+    """Send `total` requests from `concurrency` concurrent clients, with the SCENARIOS mix"""
+    rng = random.Random(seed)
+    names = list(SCENARIOS)
+    plan = rng.choices(names, weights=[SCENARIOS[name][0] for name in names], k=total)
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    queue = iter(plan)
+
+    async def client_loop(client: httpx.AsyncClient):
+        for name in queue:
+            method, path, body = SCENARIOS[name][1](rng, ids)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                ok = response.status_code < 400 or (name == "get_intent" and response.status_code == 404)
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies[name].append(time.perf_counter() - started)
+            else:
+                errors[name] += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    report = {name: summarize(latencies[name], errors[name], elapsed) for name in names if name in plan}
+    report["all"] = summarize([value for name in names for value in latencies[name]], sum(errors.values()), elapsed)
+    return report
+
+
+async def run_ingestion(base_url: str, jobs: int, listings_per_job: int, poll_seconds: float = 0.25) -> Dict[str, Any]:
+    """Start `jobs` ingestion jobs at once and wait for all of them to finish"""
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        started = time.perf_counter()
+        job_ids = []
+        for index in range(jobs):
+            response = await client.post("/api/v1/ingestion/start", json={
+                "location": CITIES[index % len(CITIES)],
+                "sources": ["cars.com"],
+                "max_listings": listings_per_job
+            })
+            response.raise_for_status()
+            job_ids.append(response.json()["job_id"])
+
+        durations, snapshots = [], []
+        pending = set(job_ids)
+        while pending:
+            await asyncio.sleep(poll_seconds)
+            for job_id in list(pending):
+                snapshot = (await client.get(f"/api/v1/ingestion/status/{job_id}")).json()
+                if snapshot["status"] in ("done", "failed", "cancelled"):
+                    pending.discard(job_id)
+                    durations.append(time.perf_counter() - started)
+                    snapshots.append(snapshot)
+        elapsed = time.perf_counter() - started
+
+    persisted = sum(snapshot["counters"].get("persisted", 0) for snapshot in snapshots)
+    durations.sort()
+    return {
+        "jobs": jobs,
+        "failed_jobs": sum(1 for snapshot in snapshots if snapshot["status"] != "done"),
+        "listings_fetched": sum(snapshot["counters"].get("fetched", 0) for snapshot in snapshots),
+        "listings_failed": sum(snapshot["counters"].get("failed", 0) for snapshot in snapshots),
+        "intents_persisted": persisted,
+        "listings_per_sec": round(persisted / elapsed, 2) if elapsed > 0 else 0.0,
+        "job_p50_s": round(percentile(durations, 50), 2),
+        "job_p95_s": round(percentile(durations, 95), 2),
+        "job_p99_s": round(percentile(durations, 99), 2),
+    }
+
+
+# ---- baseline comparison ----
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, path: str = "") -> List[str]:
+    """Descriptions of metrics worse than the baseline by more than `tolerance` (a fraction)"""
+    regressions = []
+    for key, expected in baseline.items():
+        actual = report.get(key)
+        name = f"{path}.{key}" if path else key
+        if isinstance(expected, dict) and isinstance(actual, dict):
+            regressions.extend(compare(actual, expected, tolerance, name))
+        elif key in COMPARED_METRICS and isinstance(actual, (int, float)) and expected:
+            higher_is_better = COMPARED_METRICS[key]
+            change = (actual - expected) / expected
+            if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+                regressions.append(f"{name}: {actual} vs baseline {expected} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end API and ingestion benchmark against local stand-ins")
+    parser.add_argument("--emulator", default=os.environ.get("FIRESTORE_EMULATOR_HOST"),
+                        help="Firestore emulator host:port (default: $FIRESTORE_EMULATOR_HOST)")
+    parser.add_argument("--project", default="demo-load-benchmark")
+    parser.add_argument("--seed-intents", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--ingestion-jobs", type=int, default=4, help="0 skips the ingestion phase")
+    parser.add_argument("--listings-per-job", type=int, default=25)
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.02)
+    parser.add_argument("--no-cache", action="store_true", help="Run the API with the intent read cache disabled")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run's report as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression, as a fraction of the baseline")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Fail if more API requests than this fail")
+    parser.add_argument("--output", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    if not args.emulator:
+        parser.error("a Firestore emulator is required: --emulator host:port or FIRESTORE_EMULATOR_HOST")
+
+    from app.config import settings
+    settings.firestore_emulator_host = args.emulator
+    settings.firebase_project_id = args.project
+    settings.live_feed_enabled = False
+
+    reset_emulator(args.emulator, args.project)
+    started = time.perf_counter()
+    ids = seed_intents(args.seed_intents)
+    print(f"Seeded {len(ids)} intents in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    with FakeOpenAIServer(args.llm_latency_ms, args.llm_error_rate) as llm, \
+            MarketplaceFixtureServer(args.listings_per_job) as marketplace:
+        port = free_port()
+        api = start_api(port, {
+            "FIRESTORE_EMULATOR_HOST": args.emulator,
+            "FIREBASE_PROJECT_ID": args.project,
+            "OPENAI_API_KEY": "benchmark",
+            "OPENAI_BASE_URL": llm.base_url,
+            "SCRAPING_DELAY_SECONDS": "0",
+            "INGESTION_BACKEND": "local",
+            "INGESTION_MAX_CONCURRENT_JOBS": str(max(1, args.ingestion_jobs)),
+            "SCHEDULER_ENABLED": "false",
+            "CACHE_ENABLED": "false" if args.no_cache else "true",
+            "LOG_LEVEL": "WARNING",
+            "LOG_FILE": "",
+        }, marketplace.url)
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            report = {
+                "config": {
+                    "seed_intents": args.seed_intents,
+                    "requests": args.requests,
+                    "concurrency": args.concurrency,
+                    "ingestion_jobs": args.ingestion_jobs,
+                    "listings_per_job": args.listings_per_job,
+                    "llm_latency_ms": args.llm_latency_ms,
+                    "llm_error_rate": args.llm_error_rate,
+                    "cache": not args.no_cache,
+                },
+                "api": asyncio.run(run_api_load(base_url, ids, args.requests, args.concurrency)),
+            }
+            if args.ingestion_jobs:
+                report["ingestion"] = asyncio.run(run_ingestion(base_url, args.ingestion_jobs, args.listings_per_job))
+                report["ingestion"]["llm_requests"] = llm.requests
+        finally:
+            api.terminate()
+            api.wait(timeout=30)
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failures = []
+    if report["api"]["all"]["error_rate"] > args.max_error_rate:
+        failures.append(f"API error rate {report['api']['all']['error_rate']} over {args.max_error_rate}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != report["config"]:
+            print("Warning: baseline was recorded with a different configuration", file=sys.stderr)
+        failures.extend(compare(
+            {key: value for key, value in report.items() if key != "config"},
+            {key: value for key, value in baseline.items() if key != "config"},
+            args.tolerance
+        ))
+    else:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one", file=sys.stderr)
+
+    if failures:
+        print("Regressions:\n  " + "\n  ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Resident memory and throughput of pipeline listings: pydantic NormalizedListing
+(normalize_batch) versus slotted ListingRecord (normalize_records).
+
+Usage:
+    python -m benchmarks.memory_benchmark --listings 100000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from benchmarks.normalizer_benchmark import synthetic_listings
+from services.normalizer import DataNormalizer
+
+
+def measure(normalize, listings):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = normalize(listings)
+    elapsed = time.perf_counter() - started
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {
+        "bytes_per_listing": round(retained / len(listings)),
+        "peak_mb": round(peak / 1e6, 1),
+        "listings_per_sec": round(len(listings) / elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline listing memory footprint")
+    parser.add_argument("--listings", type=int, default=100000)
+    args = parser.parse_args()
+
+    listings = synthetic_listings(args.listings)
+    DataNormalizer.normalize_records(listings[:10])  # warm gazetteer and validators
+    DataNormalizer.normalize_batch(listings[:10])
+
+    models = measure(DataNormalizer.normalize_batch, listings)
+    records = measure(DataNormalizer.normalize_records, listings)
+
+    print(json.dumps({
+        "listings": args.listings,
+        "pydantic": models,
+        "records": records,
+        "memory_reduction": round(models["bytes_per_listing"] / records["bytes_per_listing"], 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
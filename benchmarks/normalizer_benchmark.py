@@ -0,0 +1,67 @@
+"""
+Normalization throughput: per-item normalize_listing versus normalize_batch.
+
+Usage:
+    python -m benchmarks.normalizer_benchmark --listings 20000
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime
+from app.models import DataSource, RawListing
+from services.normalizer import DataNormalizer
+
+CITIES = ["Tucson, AZ", "Phoenix, AZ 85001", "Mesa, AZ", "Los Angeles, CA", "Austin, TX 78701"]
+
+
+def synthetic_listings(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    listings = []
+    for i in range(n):
+        raw_data = {
+            'title': f"{rng.randint(2005, 2024)} Toyota Camry SE #{i}",
+            'url': f"https://www.cars.com/vehicledetail/{i}/",
+            'price': f"${rng.randint(3000, 60000):,}",
+            'mileage': f"{rng.randint(1000, 200000):,} mi.",
+            'location': rng.choice(CITIES),
+            'listing_date': rng.choice(["2026-01-15T10:30:00", "01/15/2026", "Jan 15, 2026", ""]),
+            'description': "Runs great, must sell. Call (520) 555-0199 or mail seller@example.com",
+            'images': [f"https://img.example.com/{i}.jpg"],
+        }
+        listings.append(RawListing(
+            source=DataSource.CARS_COM,
+            url=raw_data['url'],
+            scraped_at=datetime.now(),
+            raw_data=raw_data
+        ))
+    return listings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark listing normalization")
+    parser.add_argument("--listings", type=int, default=20000)
+    args = parser.parse_args()
+
+    listings = synthetic_listings(args.listings)
+    DataNormalizer.normalize_batch(listings[:10])  # warm gazetteer and validators
+
+    started = time.perf_counter()
+    for raw in listings:
+        DataNormalizer.normalize_listing(raw)
+    per_item = time.perf_counter() - started
+
+    started = time.perf_counter()
+    DataNormalizer.normalize_batch(listings)
+    batch = time.perf_counter() - started
+
+    print(json.dumps({
+        "listings": args.listings,
+        "per_item_listings_per_sec": round(args.listings / per_item),
+        "batch_listings_per_sec": round(args.listings / batch),
+        "speedup": round(per_item / batch, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
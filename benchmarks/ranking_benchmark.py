@@ -0,0 +1,119 @@
+"""
+Lead ranking benchmark: scoring and sorting intent dicts in Python versus
+LeadRanker.top_k over its columnar snapshot.
+
+Usage:
+    python -m benchmarks.ranking_benchmark --sizes 10000 100000 1000000 --k 100
+
+The Python baseline is timed on at most --loop-limit intents and scaled
+linearly beyond that (marked "extrapolated") to keep runs short.
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from services.ranking import URGENCY_SCORES, LeadRanker, budget_fit
+
+CITIES = ["Tucson", "Phoenix", "Mesa", "Los Angeles", "Austin"]
+WEIGHTS = {"confidence": 0.4, "urgency": 0.25, "freshness": 0.2, "contact": 0.1, "budget_fit": 0.05}
+HALF_LIFE_HOURS = 72.0
+
+
+def synthetic_intents(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    now = datetime.now()
+    ages = rng.uniform(0, 29 * 86400, n)
+    confidences = rng.uniform(0.3, 1.0, n).round(2)
+    urgencies = rng.choice(["high", "medium", "low"], n)
+    cities = rng.choice(CITIES, n)
+    prices = rng.integers(3000, 60000, n)
+    budgets = rng.integers(5000, 50000, n)
+    contacts = rng.random(n) < 0.4
+    lats = 32.2 + rng.normal(0, 2, n)
+    lons = -110.9 + rng.normal(0, 2, n)
+    return [
+        {
+            "intent_id": f"intent-{i}",
+            "city": str(cities[i]),
+            "intent_type": "car_buyer",
+            "urgency": str(urgencies[i]),
+            "confidence_score": float(confidences[i]),
+            "detected_at": (now - timedelta(seconds=float(ages[i]))).isoformat(),
+            "contact_available": bool(contacts[i]),
+            "budget_min": float(budgets[i]) * 0.8,
+            "budget_max": float(budgets[i]) * 1.2,
+            "source_listing": {"price": float(prices[i])},
+            "latitude": float(lats[i]),
+            "longitude": float(lons[i]),
+        }
+        for i in range(n)
+    ]
+
+
+def python_top_k(docs, filters, k: int, now: float):
+    """Per-request scoring of every matching dict, then a full sort"""
+    def score(doc):
+        age = now - datetime.fromisoformat(doc["detected_at"]).timestamp()
+        listing = doc.get("source_listing") or {}
+        return (
+            WEIGHTS["confidence"] * doc["confidence_score"]
+            + WEIGHTS["urgency"] * URGENCY_SCORES.get(doc["urgency"], 0.0)
+            + WEIGHTS["freshness"] * 2.0 ** (-age / (HALF_LIFE_HOURS * 3600))
+            + WEIGHTS["contact"] * (1.0 if doc["contact_available"] else 0.0)
+            + WEIGHTS["budget_fit"] * budget_fit(listing.get("price"), doc["budget_min"], doc["budget_max"])
+        )
+
+    matching = [
+        doc for doc in docs
+        if doc["confidence_score"] >= filters["min_confidence"]
+        and (not filters.get("location") or doc["city"] == filters["location"])
+    ]
+    return sorted(matching, key=score, reverse=True)[:k]
+
+
+def timed(func, repeat: int = 1) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def bench(n: int, k: int, loop_limit: int) -> dict:
+    docs = synthetic_intents(n)
+    ranker = LeadRanker(lambda since: iter([docs]), WEIGHTS, half_life_hours=HALF_LIFE_HOURS, refresh_seconds=0)
+    started = time.perf_counter()
+    ranker.ensure_loaded()
+    load_seconds = time.perf_counter() - started
+
+    now = time.time()
+    result = {"intents": n, "snapshot_load_s": round(load_seconds, 2)}
+    for name, filters in (
+        ("all", {"min_confidence": 0.5}),
+        ("city", {"min_confidence": 0.5, "location": "Tucson"}),
+        ("radius", {"min_confidence": 0.5, "latitude": 32.2, "longitude": -110.9, "radius_miles": 50}),
+    ):
+        ranker_ms = timed(lambda: ranker.top_k(filters, k, now=now), repeat=20)
+        entry = {"ranker_ms": round(ranker_ms, 2)}
+        if "radius_miles" not in filters:
+            sample = docs[:loop_limit]
+            python_ms = timed(lambda: python_top_k(sample, filters, k, now)) * (n / len(sample))
+            entry["python_ms"] = round(python_ms, 1)
+            entry["python_extrapolated"] = n > loop_limit
+            entry["speedup"] = round(python_ms / ranker_ms, 1)
+        result[name] = entry
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lead ranking top-K queries")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--k", type=int, default=100)
+    parser.add_argument("--loop-limit", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(json.dumps([bench(n, args.k, args.loop_limit) for n in args.sizes], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Radius filtering benchmark: the original per-listing geodesic loop versus
+vectorized haversine (brute force) and the SpatialIndex.
+
+Usage:
+    python -m benchmarks.spatial_benchmark --sizes 10000 100000 1000000
+
+The geodesic loop is timed on at most --loop-limit points and scaled
+linearly beyond that (marked "extrapolated") to keep runs short.
+"""
+import argparse
+import json
+import time
+import numpy as np
+from geopy.distance import geodesic
+from services.spatial_index import SpatialIndex, points_within_radius
+
+CENTER = (32.2217, -110.9265)  # Tucson, AZ
+RADIUS_MILES = 50.0
+
+
+def random_points(n: int, seed: int = 0):
+    """Points over the continental US, with a dense cluster around the query center"""
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(25.0, 49.0, n)
+    lons = rng.uniform(-124.0, -67.0, n)
+    clustered = rng.random(n) < 0.05
+    lats[clustered] = CENTER[0] + rng.normal(0, 0.5, clustered.sum())
+    lons[clustered] = CENTER[1] + rng.normal(0, 0.5, clustered.sum())
+    return lats, lons
+
+
+def timed(func, repeat: int = 1) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def bench(n: int, loop_limit: int, batch_centers: int) -> dict:
+    lats, lons = random_points(n)
+
+    loop_n = min(n, loop_limit)
+    loop_ms = timed(lambda: [
+        i for i in range(loop_n)
+        if geodesic(CENTER, (lats[i], lons[i])).miles <= RADIUS_MILES
+    ]) * (n / loop_n)
+
+    vectorized_ms = timed(lambda: np.nonzero(points_within_radius(lats, lons, CENTER, RADIUS_MILES)), repeat=5)
+
+    build_started = time.perf_counter()
+    index = SpatialIndex(lats, lons)
+    build_ms = (time.perf_counter() - build_started) * 1000
+    query_ms = timed(lambda: index.query_radius(CENTER[0], CENTER[1], RADIUS_MILES), repeat=50)
+
+    rng = np.random.default_rng(1)
+    centers = list(zip(rng.uniform(25.0, 49.0, batch_centers), rng.uniform(-124.0, -67.0, batch_centers)))
+    batch_ms = timed(lambda: index.query_radius_batch(centers, RADIUS_MILES))
+
+    matches = len(index.query_radius(CENTER[0], CENTER[1], RADIUS_MILES)[0])
+    return {
+        "points": n,
+        "matches": matches,
+        "geodesic_loop_ms": round(loop_ms, 2),
+        "geodesic_loop_extrapolated": loop_n < n,
+        "vectorized_haversine_ms": round(vectorized_ms, 3),
+        "index_build_ms": round(build_ms, 2),
+        "index_query_ms": round(query_ms, 3),
+        f"index_batch_{batch_centers}_centers_ms": round(batch_ms, 2),
+        "speedup_vs_loop": round(loop_ms / query_ms, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark radius filtering strategies")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--loop-limit", type=int, default=20_000)
+    parser.add_argument("--batch-centers", type=int, default=100)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        print(json.dumps(bench(n, args.loop_limit, args.batch_centers)))
+
+
+if __name__ == "__main__":
+    main()
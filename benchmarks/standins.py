@@ -0,0 +1,170 @@
+"""
+Local stand-ins for the external services the pipeline talks to, for
+benchmarks that must not depend on (or pay for) the real ones.
+
+- FakeOpenAIServer: OpenAI-compatible /v1/chat/completions returning intent
+  JSON after a configurable latency, failing a configurable share of calls
+- MarketplaceFixtureServer: Cars.com-style search result pages with
+  deterministic synthetic listings (the markup CarsComConnector parses)
+
+Both run on 127.0.0.1 in a daemon thread and can be used as context managers.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+CITIES = ["Tucson, AZ", "Phoenix, AZ", "Mesa, AZ", "Los Angeles, CA", "Austin, TX"]
+MODELS = ["Toyota Camry SE", "Honda Civic LX", "Ford F-150 XLT", "Jeep Wrangler Sport", "Tesla Model 3"]
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _BackgroundServer:
+    handler_class = _QuietHandler
+
+    def __init__(self):
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        handler = type(self.handler_class.__name__, (self.handler_class,), {"standin": self})
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _OpenAIHandler(_QuietHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        status, payload = self.standin.respond(body)
+        self._send(status, json.dumps(payload).encode(), "application/json")
+
+
+class FakeOpenAIServer(_BackgroundServer):
+    """Chat completions stand-in; point OPENAI_BASE_URL at `base_url`"""
+
+    handler_class = _OpenAIHandler
+
+    def __init__(self, latency_ms: float = 300.0, error_rate: float = 0.0, seed: int = 0):
+        super().__init__()
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.url}/v1"
+
+    def respond(self, body: bytes):
+        with self._lock:
+            self.requests += 1
+            # Jitter of +-25% around the configured latency, like a real model endpoint
+            delay = self.latency_ms * self._rng.uniform(0.75, 1.25) / 1000
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        time.sleep(delay)
+        if failed:
+            return 500, {"error": {"message": "Injected failure", "type": "server_error"}}
+
+        # The same listing always gets the same answer, so runs are comparable
+        digest = hashlib.sha256(body).digest()
+        content = {
+            "urgency": ("high", "medium", "low")[digest[0] % 3],
+            "confidence_score": round(0.5 + digest[1] / 255 * 0.5, 2),
+            "purchase_timeline": ("within 1 week", "2-4 weeks", "1-2 months")[digest[2] % 3],
+            "budget_min": 10000 + digest[3] * 50,
+            "budget_max": 20000 + digest[3] * 80,
+            "keywords": ["low mileage", "clean title"],
+            "preferences": {"vehicle_type": "sedan"}
+        }
+        return 200, {
+            "id": f"chatcmpl-{digest.hex()[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "fake-model",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(content)},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": len(body) // 4, "completion_tokens": 60, "total_tokens": len(body) // 4 + 60}
+        }
+
+
+class _MarketplaceHandler(_QuietHandler):
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        page = int(query.get("page", ["1"])[0])
+        self._send(200, self.standin.render_page(page).encode(), "text/html; charset=utf-8")
+
+
+class MarketplaceFixtureServer(_BackgroundServer):
+    """Search result pages with `listings_per_page` cards; point a connector's BASE_URL at `url`"""
+
+    handler_class = _MarketplaceHandler
+
+    def __init__(self, listings_per_page: int = 25, pages: int = 20, seed: int = 0):
+        super().__init__()
+        self.listings_per_page = listings_per_page
+        self.pages = pages
+        self.seed = seed
+
+    def render_page(self, page: int) -> str:
+        cards = []
+        if 1 <= page <= self.pages:
+            rng = random.Random(self.seed * 100003 + page)
+            for index in range(self.listings_per_page):
+                listing_id = page * 10000 + index
+                cards.append(
+                    '<div class="vehicle-card">'
+                    f'<h2 class="title"><a href="/vehicledetail/{listing_id}/">'
+                    f'{rng.randint(2008, 2024)} {escape(rng.choice(MODELS))}</a></h2>'
+                    f'<span class="primary-price">${rng.randint(4000, 65000):,}</span>'
+                    f'<div class="mileage">{rng.randint(1000, 180000):,} mi.</div>'
+                    f'<div class="miles-from">{escape(rng.choice(CITIES))}</div>'
+                    f'<div class="dealer-name">Dealer {rng.randint(1, 40)}</div>'
+                    f'<img class="vehicle-image" src="https://img.example.com/{listing_id}.jpg">'
+                    '</div>'
+                )
+        return f"<html><body><div class=\"vehicle-cards\">{''.join(cards)}</div></body></html>"
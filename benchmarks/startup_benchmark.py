@@ -0,0 +1,67 @@
+"""
+Cold-start benchmark for the API process.
+
+Each sample runs in a fresh interpreter and measures:
+- import time of app.main
+- time from process start to the first successful GET /health
+
+Usage:
+    python -m benchmarks.startup_benchmark --runs 5 --budget-ms 1500
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = r"""
+import json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    response = client.get("/health")
+    response.raise_for_status()
+first_request = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "first_request_ms": (first_request - started) * 1000,
+}))
+"""
+
+
+def run_sample() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        check=True,
+        capture_output=True,
+        text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API cold-start time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Fail if median time to first request exceeds this budget")
+    args = parser.parse_args()
+
+    samples = [run_sample() for _ in range(args.runs)]
+    report = {
+        metric: {
+            "median": round(statistics.median(s[metric] for s in samples), 1),
+            "max": round(max(s[metric] for s in samples), 1),
+        }
+        for metric in ("import_ms", "first_request_ms")
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.budget_ms is not None and report["first_request_ms"]["median"] > args.budget_ms:
+        print(f"Cold start over budget: {report['first_request_ms']['median']}ms > {args.budget_ms}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
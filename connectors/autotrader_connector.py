@@ -7,6 +7,8 @@ from app.models import RawListing, DataSource
 from app.config import settings
 from connectors.base_connector import BaseConnector
 from utils.logger import logger
+from utils.metrics import SCRAPE_ERRORS
+from utils.helpers import clean_price, clean_mileage
 
 
 class AutoTraderConnector(BaseConnector):
@@ -24,14 +26,15 @@ class AutoTraderConnector(BaseConnector):
         self,
         location: str,
         radius_miles: int = 50,
-        max_results: int = 50
+        max_results: int = 50,
+        page: int = 1
     ) -> List[RawListing]:
         """Fetch car listings from AutoTrader"""
         listings = []
         
         # Extract ZIP from location (simplified - you'd want geocoding here)
         zip_code = self._extract_zip(location)
-        search_url = self._build_search_url(zip_code, radius_miles)
+        search_url = self._build_search_url(zip_code, radius_miles, (page - 1) * max_results)
         
         logger.info(f"Fetching listings from AutoTrader: {search_url}")
         
@@ -50,19 +53,21 @@ class AutoTraderConnector(BaseConnector):
                         source=DataSource.AUTOTRADER,
                         url=raw_data.get('url', ''),
                         scraped_at=datetime.now(),
-                        raw_html=str(card),
+                        raw_html=str(card) if settings.keep_raw_html else None,
                         raw_data=raw_data
                     )
                     listings.append(listing)
                     
                 except Exception as e:
                     logger.warning(f"Failed to parse AutoTrader listing: {e}")
+                    SCRAPE_ERRORS.labels(self.source_name, 'parse').inc()
                     continue
                 
                 time.sleep(settings.scraping_delay_seconds)
         
         except Exception as e:
             logger.error(f"Error fetching AutoTrader listings: {e}")
+            SCRAPE_ERRORS.labels(self.source_name, 'fetch').inc()
         
         logger.info(f"Fetched {len(listings)} listings from AutoTrader")
         return listings
@@ -80,20 +85,12 @@ class AutoTraderConnector(BaseConnector):
         # Price
         price_elem = soup.find('span', class_='item-price')
         if price_elem:
-            price_text = price_elem.get_text(strip=True).replace('$', '').replace(',', '')
-            try:
-                data['price'] = float(price_text)
-            except:
-                data['price'] = None
+            data['price'] = clean_price(price_elem.get_text(strip=True))
         
         # Mileage
         mileage_elem = soup.find('span', class_='item-mileage')
         if mileage_elem:
-            mileage_text = mileage_elem.get_text(strip=True).replace(',', '').replace(' mi', '')
-            try:
-                data['mileage'] = int(mileage_text)
-            except:
-                data['mileage'] = None
+            data['mileage'] = clean_mileage(mileage_elem.get_text(strip=True))
         
         # Location
         location_elem = soup.find('span', class_='item-location')
@@ -102,9 +99,9 @@ class AutoTraderConnector(BaseConnector):
         
         return data
     
-    def _build_search_url(self, zip_code: str, radius_miles: int) -> str:
+    def _build_search_url(self, zip_code: str, radius_miles: int, first_record: int = 0) -> str:
         """Build AutoTrader search URL"""
-        return f"{self.BASE_URL}/cars-for-sale/all-cars/{zip_code}?searchRadius={radius_miles}"
+        return f"{self.BASE_URL}/cars-for-sale/all-cars/{zip_code}?searchRadius={radius_miles}&firstRecord={first_record}"
     
     def _extract_zip(self, location: str) -> str:
         """Extract or default ZIP code from location string"""
@@ -14,9 +14,10 @@ class BaseConnector(ABC):
         self,
         location: str,
         radius_miles: int,
-        max_results: int
+        max_results: int,
+        page: int = 1
     ) -> List[RawListing]:
-        """Fetch listings from the data source"""
+        """Fetch one page (of max_results listings) from the data source"""
         pass
     
     @abstractmethod
@@ -8,6 +8,8 @@ from app.models import RawListing, DataSource
 from app.config import settings
 from connectors.base_connector import BaseConnector
 from utils.logger import logger
+from utils.metrics import SCRAPE_ERRORS
+from utils.helpers import clean_price, clean_mileage
 
 
 class CarsComConnector(BaseConnector):
@@ -25,13 +27,14 @@ class CarsComConnector(BaseConnector):
         self,
         location: str,
         radius_miles: int = 50,
-        max_results: int = 50
+        max_results: int = 50,
+        page: int = 1
     ) -> List[RawListing]:
         """Fetch car listings from Cars.com"""
         listings = []
         
         # Build search URL
-        search_url = self._build_search_url(location, radius_miles)
+        search_url = self._build_search_url(location, radius_miles, page)
         logger.info(f"Fetching listings from: {search_url}")
         
         try:
@@ -49,13 +52,14 @@ class CarsComConnector(BaseConnector):
                         source=DataSource.CARS_COM,
                         url=raw_data.get('url', ''),
                         scraped_at=datetime.now(),
-                        raw_html=str(card),
+                        raw_html=str(card) if settings.keep_raw_html else None,
                         raw_data=raw_data
                     )
                     listings.append(listing)
                     
                 except Exception as e:
                     logger.warning(f"Failed to parse listing: {e}")
+                    SCRAPE_ERRORS.labels(self.source_name, 'parse').inc()
                     continue
                 
                 # Respectful delay
@@ -63,6 +67,7 @@ class CarsComConnector(BaseConnector):
         
         except Exception as e:
             logger.error(f"Error fetching Cars.com listings: {e}")
+            SCRAPE_ERRORS.labels(self.source_name, 'fetch').inc()
         
         logger.info(f"Fetched {len(listings)} listings from Cars.com")
         return listings
@@ -83,20 +88,12 @@ class CarsComConnector(BaseConnector):
         # Price
         price_elem = soup.find('span', class_='primary-price')
         if price_elem:
-            price_text = price_elem.get_text(strip=True).replace('$', '').replace(',', '')
-            try:
-                data['price'] = float(price_text)
-            except:
-                data['price'] = None
+            data['price'] = clean_price(price_elem.get_text(strip=True))
         
         # Mileage
         mileage_elem = soup.find('div', class_='mileage')
         if mileage_elem:
-            mileage_text = mileage_elem.get_text(strip=True).replace(',', '').replace(' mi.', '')
-            try:
-                data['mileage'] = int(mileage_text)
-            except:
-                data['mileage'] = None
+            data['mileage'] = clean_mileage(mileage_elem.get_text(strip=True))
         
         # Location
         location_elem = soup.find('div', class_='miles-from')
@@ -116,8 +113,8 @@ class CarsComConnector(BaseConnector):
         
         return data
     
-    def _build_search_url(self, location: str, radius_miles: int = 50) -> str:
+    def _build_search_url(self, location: str, radius_miles: int = 50, page: int = 1) -> str:
         """Build Cars.com search URL"""
         # Clean location (e.g., "Tucson, AZ" -> "tucson-az")
         location_slug = location.lower().replace(', ', '-').replace(' ', '-')
-        return f"{self.BASE_URL}/shopping/results/?stock_type=all&makes[]=&models[]=&list_price_max=&maximum_distance={radius_miles}&zip={location_slug}"
+        return f"{self.BASE_URL}/shopping/results/?stock_type=all&makes[]=&models[]=&list_price_max=&maximum_distance={radius_miles}&zip={location_slug}&page={page}"
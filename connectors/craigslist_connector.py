@@ -7,6 +7,8 @@ from app.models import RawListing, DataSource
 from app.config import settings
 from connectors.base_connector import BaseConnector
 from utils.logger import logger
+from utils.metrics import SCRAPE_ERRORS
+from utils.helpers import clean_price
 
 
 class CraigslistConnector(BaseConnector):
@@ -22,14 +24,15 @@ class CraigslistConnector(BaseConnector):
         self,
         location: str,
         radius_miles: int = 50,
-        max_results: int = 50
+        max_results: int = 50,
+        page: int = 1
     ) -> List[RawListing]:
         """Fetch car listings from Craigslist"""
         listings = []
         
         # Map location to Craigslist subdomain
         subdomain = self._get_subdomain(location)
-        search_url = self._build_search_url(subdomain)
+        search_url = self._build_search_url(subdomain, (page - 1) * max_results)
         
         logger.info(f"Fetching listings from Craigslist: {search_url}")
         
@@ -48,19 +51,21 @@ class CraigslistConnector(BaseConnector):
                         source=DataSource.CRAIGSLIST,
                         url=raw_data.get('url', ''),
                         scraped_at=datetime.now(),
-                        raw_html=str(item),
+                        raw_html=str(item) if settings.keep_raw_html else None,
                         raw_data=raw_data
                     )
                     listings.append(listing)
                     
                 except Exception as e:
                     logger.warning(f"Failed to parse Craigslist listing: {e}")
+                    SCRAPE_ERRORS.labels(self.source_name, 'parse').inc()
                     continue
                 
                 time.sleep(settings.scraping_delay_seconds)
         
         except Exception as e:
             logger.error(f"Error fetching Craigslist listings: {e}")
+            SCRAPE_ERRORS.labels(self.source_name, 'fetch').inc()
         
         logger.info(f"Fetched {len(listings)} listings from Craigslist")
         return listings
@@ -79,11 +84,7 @@ class CraigslistConnector(BaseConnector):
         # Price
         price_elem = soup.find('span', class_='result-price')
         if price_elem:
-            price_text = price_elem.get_text(strip=True).replace('$', '').replace(',', '')
-            try:
-                data['price'] = float(price_text)
-            except:
-                data['price'] = None
+            data['price'] = clean_price(price_elem.get_text(strip=True))
         
         # Location
         location_elem = soup.find('span', class_='result-hood')
@@ -97,9 +98,9 @@ class CraigslistConnector(BaseConnector):
         
         return data
     
-    def _build_search_url(self, subdomain: str) -> str:
+    def _build_search_url(self, subdomain: str, offset: int = 0) -> str:
         """Build Craigslist search URL"""
-        return f"https://{subdomain}.craigslist.org/search/cta"
+        return f"https://{subdomain}.craigslist.org/search/cta?s={offset}"
     
     def _get_subdomain(self, location: str) -> str:
         """Map location to Craigslist subdomain"""
@@ -0,0 +1,43 @@
+import importlib
+import threading
+from typing import Dict, Optional
+from app.models import DataSource
+from connectors.base_connector import BaseConnector
+
+
+# Import paths rather than classes, so requests/bs4/lxml load only when a source is used
+CONNECTOR_PATHS = {
+    DataSource.CARS_COM: "connectors.cars_com_connector:CarsComConnector",
+    DataSource.AUTOTRADER: "connectors.autotrader_connector:AutoTraderConnector",
+    DataSource.CRAIGSLIST: "connectors.craigslist_connector:CraigslistConnector",
+}
+
+_connectors: Dict[DataSource, BaseConnector] = {}
+_lock = threading.Lock()
+
+
+def get_connector(source: DataSource) -> Optional[BaseConnector]:
+    """Return the shared connector for a source, instantiating it on first use"""
+    connector = _connectors.get(source)
+    if connector is not None:
+        return connector
+
+    path = CONNECTOR_PATHS.get(source)
+    if path is None:
+        return None
+
+    with _lock:
+        if source not in _connectors:
+            module_name, class_name = path.split(':')
+            connector_class = getattr(importlib.import_module(module_name), class_name)
+            _connectors[source] = connector_class()
+        return _connectors[source]
+
+
+def override_connector(source: DataSource, connector: Optional[BaseConnector]):
+    """Install a stand-in connector for a source; None restores lazy creation"""
+    with _lock:
+        if connector is None:
+            _connectors.pop(source, None)
+        else:
+            _connectors[source] = connector
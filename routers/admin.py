@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from utils.helpers import is_admin_key
+from utils.profiling import list_profiles, profile_path
+from typing import Optional
+
+
+def require_admin(x_admin_key: Optional[str] = Header(None)):
+    """Reject requests without the configured X-Admin-Key"""
+    if not settings.admin_api_key:
+        raise HTTPException(status_code=403, detail="Admin API is disabled (ADMIN_API_KEY is not set)")
+    if not is_admin_key(x_admin_key):
+        raise HTTPException(status_code=401, detail="Invalid admin key")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles")
+async def get_profiles():
+    """
+    Captured CPU and memory profiles, newest first
+    
+    Profile a request by sending `X-Profile: cpu`, `memory` or `cpu,memory`
+    (with X-Admin-Key); the response carries an `X-Profile-Id` header. The
+    same header on POST /ingestion/start profiles the whole ingestion job.
+    """
+    return {
+        "enabled": settings.profiling_enabled,
+        "directory": settings.profiling_dir,
+        "profiles": await run_in_threadpool(list_profiles)
+    }
+
+
+@router.get("/profiles/{name}")
+async def download_profile(name: str):
+    """Download one profile file (.cpu.html call tree or .memory.txt allocation report)"""
+    path = profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    media_type = "text/html" if name.endswith(".html") else "text/plain"
+    return FileResponse(path, media_type=media_type, filename=name)
@@ -1,71 +1,22 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from app.models import IngestionRequest, DataSource
-from connectors.cars_com_connector import CarsComConnector
-from connectors.autotrader_connector import AutoTraderConnector
-from connectors.craigslist_connector import CraigslistConnector
-from services.normalizer import DataNormalizer
-from services.ai_enrichment import AIEnrichmentService
-from app.database import db_manager
+from fastapi import APIRouter, Header, HTTPException
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.models import IngestionRequest, JobStatus
+from services.ingestion import process_ingestion
+from services.jobs import FINISHED_STATUSES, JobQueueFullError, get_job_registry
+from app.database import get_db_manager
 from utils.logger import logger
-from typing import Dict, Any
+from utils.profiling import requested_kinds
+from typing import Dict, Any, Optional
 
 router = APIRouter()
 
-# Initialize connectors
-connectors = {
-    DataSource.CARS_COM: CarsComConnector(),
-    DataSource.AUTOTRADER: AutoTraderConnector(),
-    DataSource.CRAIGSLIST: CraigslistConnector()
-}
-
-
-async def process_ingestion(request: IngestionRequest):
-    """Background task to process data ingestion"""
-    total_intents = 0
-    
-    for source in request.sources:
-        connector = connectors.get(source)
-        if not connector:
-            logger.warning(f"No connector for source: {source}")
-            continue
-        
-        try:
-            # Step 1: Fetch raw listings
-            logger.info(f"📥 Fetching listings from {source}...")
-            raw_listings = await connector.fetch_listings(
-                location=request.location,
-                radius_miles=request.radius_miles,
-                max_results=request.max_listings
-            )
-            
-            # Step 2: Normalize data
-            logger.info(f"🔄 Normalizing {len(raw_listings)} listings...")
-            for raw_listing in raw_listings:
-                try:
-                    normalized = DataNormalizer.normalize_listing(raw_listing)
-                    db_manager.save_normalized_listing(normalized)
-                    
-                    # Step 3: AI enrichment
-                    logger.info(f"🤖 Enriching with AI: {normalized.listing_id}...")
-                    intent = await AIEnrichmentService.enrich_listing(normalized)
-                    db_manager.save_consumer_intent(intent)
-                    
-                    total_intents += 1
-                    
-                except Exception as e:
-                    logger.error(f"Failed to process listing: {e}")
-                    continue
-        
-        except Exception as e:
-            logger.error(f"Error processing source {source}: {e}")
-    
-    logger.info(f"✅ Ingestion complete: {total_intents} consumer intents detected")
-
 
 @router.post("/start", response_model=Dict[str, Any])
 async def start_ingestion(
     request: IngestionRequest,
-    background_tasks: BackgroundTasks
+    x_profile: Optional[str] = Header(None, description="Profile the job: cpu, memory or cpu,memory (admins only)"),
+    x_admin_key: Optional[str] = Header(None)
 ):
     """
     Start data ingestion from specified sources
@@ -74,14 +25,40 @@ async def start_ingestion(
     - **radius_miles**: Search radius in miles
     - **sources**: List of data sources to scrape
     - **max_listings**: Maximum listings per source
+    
+    Returns a job id; poll GET /status/{job_id} for progress. With
+    INGESTION_BACKEND=queue the request is split into page tasks for
+    ingest-worker processes instead; poll GET /queue/{run_id}.
+    
+    With profiling enabled, an admin's X-Profile header captures a profile of
+    the whole job (listed under GET /api/v1/admin/profiles).
     """
     logger.info(f"🚀 Starting ingestion for {request.location}")
     
-    # Add to background tasks
-    background_tasks.add_task(process_ingestion, request)
+    if settings.ingestion_backend == "queue":
+        from services.work_queue import enqueue_request, get_work_queue
+        
+        enqueued = await run_in_threadpool(enqueue_request, get_work_queue(), request)
+        return {
+            "status": "enqueued",
+            **enqueued,
+            "message": f"Data ingestion queued for {request.location}",
+            "location": request.location,
+            "sources": [s.value for s in request.sources],
+            "max_listings": request.max_listings
+        }
+    
+    try:
+        job = get_job_registry().submit(
+            request, process_ingestion, profile=requested_kinds(x_profile, x_admin_key) or None
+        )
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
     
     return {
-        "status": "started",
+        "status": job.status.value,
+        "job_id": job.job_id,
+        "profile_id": job.profile.profile_id if job.profile else None,
         "message": f"Data ingestion initiated for {request.location}",
         "location": request.location,
         "sources": [s.value for s in request.sources],
@@ -92,8 +69,74 @@ async def start_ingestion(
 @router.get("/status")
 async def get_ingestion_status():
     """Get current ingestion status"""
-    # In production, track via Redis or database
+    registry = get_job_registry()
     return {
         "status": "operational",
-        "message": "Use POST /start to begin data collection"
+        "running": registry.count(JobStatus.RUNNING),
+        "queued": registry.count(JobStatus.QUEUED),
+        "max_concurrent_jobs": registry.max_concurrent,
+        "jobs": [
+            {"job_id": job.job_id, "status": job.status.value, "created_at": job.created_at.isoformat()}
+            for job in reversed(registry.jobs())
+        ]
+    }
+
+
+@router.get("/queue")
+async def get_queue_stats():
+    """Work queue task counts by status (pending, leased, done, dead)"""
+    from services.work_queue import get_work_queue
+    
+    return await run_in_threadpool(get_work_queue().stats)
+
+
+@router.get("/queue/{run_id}")
+async def get_queue_run(run_id: str):
+    """Task counts by status for one queued ingestion run"""
+    from services.work_queue import get_work_queue
+    
+    counts = await run_in_threadpool(get_work_queue().stats, run_id)
+    if not any(counts.values()):
+        raise HTTPException(status_code=404, detail="Run not found")
+    return {"run_id": run_id, "tasks": counts}
+
+
+@router.get("/status/{job_id}")
+async def get_job_status(job_id: str):
+    """Progress, per-stage counters, rates, ETA and token spend of one ingestion job"""
+    job = get_job_registry().get(job_id)
+    if job is not None:
+        return job.snapshot()
+    
+    # Jobs from a previous process (or evicted from history) are served from storage
+    snapshot = await get_db_manager().aget_ingestion_job(job_id)
+    if not snapshot:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return snapshot
+
+
+@router.post("/cancel/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running ingestion job"""
+    job = get_job_registry().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return {
+        "job_id": job.job_id,
+        "status": job.status.value,
+        "cancel_requested": job.status not in FINISHED_STATUSES
+    }
+
+
+@router.get("/schedule")
+async def get_schedule():
+    """Recurring crawl shards with their interval, phase offset and next run"""
+    from services.scheduler import get_ingestion_scheduler
+    
+    scheduler = get_ingestion_scheduler()
+    return {
+        "enabled": settings.scheduler_enabled,
+        "running": scheduler.running,
+        "shards": scheduler.get_schedule()
     }
@@ -1,15 +1,133 @@
-from fastapi import APIRouter, HTTPException, Query
-from app.models import IntentQueryRequest, IntentType, IntentUrgency
-from app.database import db_manager
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.models import IntentBatchGetRequest, IntentQueryRequest, IntentType, IntentUrgency
+from app.database import DatabaseManager, QueryTooBroadError, get_db_manager, normalize_field_paths, project_document
+from routers.admin import require_admin
+from services.cache import intent_cache
+from services.export import get_intent_exporter
+from services.geofencing import get_geofencing_service
+from services.live_feed import LAGGED, Subscription, get_intent_feed
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from utils.logger import logger
+from utils.responses import FastJSONResponse, dumps
+import asyncio
 
 router = APIRouter()
 
+FIELDS_DESCRIPTION = (
+    "Comma-separated fields to return, e.g. intent_id,urgency,confidence_score,city "
+    "(nested listing fields as source_listing.price)"
+)
+SSE_RETRY_MS = 3000  # EventSource reconnect delay
 
-@router.post("/query", response_model=Dict[str, Any])
-async def query_intents(request: IntentQueryRequest):
+
+def _field_paths(fields: Optional[str]):
+    try:
+        return normalize_field_paths(fields.split(',') if fields else None)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+async def _resolve_filters(request: IntentQueryRequest, field_paths=None) -> Dict[str, Any]:
+    """DatabaseManager query filters for a request, geocoding `location` when it is the radius center"""
+    city = request.location
+    latitude, longitude = request.latitude, request.longitude
+    if request.radius_miles is not None and latitude is None:
+        coords = await run_in_threadpool(get_geofencing_service().geocode_location, request.location)
+        if not coords:
+            raise HTTPException(status_code=422, detail=f"Could not geocode location: {request.location}")
+        latitude, longitude = coords
+        city = None
+    
+    bbox = request.bbox
+    return DatabaseManager._query_filters(
+        location=city,
+        intent_type=request.intent_type.value if request.intent_type else None,
+        min_confidence=request.min_confidence,
+        urgency=request.urgency.value if request.urgency else None,
+        start_date=request.start_date,
+        end_date=request.end_date,
+        limit=request.limit,
+        latitude=latitude,
+        longitude=longitude,
+        radius_miles=request.radius_miles,
+        bbox=(bbox.min_latitude, bbox.min_longitude, bbox.max_latitude, bbox.max_longitude) if bbox else None,
+        order_by_distance=request.order_by_distance,
+        fields=field_paths,
+        sort=request.sort.value
+    )
+
+
+def _subscription_filters(
+    location: Optional[str] = Query(None, description="City filter, or the center with radius_miles"),
+    intent_type: Optional[IntentType] = Query(None),
+    min_confidence: float = Query(0.5),
+    urgency: Optional[IntentUrgency] = Query(None),
+    latitude: Optional[float] = Query(None),
+    longitude: Optional[float] = Query(None),
+    radius_miles: Optional[float] = Query(None),
+    bbox: Optional[str] = Query(None, description="min_latitude,min_longitude,max_latitude,max_longitude")
+) -> Dict[str, Any]:
+    """Feed filters as query parameters; validated like an IntentQueryRequest by _subscription_request"""
+    return {
+        "location": location,
+        "intent_type": intent_type,
+        "min_confidence": min_confidence,
+        "urgency": urgency,
+        "latitude": latitude,
+        "longitude": longitude,
+        "radius_miles": radius_miles,
+        "bbox": bbox
+    }
+
+
+def _subscription_request(params: Dict[str, Any]) -> IntentQueryRequest:
+    """Raises ValueError (pydantic ValidationError included) for invalid filters"""
+    params = dict(params)
+    if params["bbox"]:
+        parts = params["bbox"].split(',')
+        if len(parts) != 4:
+            raise ValueError("bbox must be min_latitude,min_longitude,max_latitude,max_longitude")
+        params["bbox"] = dict(zip(("min_latitude", "min_longitude", "max_latitude", "max_longitude"), parts))
+    return IntentQueryRequest(**params)
+
+
+async def _next_event(subscription: Subscription):
+    """The subscription's next event, LAGGED, or None when a heartbeat is due"""
+    try:
+        return await asyncio.wait_for(subscription.get(), timeout=settings.live_feed_heartbeat_seconds)
+    except asyncio.TimeoutError:
+        return None
+
+
+async def _sse_stream(filters: Dict[str, Any], last_event_id: Optional[str], field_paths):
+    feed = get_intent_feed()
+    subscription = await feed.subscribe(filters, last_event_id)
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        while True:
+            event = await _next_event(subscription)
+            if event is None:
+                yield ": keepalive\n\n"
+            elif event is LAGGED:
+                yield "event: lagged\ndata: {}\n\n"
+                return
+            else:
+                data = dumps(project_document(event.doc, field_paths) if field_paths else event.doc).decode()
+                yield f"id: {event.event_id}\nevent: intent\ndata: {data}\n\n"
+    finally:
+        feed.unsubscribe(subscription)
+
+
+@router.post("/query", response_class=FastJSONResponse)
+async def query_intents(
+    request: IntentQueryRequest,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db_manager: DatabaseManager = Depends(get_db_manager)
+):
     """
     Query consumer intents with filters
     
@@ -20,54 +138,227 @@ async def query_intents(request: IntentQueryRequest):
     - **start_date**: Filter intents after this date
     - **end_date**: Filter intents before this date
     - **limit**: Maximum results to return
+    - **latitude** / **longitude** + **radius_miles**: Intents within a radius
+      (with only **location** + **radius_miles**, the location is the center)
+    - **bbox**: Intents inside a bounding box
+    - **order_by_distance**: Nearest first instead of newest first
+    - Radius and bbox searches cover **start_date**..**end_date**, or the last
+      30 days without **start_date**; windows over 90 days are rejected (422)
+    - **sort**: `recent` (newest first) or `score` (best leads first: a weighted
+      blend of confidence, urgency, freshness, contact availability and budget
+      fit; each result carries its `score`)
+    - **fields** (query parameter): Return only these fields of each intent
     """
+    field_paths = _field_paths(fields)
+    filters = await _resolve_filters(request, field_paths)
     try:
-        results = db_manager.query_intents(
-            location=request.location,
-            intent_type=request.intent_type.value if request.intent_type else None,
-            min_confidence=request.min_confidence,
-            urgency=request.urgency.value if request.urgency else None,
-            start_date=request.start_date,
-            end_date=request.end_date,
-            limit=request.limit
-        )
+        results = await db_manager.aquery_intents(**filters)
         
         logger.info(f"📊 Query returned {len(results)} consumer intents")
         
-        return {
+        # Stored documents are already JSON data: render them directly, without revalidation
+        return FastJSONResponse({
             "total_results": len(results),
             "filters_applied": {
                 "location": request.location,
                 "intent_type": request.intent_type,
                 "min_confidence": request.min_confidence,
-                "urgency": request.urgency
+                "urgency": request.urgency,
+                "center": [filters['latitude'], filters['longitude']] if request.radius_miles is not None else None,
+                "radius_miles": request.radius_miles,
+                "bbox": request.bbox,
+                "sort": request.sort
             },
             "intents": results
-        }
+        })
     
+    except QueryTooBroadError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logger.error(f"Query failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{intent_id}", response_model=Dict[str, Any])
-async def get_intent_by_id(intent_id: str):
+@router.post("/batch-get", response_class=FastJSONResponse)
+async def batch_get_intents(
+    request: IntentBatchGetRequest,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db_manager: DatabaseManager = Depends(get_db_manager)
+):
+    """
+    Retrieve up to 5000 consumer intents by ID in one call
+    
+    Ids are resolved from the cache first and the rest with batched reads.
+    **intents** follows the order of **intent_ids**, with null for ids that
+    were not found (also listed in **missing**).
+    """
+    field_paths = _field_paths(fields)
+    try:
+        intents = await db_manager.aget_intents_by_ids(request.intent_ids, fields=field_paths)
+    except Exception as e:
+        logger.error(f"Batch get failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    missing = [intent_id for intent_id, intent in zip(request.intent_ids, intents) if intent is None]
+    return FastJSONResponse({
+        "total_requested": len(request.intent_ids),
+        "found": len(intents) - len(missing),
+        "missing": missing,
+        "intents": intents
+    })
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Hit/miss counters and occupancy of the intent read cache"""
+    return intent_cache.get_stats()
+
+
+@router.post("/export", dependencies=[Depends(require_admin)])
+async def start_export(
+    background_tasks: BackgroundTasks,
+    full: bool = Query(False, description="Re-export everything instead of only intents since the watermark")
+):
+    """
+    Export intents to a Parquet dataset partitioned by detection date and state
+    
+    Admin only (X-Admin-Key). Runs in the background; poll GET /export/status
+    for the watermark and last run.
+    """
+    exporter = get_intent_exporter()
+    # Reserved here rather than checked, so two requests cannot both start a run
+    if not exporter.acquire():
+        raise HTTPException(status_code=409, detail="An export is already running")
+    
+    background_tasks.add_task(exporter.run, full, acquired=True)
+    
+    return {
+        "status": "started",
+        "output_dir": exporter.output_dir,
+        "since": None if full else exporter.get_state().get('watermark')
+    }
+
+
+@router.get("/export/status")
+async def get_export_status():
+    """Watermark and summary of the most recent export"""
+    exporter = get_intent_exporter()
+    return {
+        "running": exporter.running,
+        "output_dir": exporter.output_dir,
+        **exporter.get_state()
+    }
+
+
+@router.get("/stream")
+async def stream_intents(
+    filters: Dict[str, Any] = Depends(_subscription_filters),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    last_event_id: Optional[str] = Query(None, description="Resume after this event id (EventSource sends the Last-Event-ID header itself)"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Server-sent events feed of newly detected intents matching the filters
+    
+    Takes the /query filters as query parameters (bbox as
+    `min_lat,min_lon,max_lat,max_lon`). Each intent arrives as an `intent`
+    event with an id; a client that reconnects with Last-Event-ID gets the
+    intents it missed from the recent-events buffer. A client that falls too
+    far behind receives a `lagged` event and is disconnected, and should
+    reconnect to resume.
+    """
+    field_paths = _field_paths(fields)
+    try:
+        request = _subscription_request(filters)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    return StreamingResponse(
+        _sse_stream(await _resolve_filters(request), last_event_id_header or last_event_id, field_paths),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def intents_websocket(
+    websocket: WebSocket,
+    filters: Dict[str, Any] = Depends(_subscription_filters),
+    fields: Optional[str] = Query(None),
+    last_event_id: Optional[str] = Query(None)
+):
+    """
+    The /stream feed over a WebSocket
+    
+    Messages are JSON: {"type": "intent", "id": ..., "intent": {...}},
+    {"type": "heartbeat"}, and {"type": "lagged"} before closing with 1013.
+    Invalid filters close the socket with 1008.
+    """
+    await websocket.accept()
+    try:
+        field_paths = normalize_field_paths(fields.split(',') if fields else None)
+        resolved = await _resolve_filters(_subscription_request(filters))
+    except (ValueError, HTTPException) as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(getattr(e, 'detail', e))[:120])
+        return
+    
+    feed = get_intent_feed()
+    subscription = await feed.subscribe(resolved, last_event_id)
+    try:
+        while True:
+            event = await _next_event(subscription)
+            if event is None:
+                await websocket.send_text('{"type":"heartbeat"}')
+            elif event is LAGGED:
+                await websocket.send_text('{"type":"lagged"}')
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+                return
+            else:
+                intent = project_document(event.doc, field_paths) if field_paths else event.doc
+                await websocket.send_text(dumps({"type": "intent", "id": event.event_id, "intent": intent}).decode())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        feed.unsubscribe(subscription)
+
+
+@router.get("/{intent_id}", response_class=FastJSONResponse)
+async def get_intent_by_id(
+    intent_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db_manager: DatabaseManager = Depends(get_db_manager)
+):
     """Retrieve a specific consumer intent by ID"""
-    intent = db_manager.get_intent_by_id(intent_id)
+    intent = await db_manager.aget_intent_by_id(intent_id, fields=_field_paths(fields))
     
     if not intent:
         raise HTTPException(status_code=404, detail="Intent not found")
     
-    return intent
+    return FastJSONResponse(intent)
 
 
 @router.get("/stats/summary")
-async def get_stats_summary():
-    """Get summary statistics of detected intents"""
-    # In production, implement aggregation queries
+async def get_stats_summary(
+    city: Optional[str] = Query(None, description="Restrict stats to one city"),
+    days: Optional[int] = Query(None, ge=1, le=90, description="Restrict stats to the last N days"),
+    top_cities: int = Query(0, ge=0, le=50, description="Also rank the N cities with the most intents"),
+    db_manager: DatabaseManager = Depends(get_db_manager)
+):
+    """
+    Get summary statistics of detected intents
+    
+    Served from counters maintained on every write, so the cost does not grow
+    with the number of stored intents. **top_cities** is off by default: ranking
+    cities reads the counters of every city, so its cost grows with the number
+    of cities.
+    """
+    try:
+        summary = await db_manager.aget_stats_summary(city=city, days=days, top_cities=top_cities)
+    except Exception as e:
+        logger.error(f"Stats summary failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
     return {
-        "message": "Stats coming soon",
-        "total_intents": 0,
-        "high_urgency_count": 0,
-        "avg_confidence": 0.0
+        "filters_applied": {"city": city, "days": days, "top_cities": top_cities},
+        **summary
     }
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import DatabaseManager, get_db_manager
+from typing import Optional
+
+router = APIRouter()
+
+
+@router.get("/prices")
+async def get_market_prices(
+    make: str = Query(..., description="Vehicle make, e.g. Toyota"),
+    model: str = Query(..., description="Vehicle model, e.g. Camry"),
+    year: Optional[int] = Query(None, ge=1900, le=2100),
+    mileage: Optional[int] = Query(None, ge=0),
+    region: Optional[str] = Query(None, description="Two-letter state code, e.g. AZ"),
+    price: Optional[float] = Query(None, gt=0, description="Also return this price's percentile"),
+    db_manager: DatabaseManager = Depends(get_db_manager)
+):
+    """
+    Price distribution of recent listings in a market segment
+
+    Served from the in-memory market price index. The segment is the finest of
+    (make, model, year bucket, mileage bucket, region) with enough listings;
+    `segment` in the response says which one was used. Prices are accurate to
+    about 2%.
+    """
+    if not settings.market_prices_enabled:
+        raise HTTPException(status_code=503, detail="Market price index is disabled")
+
+    index = db_manager.market_prices
+    args = (make, model, year, mileage, region, price)
+    market = index.lookup(*args) if index.loaded else await run_in_threadpool(index.lookup, *args)
+    if market is None:
+        raise HTTPException(status_code=404, detail="Not enough listings for this segment")
+
+    return market
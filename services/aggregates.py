@@ -0,0 +1,259 @@
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from utils.logger import logger
+from utils.metrics import DB_OPERATION_DURATION
+
+
+STATS_COLLECTION = 'intent_stats'
+
+# Upper edges of budget histogram buckets, in dollars
+BUDGET_BUCKET_EDGES = [5000, 10000, 15000, 20000, 30000, 50000, 75000, 100000]
+
+
+def budget_bucket(budget_min: Optional[float], budget_max: Optional[float]) -> str:
+    """Histogram bucket label for an intent's budget (midpoint when both ends known)"""
+    values = [v for v in (budget_min, budget_max) if v is not None]
+    if not values:
+        return "unknown"
+    budget = sum(values) / len(values)
+
+    lower = 0
+    for edge in BUDGET_BUCKET_EDGES:
+        if budget < edge:
+            return f"{lower}-{edge}"
+        lower = edge
+    return f"{lower}+"
+
+
+def city_key(city: Optional[str]) -> str:
+    """Normalized city name usable as a map key and document id"""
+    return (city or "unknown").strip().lower().replace('/', '-') or "unknown"
+
+
+class IntentAggregates:
+    """
+    Materialized intent statistics maintained on every write.
+
+    Each scope ("all", one city, one day, one city-day) is a document whose
+    counters are spread over `num_shards` shard documents. Writers increment a
+    random shard so a burst of intents does not contend on a single document;
+    readers sum a fixed number of shards, so a summary costs the same no matter
+    how large consumer_intents grows.
+
+    Shard documents hold a fixed set of counters. Per-day and per-city
+    breakdowns come from the day and city scopes themselves (which carry
+    `kind`/`city`/`day` labels), never from ever-growing maps in one document.
+    The top-cities ranking reads every city scope, so it is only computed on
+    request.
+    """
+
+    def __init__(self, db, num_shards: int = 10, breakdown_days: int = 30):
+        self.db = db
+        self.num_shards = num_shards
+        self.breakdown_days = breakdown_days
+
+    # ---- writes ----
+
+    def add_to_batch(self, batch, intent_doc: Dict[str, Any]):
+        """Queue counter increments for a newly saved intent onto a write batch"""
+        from firebase_admin import firestore
+        for scope, increments in self._increments(intent_doc, firestore.Increment).items():
+            shard_ref = self._shard_ref(scope, random.randrange(self.num_shards))
+            batch.set(shard_ref, increments, merge=True)
+
+    def _increments(self, intent_doc: Dict[str, Any], wrap) -> Dict[str, Dict[str, Any]]:
+        city = city_key(intent_doc.get('city'))
+        day = str(intent_doc.get('detected_at', ''))[:10] or "unknown"
+        confidence = intent_doc.get('confidence_score')
+
+        counters = {
+            'total': wrap(1),
+            'urgency': {str(intent_doc.get('urgency', 'unknown')): wrap(1)},
+            'intent_type': {str(intent_doc.get('intent_type', 'unknown')): wrap(1)},
+            'budget': {budget_bucket(intent_doc.get('budget_min'), intent_doc.get('budget_max')): wrap(1)},
+        }
+        if confidence is not None:
+            counters['confidence_sum'] = wrap(float(confidence))
+            counters['confidence_count'] = wrap(1)
+
+        return {
+            'all': counters,
+            f'city:{city}': dict(counters, kind='city', city=city),
+            f'day:{day}': dict(counters, kind='day', day=day),
+            f'city_day:{city}:{day}': dict(counters, kind='city_day', city=city, day=day),
+        }
+
+    # ---- reads ----
+
+    @DB_OPERATION_DURATION.labels('stats_summary').time()
+    def get_summary(
+        self,
+        city: Optional[str] = None,
+        days: Optional[int] = None,
+        top_cities: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Summed counters for all intents, optionally limited to a city and/or the
+        last N days; by_day covers those N days (or the last breakdown_days).
+        top_cities > 0 also ranks that many cities, at the cost of reading every
+        city scope (city-day scopes with `days`) instead of a fixed set of shards.
+        """
+        today = datetime.now().date()
+        window = [(today - timedelta(days=offset)).isoformat() for offset in range(days or self.breakdown_days)]
+        day_scopes = [f'city_day:{city_key(city)}:{day}' if city else f'day:{day}' for day in window]
+
+        by_day = {day: 0 for day in reversed(window)}
+        day_totals = self._sum_scopes(day_scopes)
+        for day, scope in zip(window, day_scopes):
+            by_day[day] = day_totals[scope]['total']
+
+        if days:
+            totals = _empty_totals()
+            for counts in day_totals.values():
+                _merge_counts(totals, counts)
+        else:
+            scope = f'city:{city_key(city)}' if city else 'all'
+            totals = self._sum_scopes([scope])[scope]
+
+        if not top_cities:
+            city_counts = {}
+        elif city:
+            city_counts = {city_key(city): totals['total']}
+        else:
+            city_counts = self._city_counts(window[-1] if days else None)
+
+        return _format_summary(totals, by_day, city_counts, top_cities)
+
+    def _sum_scopes(self, scopes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Counters of each scope, summed over its shards"""
+        totals = {scope: _empty_totals() for scope in scopes}
+        refs = [self._shard_ref(scope, shard) for scope in scopes for shard in range(self.num_shards)]
+        for snapshot in self.db.get_all(refs):
+            if snapshot.exists:
+                _merge_counts(totals[snapshot.reference.parent.parent.id], snapshot.to_dict())
+        return totals
+
+    def _city_counts(self, since_day: Optional[str] = None) -> Dict[str, int]:
+        """Intent count per city, from the city scopes (city-day scopes from since_day on)"""
+        query = self.db.collection_group('shards')
+        if since_day:
+            query = query.where('kind', '==', 'city_day').where('day', '>=', since_day)
+        else:
+            query = query.where('kind', '==', 'city')
+
+        counts: Dict[str, int] = defaultdict(int)
+        for snapshot in query.select(['city', 'total']).stream():
+            doc = snapshot.to_dict()
+            counts[doc.get('city', 'unknown')] += doc.get('total', 0)
+        return counts
+
+    # ---- maintenance ----
+
+    def rebuild(self, page_size: int = 500) -> int:
+        """
+        Recompute every aggregate from consumer_intents.
+
+        Writes that land while the rebuild runs may be lost, so run it with
+        ingestion paused.
+        """
+        logger.info("🔁 Rebuilding intent aggregates from consumer_intents...")
+        scopes: Dict[str, Dict[str, Any]] = defaultdict(_empty_totals)
+        scanned = 0
+
+        for doc in self.db.collection('consumer_intents').select(
+            ['city', 'detected_at', 'urgency', 'intent_type', 'confidence_score', 'budget_min', 'budget_max']
+        ).stream():
+            for scope, counts in self._increments(doc.to_dict(), lambda value: value).items():
+                _merge_counts(scopes[scope], counts)
+            scanned += 1
+
+        self._delete_all(page_size)
+
+        batch = self.db.batch()
+        pending = 0
+        for scope, counts in scopes.items():
+            batch.set(self._shard_ref(scope, 0), counts)
+            pending += 1
+            if pending >= page_size:
+                batch.commit()
+                batch = self.db.batch()
+                pending = 0
+        if pending:
+            batch.commit()
+
+        logger.info(f"✅ Rebuilt {len(scopes)} aggregate scopes from {scanned} intents")
+        return scanned
+
+    def _delete_all(self, page_size: int):
+        for scope_doc in self.db.collection(STATS_COLLECTION).list_documents(page_size=page_size):
+            batch = self.db.batch()
+            for shard_doc in scope_doc.collection('shards').list_documents(page_size=page_size):
+                batch.delete(shard_doc)
+            batch.delete(scope_doc)
+            batch.commit()
+
+    def _shard_ref(self, scope: str, shard: int):
+        return self.db.collection(STATS_COLLECTION).document(scope).collection('shards').document(str(shard))
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {
+        'total': 0,
+        'confidence_sum': 0.0,
+        'confidence_count': 0,
+        'urgency': {},
+        'intent_type': {},
+        'budget': {},
+    }
+
+
+def _merge_counts(totals: Dict[str, Any], counts: Dict[str, Any]):
+    for name, value in counts.items():
+        if isinstance(value, dict):
+            bucket = totals.setdefault(name, {})
+            for key, count in value.items():
+                bucket[key] = bucket.get(key, 0) + count
+        elif isinstance(value, str):
+            totals[name] = value  # scope label
+        else:
+            totals[name] = totals.get(name, 0) + value
+
+
+def _format_summary(
+    totals: Dict[str, Any],
+    by_day: Dict[str, int],
+    city_counts: Dict[str, int],
+    top_cities: int
+) -> Dict[str, Any]:
+    count = totals['confidence_count']
+    ranked: List[Dict[str, Any]] = [
+        {'city': city, 'count': n}
+        for city, n in sorted(city_counts.items(), key=lambda item: item[1], reverse=True)[:top_cities]
+        if n
+    ]
+    return {
+        'total_intents': totals['total'],
+        'high_urgency_count': totals['urgency'].get('high', 0),
+        'avg_confidence': round(totals['confidence_sum'] / count, 4) if count else 0.0,
+        'by_urgency': totals['urgency'],
+        'by_intent_type': totals['intent_type'],
+        'budget_histogram': totals['budget'],
+        'top_cities': ranked,
+        'by_day': by_day,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintain materialized intent statistics")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute all aggregates from consumer_intents")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        from app.database import get_db_manager
+        get_db_manager().aggregates.rebuild()
+    else:
+        parser.print_help()
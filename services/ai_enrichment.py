@@ -1,20 +1,32 @@
-import openai
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional
 import json
 from app.models import NormalizedListing, ConsumerIntent, IntentType, IntentUrgency
 from app.config import settings
 from datetime import datetime
 import hashlib
+import time
 from utils.logger import logger
+from utils.metrics import LLM_REQUEST_DURATION, LLM_TOKENS, observe_since
+from utils.helpers import LazySingleton
 
-openai.api_key = settings.openai_api_key
+
+def _create_llm_client():
+    import openai  # heavy import, deferred until the first enrichment
+    
+    if not settings.openai_api_key:
+        raise RuntimeError("OPENAI_API_KEY is not configured")
+    # Async client: enrichment runs on the event loop next to API requests and other jobs
+    return openai.AsyncOpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url)
+
+
+get_llm_client = LazySingleton(_create_llm_client)
 
 
 class AIEnrichmentService:
     """Use OpenAI to detect consumer intent from listings"""
     
     SYSTEM_PROMPT = """You are an expert at detecting consumer purchase intent from marketplace listings.
-    
+
 Analyze the provided car listing and extract:
 1. **Urgency**: How quickly the consumer wants to buy (high/medium/low)
 2. **Confidence Score**: Likelihood this represents genuine buyer intent (0.0-1.0)
@@ -25,7 +37,7 @@ Analyze the provided car listing and extract:
 
 Consider factors like:
 - Listing freshness (newer = higher urgency)
-- Price positioning (deals = higher urgency)
+- Price positioning: use the Market line when present; a percentile under 25 is a deal (higher urgency)
 - Description urgency signals ("must sell", "motivated seller")
 - Contact availability (phone/email = higher intent)
 
@@ -44,25 +56,47 @@ Return ONLY valid JSON with this structure:
     }
 }
 """
-    
+
     @staticmethod
-    async def enrich_listing(normalized_listing: NormalizedListing) -> ConsumerIntent:
-        """Use LLM to extract consumer intent signals"""
+    async def enrich_listing(
+        normalized_listing: NormalizedListing,
+        on_usage: Optional[Callable[[int, int], None]] = None,
+        market: Optional[Dict[str, Any]] = None
+    ) -> ConsumerIntent:
+        """
+        Use LLM to extract consumer intent signals
+        
+        on_usage, if given, receives (prompt_tokens, completion_tokens) for the call.
+        market, if given, is the listing's MarketPriceIndex.assess() result.
+        """
         
         # Build context for LLM
-        listing_context = AIEnrichmentService._build_listing_context(normalized_listing)
+        listing_context = AIEnrichmentService._build_listing_context(normalized_listing, market)
         
         try:
             # Call OpenAI API
-            response = openai.chat.completions.create(
-                model=settings.openai_model,
-                messages=[
-                    {"role": "system", "content": AIEnrichmentService.SYSTEM_PROMPT},
-                    {"role": "user", "content": listing_context}
-                ],
-                temperature=0.3,
-                max_tokens=500
-            )
+            started = time.perf_counter()
+            try:
+                response = await get_llm_client().chat.completions.create(
+                    model=settings.openai_model,
+                    messages=[
+                        {"role": "system", "content": AIEnrichmentService.SYSTEM_PROMPT},
+                        {"role": "user", "content": listing_context}
+                    ],
+                    temperature=0.3,
+                    max_tokens=500
+                )
+            except Exception:
+                observe_since(LLM_REQUEST_DURATION, started, settings.openai_model, 'error')
+                raise
+            observe_since(LLM_REQUEST_DURATION, started, settings.openai_model, 'ok')
+            
+            usage = getattr(response, 'usage', None)
+            if usage is not None:
+                LLM_TOKENS.labels(settings.openai_model, 'prompt').inc(usage.prompt_tokens or 0)
+                LLM_TOKENS.labels(settings.openai_model, 'completion').inc(usage.completion_tokens or 0)
+                if on_usage is not None:
+                    on_usage(usage.prompt_tokens, usage.completion_tokens)
             
             # Parse response
             ai_output = json.loads(response.choices[0].message.content)
@@ -84,31 +118,38 @@ Return ONLY valid JSON with this structure:
                 keywords=ai_output.get('keywords', []),
                 preferences=ai_output.get('preferences', {}),
                 source_listing=normalized_listing,
+                market_price_percentile=market.get('percentile') if market else None,
                 detected_at=datetime.now(),
                 contact_available=bool(normalized_listing.phone or normalized_listing.email),
+                # contact_info is Dict[str, str]: leave out what the listing does not have
                 contact_info={
-                    'phone': normalized_listing.phone,
-                    'email': normalized_listing.email,
-                    'seller_name': normalized_listing.seller_name
+                    key: value for key, value in (
+                        ('phone', normalized_listing.phone),
+                        ('email', normalized_listing.email),
+                        ('seller_name', normalized_listing.seller_name)
+                    ) if value
                 } if (normalized_listing.phone or normalized_listing.email) else None
             )
             
-            logger.info(f"✅ AI enrichment complete: {intent.intent_id} (confidence: {intent.confidence_score})")
+            logger.info(
+                "✅ AI enrichment complete: %s (confidence: %s)", intent.intent_id, intent.confidence_score,
+                extra={'event': 'listing.enriched', 'intent_id': intent.intent_id}
+            )
             return intent
-            
+        
         except Exception as e:
             logger.error(f"❌ AI enrichment failed: {e}")
             raise
     
     @staticmethod
-    def _build_listing_context(listing: NormalizedListing) -> str:
+    def _build_listing_context(listing: NormalizedListing, market: Optional[Dict[str, Any]] = None) -> str:
         """Build context string for LLM"""
         context = f"""
 **Car Listing Analysis**
 
 Title: {listing.title}
-Price: ${listing.price:,.0f if listing.price else 'Not listed'}
-Mileage: {listing.mileage:,} miles
+Price: {f"${listing.price:,.0f}" if listing.price else 'Not listed'}
+Mileage: {f"{listing.mileage:,} miles" if listing.mileage is not None else 'Unknown'}
 Location: {listing.location}
 Seller: {listing.seller_name or 'Unknown'} ({listing.seller_type})
 Source: {listing.source}
@@ -119,6 +160,11 @@ Description: {listing.description[:500] if listing.description else 'No descript
 
 Contact Available: {'Yes' if (listing.phone or listing.email) else 'No'}
 """
+        if market and 'percentile' in market:
+            context += (
+                f"Market: percentile {market['percentile']:.0f} of {market['listings']} similar listings "
+                f"(median ${market['median']:,})\n"
+            )
         return context.strip()
     
     @staticmethod
@@ -0,0 +1,423 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from app.config import settings
+from utils.logger import logger
+
+
+MISSING = object()
+
+
+class LRUTTLCache:
+    """In-process LRU cache with per-entry TTL and an approximate memory cap"""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return cached value, refreshing its LRU position"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, size, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None, size: Optional[int] = None):
+        """Store value, evicting least recently used entries past the caps"""
+        if size is None:
+            size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + (ttl_seconds if ttl_seconds is not None else self.ttl_seconds)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (expires_at, size, value)
+            self._bytes += size
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self._bytes -= entry[1]
+            return True
+
+    def items(self):
+        """Snapshot of (key, value) pairs, including not-yet-purged expired ones"""
+        with self._lock:
+            return [(key, entry[2]) for key, entry in self._entries.items()]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+
+class SharedCacheBackend:
+    """
+    Cross-worker cache tier on top of a Redis-compatible client.
+
+    Any object exposing get/set(ex=)/delete/incr works, so tests can pass an
+    in-memory stand-in instead of a live server.
+    """
+
+    def __init__(self, client, prefix: str = "intent_cache"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "SharedCacheBackend":
+        import redis  # optional dependency, only needed for the shared tier
+        return cls(redis.Redis.from_url(url))
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def get(self, key: str) -> Any:
+        raw = self.client.get(self._key(key))
+        if raw is None:
+            return MISSING
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl_seconds: float):
+        self.client.set(self._key(key), json.dumps(value, default=_json_default), ex=max(1, int(ttl_seconds)))
+
+    def get_many(self, keys: List[str]) -> List[Any]:
+        """Values for several keys in one round trip (MISSING where absent)"""
+        if not hasattr(self.client, 'mget'):
+            return [self.get(key) for key in keys]
+        raws = self.client.mget([self._key(key) for key in keys])
+        return [json.loads(raw) if raw is not None else MISSING for raw in raws]
+
+    def delete(self, key: str):
+        self.client.delete(self._key(key))
+
+    def generation(self) -> int:
+        raw = self.client.get(self._key("query_generation"))
+        return int(raw) if raw is not None else 0
+
+    def bump_generation(self) -> int:
+        return int(self.client.incr(self._key("query_generation")))
+
+
+class IntentCache:
+    """Read-through cache for intent lookups by id and by query filters"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        intent_ttl_seconds: float = 300,
+        query_ttl_seconds: float = 15,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        shared: Optional[SharedCacheBackend] = None
+    ):
+        self.enabled = enabled
+        self.intent_ttl_seconds = intent_ttl_seconds
+        self.query_ttl_seconds = query_ttl_seconds
+        self.local = LRUTTLCache(max_entries, max_bytes, intent_ttl_seconds)
+        self.shared = shared
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'intent_hits': 0,
+            'intent_misses': 0,
+            'query_hits': 0,
+            'query_misses': 0,
+            'shared_hits': 0,
+            'invalidations': 0,
+        }
+
+    @classmethod
+    def from_settings(cls) -> "IntentCache":
+        shared = None
+        if settings.cache_redis_url:
+            try:
+                shared = SharedCacheBackend.from_url(settings.cache_redis_url)
+            except Exception as e:
+                logger.warning(f"Shared cache unavailable, using in-process cache only: {e}")
+        return cls(
+            enabled=settings.cache_enabled,
+            intent_ttl_seconds=settings.cache_intent_ttl_seconds,
+            query_ttl_seconds=settings.cache_query_ttl_seconds,
+            max_entries=settings.cache_max_entries,
+            max_bytes=settings.cache_max_bytes,
+            shared=shared
+        )
+
+    # ---- keys ----
+
+    @staticmethod
+    def query_key(filters: Dict[str, Any]) -> str:
+        """Stable key for a set of query filters, independent of spelling and order"""
+        return "query:" + json.dumps(normalize_query_filters(filters), sort_keys=True, default=_json_default)
+
+    @staticmethod
+    def intent_key(intent_id: str) -> str:
+        return f"intent:{intent_id}"
+
+    # ---- intents by id ----
+
+    def get_intent(self, intent_id: str) -> Any:
+        """Return cached intent document, or MISSING"""
+        if not self.enabled:
+            return MISSING
+
+        key = self.intent_key(intent_id)
+        value = self.local.get(key, MISSING)
+        if value is MISSING and self.shared is not None:
+            value = self._shared_get(key)
+            if value is not MISSING:
+                self.local.set(key, value, self.intent_ttl_seconds)
+
+        self._count('intent_hits' if value is not MISSING else 'intent_misses')
+        return value
+
+    def get_intents(self, intent_ids: List[str]) -> Dict[str, Any]:
+        """Cached intent documents for several ids, keyed by id (misses are absent)"""
+        if not self.enabled:
+            return {}
+
+        found = {}
+        for intent_id in intent_ids:
+            value = self.local.get(self.intent_key(intent_id), MISSING)
+            if value is not MISSING:
+                found[intent_id] = value
+
+        remaining = [intent_id for intent_id in intent_ids if intent_id not in found]
+        if remaining and self.shared is not None:
+            keys = [self.intent_key(intent_id) for intent_id in remaining]
+            try:
+                values = self.shared.get_many(keys)
+            except Exception as e:
+                logger.warning(f"Shared cache read failed: {e}")
+                values = [MISSING] * len(keys)
+            for intent_id, key, value in zip(remaining, keys, values):
+                if value is not MISSING:
+                    found[intent_id] = value
+                    self.local.set(key, value, self.intent_ttl_seconds)
+                    self._count('shared_hits')
+
+        self._count('intent_hits', len(found))
+        self._count('intent_misses', len(intent_ids) - len(found))
+        return found
+
+    def set_intent(self, intent_id: str, doc: Dict[str, Any]):
+        """Cache an intent document"""
+        if not self.enabled:
+            return
+        key = self.intent_key(intent_id)
+        self.local.set(key, doc, self.intent_ttl_seconds)
+        if self.shared is not None:
+            self._shared_set(key, doc, self.intent_ttl_seconds)
+
+    # ---- query results ----
+
+    def get_query(self, filters: Dict[str, Any]) -> Any:
+        """Return cached query results, or MISSING"""
+        if not self.enabled:
+            return MISSING
+
+        key = self.query_key(filters)
+        entry = self.local.get(key, MISSING)
+        value = entry['results'] if entry is not MISSING else MISSING
+
+        if value is MISSING and self.shared is not None:
+            shared_key = self._shared_query_key(key)
+            value = self._shared_get(shared_key) if shared_key is not None else MISSING
+            if value is not MISSING:
+                self.local.set(key, {'filters': normalize_query_filters(filters), 'results': value}, self.query_ttl_seconds)
+
+        self._count('query_hits' if value is not MISSING else 'query_misses')
+        return value
+
+    def set_query(self, filters: Dict[str, Any], results: list):
+        if not self.enabled:
+            return
+        key = self.query_key(filters)
+        self.local.set(key, {'filters': normalize_query_filters(filters), 'results': results}, self.query_ttl_seconds)
+        shared_key = self._shared_query_key(key) if self.shared is not None else None
+        if shared_key is not None:
+            self._shared_set(shared_key, results, self.query_ttl_seconds)
+
+    # ---- writes ----
+
+    def on_intent_saved(self, doc: Dict[str, Any]):
+        """Refresh the id entry and drop every cached query the new intent could appear in"""
+        if not self.enabled:
+            return
+
+        self.set_intent(doc['intent_id'], doc)
+
+        dropped = 0
+        for key, entry in self.local.items():
+            if key.startswith("query:") and intent_matches_filters(doc, entry['filters']):
+                if self.local.delete(key):
+                    dropped += 1
+
+        if self.shared is not None:
+            try:
+                self.shared.bump_generation()
+            except Exception as e:
+                logger.warning(f"Shared cache invalidation failed: {e}")
+
+        self._count('invalidations', dropped)
+
+    def clear(self):
+        self.local.clear()
+        if self.shared is not None:
+            try:
+                self.shared.bump_generation()
+            except Exception as e:
+                logger.warning(f"Shared cache invalidation failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        for kind in ('intent', 'query'):
+            lookups = stats[f'{kind}_hits'] + stats[f'{kind}_misses']
+            stats[f'{kind}_hit_rate'] = round(stats[f'{kind}_hits'] / lookups, 4) if lookups else 0.0
+
+        stats.update({
+            'enabled': self.enabled,
+            'shared_backend': self.shared is not None,
+            'entries': len(self.local),
+            'size_bytes': self.local.size_bytes,
+            'max_bytes': self.local.max_bytes,
+            'evictions': self.local.evictions,
+            'expirations': self.local.expirations,
+        })
+        return stats
+
+    # ---- internals ----
+
+    def _count(self, name: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def _shared_query_key(self, key: str) -> Optional[str]:
+        """Key of a query in the current shared generation; None when the shared tier is unreachable"""
+        try:
+            return f"gen{self.shared.generation()}:{key}"
+        except Exception as e:
+            logger.warning(f"Shared cache read failed: {e}")
+            return None
+
+    def _shared_get(self, key: str) -> Any:
+        try:
+            value = self.shared.get(key)
+        except Exception as e:
+            logger.warning(f"Shared cache read failed: {e}")
+            return MISSING
+        if value is not MISSING:
+            self._count('shared_hits')
+        return value
+
+    def _shared_set(self, key: str, value: Any, ttl_seconds: float):
+        try:
+            self.shared.set(key, value, ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Shared cache write failed: {e}")
+
+
+def normalize_query_filters(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Canonical form of query filters: drop unset values, normalize enums and
+    reduce location to the city the query filters on. The city keeps its case,
+    since Firestore's city equality filter is case-sensitive.
+    """
+    normalized = {}
+    for name, value in filters.items():
+        if value is None or value is False:
+            continue
+        if hasattr(value, 'value'):
+            value = value.value
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        if name == 'location':
+            value = value.split(',')[0].strip()
+        normalized[name] = value
+    return normalized
+
+
+def intent_matches_filters(doc: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """Whether an intent document could appear in results for the normalized filters"""
+    location = filters.get('location')
+    if location and doc.get('city') != location:
+        return False
+
+    for name in ('intent_type', 'urgency'):
+        if filters.get(name) and doc.get(name) != filters[name]:
+            return False
+
+    min_confidence = filters.get('min_confidence')
+    if min_confidence and (doc.get('confidence_score') or 0.0) < min_confidence:
+        return False
+
+    detected_at = str(doc.get('detected_at', ''))
+    if filters.get('start_date') and detected_at < filters['start_date']:
+        return False
+    if filters.get('end_date') and detected_at > filters['end_date']:
+        return False
+
+    if filters.get('radius_miles') or filters.get('bbox'):
+        latitude, longitude = doc.get('latitude'), doc.get('longitude')
+        if latitude is None or longitude is None:
+            return False
+        if filters.get('radius_miles'):
+            from services.spatial_index import haversine_miles
+            distance = haversine_miles(filters['latitude'], filters['longitude'], latitude, longitude)
+            return bool(distance <= filters['radius_miles'])
+        min_lat, min_lon, max_lat, max_lon = filters['bbox']
+        in_lon = min_lon <= longitude <= max_lon if min_lon <= max_lon else longitude >= min_lon or longitude <= max_lon
+        return min_lat <= latitude <= max_lat and in_lon
+
+    return True
+
+
+def _estimate_size(value: Any) -> int:
+    try:
+        return len(json.dumps(value, default=_json_default))
+    except (TypeError, ValueError):
+        return 1024
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+intent_cache = IntentCache.from_settings()
@@ -0,0 +1,275 @@
+import glob
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from app.config import settings
+from utils.helpers import LazySingleton
+from utils.logger import logger
+
+
+STATE_FILE = '_export_state.json'
+PARTITION_COLUMNS = ['detected_date', 'state']
+
+# Preference keys the enrichment prompt asks for; anything else lands in preferences_extra
+KNOWN_PREFERENCES = ('vehicle_type', 'max_mileage', 'features')
+
+
+def _schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ('intent_id', pa.string()),
+        ('intent_type', pa.string()),
+        ('location', pa.string()),
+        ('city', pa.string()),
+        ('state', pa.string()),
+        ('latitude', pa.float64()),
+        ('longitude', pa.float64()),
+        ('urgency', pa.string()),
+        ('confidence_score', pa.float64()),
+        ('purchase_timeline', pa.string()),
+        ('budget_min', pa.float64()),
+        ('budget_max', pa.float64()),
+        ('keywords', pa.list_(pa.string())),
+        ('pref_vehicle_type', pa.string()),
+        ('pref_max_mileage', pa.int64()),
+        ('pref_features', pa.list_(pa.string())),
+        ('preferences_extra', pa.string()),
+        ('contact_available', pa.bool_()),
+        ('has_phone', pa.bool_()),
+        ('has_email', pa.bool_()),
+        ('detected_at', pa.timestamp('us')),
+        ('detected_date', pa.string()),
+        ('listing_id', pa.string()),
+        ('listing_source', pa.string()),
+        ('listing_url', pa.string()),
+        ('listing_title', pa.string()),
+        ('listing_price', pa.float64()),
+        ('listing_year', pa.int64()),
+        ('listing_make', pa.string()),
+        ('listing_model', pa.string()),
+        ('listing_mileage', pa.int64()),
+        ('listing_seller_type', pa.string()),
+        ('listing_date', pa.timestamp('us')),
+    ])
+
+
+def flatten_intent(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a stored intent document into one row of typed export columns"""
+    listing = doc.get('source_listing') or {}
+    preferences = doc.get('preferences') or {}
+    contact = doc.get('contact_info') or {}
+    detected_at = _parse_timestamp(doc.get('detected_at'))
+
+    extra = {k: v for k, v in preferences.items() if k not in KNOWN_PREFERENCES}
+    features = preferences.get('features')
+
+    return {
+        'intent_id': doc.get('intent_id'),
+        'intent_type': doc.get('intent_type'),
+        'location': doc.get('location'),
+        'city': doc.get('city'),
+        'state': _partition_value(doc.get('state')),
+        'latitude': _to_float(doc.get('latitude')),
+        'longitude': _to_float(doc.get('longitude')),
+        'urgency': doc.get('urgency'),
+        'confidence_score': _to_float(doc.get('confidence_score')),
+        'purchase_timeline': doc.get('purchase_timeline'),
+        'budget_min': _to_float(doc.get('budget_min')),
+        'budget_max': _to_float(doc.get('budget_max')),
+        'keywords': [str(k) for k in doc.get('keywords') or []],
+        'pref_vehicle_type': _to_str(preferences.get('vehicle_type')),
+        'pref_max_mileage': _to_int(preferences.get('max_mileage')),
+        'pref_features': [str(f) for f in features] if isinstance(features, list) else None,
+        'preferences_extra': json.dumps(extra, default=str) if extra else None,
+        'contact_available': bool(doc.get('contact_available')),
+        'has_phone': bool(contact.get('phone')),
+        'has_email': bool(contact.get('email')),
+        'detected_at': detected_at,
+        'detected_date': detected_at.date().isoformat() if detected_at else 'unknown',
+        'listing_id': listing.get('listing_id'),
+        'listing_source': listing.get('source'),
+        'listing_url': listing.get('url'),
+        'listing_title': listing.get('title'),
+        'listing_price': _to_float(listing.get('price')),
+        'listing_year': _to_int(listing.get('year')),
+        'listing_make': listing.get('make'),
+        'listing_model': listing.get('model'),
+        'listing_mileage': _to_int(listing.get('mileage')),
+        'listing_seller_type': listing.get('seller_type'),
+        'listing_date': _parse_timestamp(listing.get('listing_date')),
+    }
+
+
+class IntentExporter:
+    """
+    Incremental export of consumer intents to a Hive-partitioned Parquet dataset
+    (detected_date=YYYY-MM-DD/state=XX/part-*.parquet).
+
+    Intents are streamed from storage one chunk at a time and the watermark
+    (latest exported detected_at) is persisted after every chunk, so an
+    interrupted run resumes where it stopped. Each run re-reads `overlap_seconds`
+    before the watermark, for intents committed late with an earlier
+    detected_at; the ids already exported in that window are kept in the state
+    file, so re-read intents are not written twice.
+    """
+
+    def __init__(self, output_dir: str, chunk_size: int = 5000, overlap_seconds: float = 600.0):
+        self.output_dir = output_dir
+        self.chunk_size = chunk_size
+        self.overlap_seconds = overlap_seconds
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def get_state(self) -> Dict[str, Any]:
+        path = os.path.join(self.output_dir, STATE_FILE)
+        if not os.path.exists(path):
+            return {'watermark': None, 'last_run': None}
+        with open(path) as f:
+            return json.load(f)
+
+    def acquire(self) -> bool:
+        """Reserve the exporter for a run(acquired=True), e.g. before scheduling it; False if one is running"""
+        return self._lock.acquire(blocking=False)
+
+    def run(self, full: bool = False, acquired: bool = False) -> Dict[str, Any]:
+        """Export intents newer than the watermark (or everything when full=True)"""
+        if not acquired and not self._lock.acquire(blocking=False):
+            raise RuntimeError("An export is already running")
+
+        try:
+            return self._run(full)
+        finally:
+            self._lock.release()
+
+    def _run(self, full: bool) -> Dict[str, Any]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        from app.database import get_db_manager
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        state = self.get_state()
+        if full:
+            for partition_dir in glob.glob(os.path.join(self.output_dir, f'{PARTITION_COLUMNS[0]}=*')):
+                shutil.rmtree(partition_dir)
+            state = {'watermark': None, 'last_run': state.get('last_run')}
+        watermark = state.get('watermark')
+        since = None
+        if watermark:
+            since = (datetime.fromisoformat(watermark) - timedelta(seconds=self.overlap_seconds)).isoformat()
+        # intent_id -> detected_at of intents exported within the overlap window
+        recent: Dict[str, str] = dict(state.get('recent_ids') or {})
+        run_id = uuid.uuid4().hex[:12]
+        schema = _schema()
+        started = time.perf_counter()
+        rows_written = 0
+        chunks = 0
+
+        logger.info(f"📦 Exporting intents since {watermark or 'the beginning'} to {self.output_dir}")
+
+        for docs in get_db_manager().stream_intents_since(since, self.chunk_size, inclusive=True):
+            newest = str(docs[-1].get('detected_at'))
+            docs = [doc for doc in docs if doc.get('intent_id') not in recent]
+            if docs:
+                rows: List[Dict[str, Any]] = [flatten_intent(doc) for doc in docs]
+                table = pa.Table.from_pylist(rows, schema=schema)
+                pq.write_to_dataset(
+                    table,
+                    root_path=self.output_dir,
+                    partition_cols=PARTITION_COLUMNS,
+                    basename_template=f"part-{run_id}-{chunks:05d}-{{i}}.parquet",
+                    existing_data_behavior='overwrite_or_ignore'
+                )
+                chunks += 1
+                rows_written += len(rows)
+
+            for doc in docs:
+                recent[doc.get('intent_id')] = str(doc.get('detected_at'))
+            watermark = max(watermark or newest, newest)
+            cutoff = (datetime.fromisoformat(watermark) - timedelta(seconds=self.overlap_seconds)).isoformat()
+            recent = {intent_id: detected_at for intent_id, detected_at in recent.items() if detected_at >= cutoff}
+            state['watermark'] = watermark
+            state['recent_ids'] = recent
+            self._save_state(state)
+
+        state['last_run'] = {
+            'run_id': run_id,
+            'finished_at': datetime.now().isoformat(),
+            'rows': rows_written,
+            'chunks': chunks,
+            'full': full,
+            'seconds': round(time.perf_counter() - started, 3),
+        }
+        self._save_state(state)
+
+        logger.info(f"✅ Export complete: {rows_written} intents in {chunks} chunks")
+        return state
+
+    def _save_state(self, state: Dict[str, Any]):
+        path = os.path.join(self.output_dir, STATE_FILE)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value)).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _partition_value(value: Any) -> str:
+    text = str(value).strip() if value else ''
+    return text.replace('/', '-') or 'unknown'
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_str(value: Any) -> Optional[str]:
+    return str(value) if value is not None else None
+
+
+get_intent_exporter = LazySingleton(
+    lambda: IntentExporter(
+        settings.export_dir,
+        chunk_size=settings.export_chunk_size,
+        overlap_seconds=settings.export_overlap_seconds
+    )
+)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export consumer intents to partitioned Parquet")
+    parser.add_argument("--full", action="store_true", help="Ignore the watermark and export everything")
+    args = parser.parse_args()
+
+    state = get_intent_exporter().run(full=args.full)
+    logger.info(f"📦 Export state: {json.dumps(state, default=str)}")
@@ -0,0 +1,190 @@
+"""
+Offline-first geocoding: bundled US gazetteer, persistent result cache, and a
+rate-limited Nominatim fallback.
+
+Bundled data (services/data):
+- us_cities.csv.gz: GeoNames US places with population >= 1000 (CC BY 4.0,
+  https://www.geonames.org), plus ZIP-centroid entries for remaining USPS
+  place names.
+- us_zipcodes.csv.gz: USPS ZIP codes with coordinates, from the MIT-licensed
+  `zipcodes` package.
+"""
+import csv
+import gzip
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from utils.logger import logger
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+US_STATES = {
+    'alabama': 'al', 'alaska': 'ak', 'arizona': 'az', 'arkansas': 'ar', 'california': 'ca',
+    'colorado': 'co', 'connecticut': 'ct', 'delaware': 'de', 'district of columbia': 'dc',
+    'florida': 'fl', 'georgia': 'ga', 'hawaii': 'hi', 'idaho': 'id', 'illinois': 'il',
+    'indiana': 'in', 'iowa': 'ia', 'kansas': 'ks', 'kentucky': 'ky', 'louisiana': 'la',
+    'maine': 'me', 'maryland': 'md', 'massachusetts': 'ma', 'michigan': 'mi', 'minnesota': 'mn',
+    'mississippi': 'ms', 'missouri': 'mo', 'montana': 'mt', 'nebraska': 'ne', 'nevada': 'nv',
+    'new hampshire': 'nh', 'new jersey': 'nj', 'new mexico': 'nm', 'new york': 'ny',
+    'north carolina': 'nc', 'north dakota': 'nd', 'ohio': 'oh', 'oklahoma': 'ok', 'oregon': 'or',
+    'pennsylvania': 'pa', 'puerto rico': 'pr', 'rhode island': 'ri', 'south carolina': 'sc',
+    'south dakota': 'sd', 'tennessee': 'tn', 'texas': 'tx', 'utah': 'ut', 'vermont': 'vt',
+    'virginia': 'va', 'washington': 'wa', 'west virginia': 'wv', 'wisconsin': 'wi', 'wyoming': 'wy',
+}
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_COUNTRY_SUFFIX_RE = re.compile(r',?\s*(usa|us|united states( of america)?)$')
+_ZIP_RE = re.compile(r'(?:^|[\s,])(\d{5})(?:-\d{4})?$')
+_TRAILING_STATE_RE = re.compile(r'^(.+?)\s+([a-z]{2})$')
+
+# Abbreviations used interchangeably in place names ("St. Louis" / "Saint Louis")
+_NAME_ABBREVIATIONS = [('saint ', 'st '), ('sainte ', 'ste '), ('fort ', 'ft '), ('mount ', 'mt ')]
+
+Coordinates = Tuple[float, float]
+
+
+def _name_variants(name: str):
+    base = name.lower().replace('.', '')
+    variants = {base}
+    for long_form, short_form in _NAME_ABBREVIATIONS:
+        if base.startswith(long_form):
+            variants.add(short_form + base[len(long_form):])
+        elif base.startswith(short_form):
+            variants.add(long_form + base[len(short_form):])
+    return variants
+
+
+def normalize_location_query(location: str) -> str:
+    """
+    Canonical cache key for a free-form location:
+    "  Tucson , Arizona, USA" -> "tucson, az"; "85701-1234" -> "85701"
+    """
+    text = _WHITESPACE_RE.sub(' ', location.lower().replace('.', '')).strip(' ,')
+    text = _COUNTRY_SUFFIX_RE.sub('', text).strip(' ,')
+
+    zip_match = _ZIP_RE.search(text)
+    if zip_match:
+        return zip_match.group(1)
+
+    parts = [part.strip() for part in text.split(',') if part.strip()]
+    if len(parts) == 1:
+        trailing = _TRAILING_STATE_RE.match(parts[0])
+        if trailing and trailing.group(2) in US_STATES.values():
+            parts = [trailing.group(1), trailing.group(2)]
+    if len(parts) >= 2:
+        parts[-1] = US_STATES.get(parts[-1], parts[-1])
+    return ', '.join(parts)
+
+
+class Gazetteer:
+    """In-memory lookup of bundled US city and ZIP coordinates, loaded on first use"""
+
+    def __init__(self, data_dir: str = DATA_DIR):
+        self.data_dir = data_dir
+        self._cities: Dict[str, Tuple[int, Coordinates]] = {}
+        self._city_names: Dict[str, Tuple[int, Coordinates]] = {}
+        self._zips: Dict[str, Coordinates] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def lookup(self, normalized_query: str) -> Optional[Coordinates]:
+        """Coordinates for a normalized "city, st", bare city or ZIP query"""
+        self._ensure_loaded()
+
+        if normalized_query.isdigit():
+            return self._zips.get(normalized_query)
+
+        if ',' in normalized_query:
+            best = self._cities.get(normalized_query)
+        else:
+            best = self._city_names.get(normalized_query)
+        return best[1] if best else None
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+
+            with gzip.open(os.path.join(self.data_dir, 'us_zipcodes.csv.gz'), 'rt', newline='') as f:
+                for row in csv.DictReader(f):
+                    self._zips[row['zip']] = (float(row['lat']), float(row['lon']))
+
+            with gzip.open(os.path.join(self.data_dir, 'us_cities.csv.gz'), 'rt', newline='') as f:
+                for row in csv.DictReader(f):
+                    entry = (int(row['population'] or 0), (float(row['lat']), float(row['lon'])))
+                    state = row['state'].lower()
+                    for name in _name_variants(row['city']):
+                        # Duplicate names (and bare city names) resolve to the most populous match
+                        for index, key in ((self._cities, f"{name}, {state}"), (self._city_names, name)):
+                            if entry[0] >= index.get(key, (-1, None))[0]:
+                                index[key] = entry
+
+            self._loaded = True
+            logger.info(f"🗺️ Loaded gazetteer: {len(self._cities)} places, {len(self._zips)} ZIP codes")
+
+
+class GeocodeCache:
+    """
+    Persistent (SQLite) geocode results with an in-memory front.
+
+    Misses are cached too, with a shorter TTL, so unresolvable strings do not
+    hit the network on every call.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, negative_ttl_seconds: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._memory: Dict[str, Tuple[float, Optional[Coordinates]]] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode_cache ("
+                "query TEXT PRIMARY KEY, latitude REAL, longitude REAL, cached_at REAL NOT NULL)"
+            )
+        return self._conn
+
+    def get(self, query: str) -> Tuple[bool, Optional[Coordinates]]:
+        """(hit, coordinates); a hit with None coordinates is a cached miss"""
+        entry = self._memory.get(query)
+        if entry is None:
+            with self._lock:
+                row = self._connection().execute(
+                    "SELECT latitude, longitude, cached_at FROM geocode_cache WHERE query = ?", (query,)
+                ).fetchone()
+            if row is None:
+                return False, None
+            coords = (row[0], row[1]) if row[0] is not None else None
+            entry = (row[2], coords)
+            self._memory[query] = entry
+
+        cached_at, coords = entry
+        ttl = self.ttl_seconds if coords is not None else self.negative_ttl_seconds
+        if time.time() - cached_at > ttl:
+            self._memory.pop(query, None)
+            return False, None
+        return True, coords
+
+    def set(self, query: str, coords: Optional[Coordinates]):
+        cached_at = time.time()
+        self._memory[query] = (cached_at, coords)
+        latitude, longitude = coords if coords else (None, None)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO geocode_cache (query, latitude, longitude, cached_at) VALUES (?, ?, ?, ?)",
+                (query, latitude, longitude, cached_at)
+            )
+            conn.commit()
@@ -1,24 +1,77 @@
 from typing import Optional, Tuple
-from geopy.geocoders import Nominatim
-from geopy.distance import geodesic
+import threading
+import time
+from app.config import settings
+from services.geocoding import Gazetteer, GeocodeCache, normalize_location_query
 from utils.logger import logger
+from utils.helpers import LazySingleton
 
 
 class GeofencingService:
     """Handle location-based filtering"""
     
-    def __init__(self):
-        self.geocoder = Nominatim(user_agent="consumer_intent_detector")
+    # Nominatim usage policy: at most one request per second
+    NOMINATIM_MIN_INTERVAL_SECONDS = 1.0
     
-    def geocode_location(self, location: str) -> Optional[Tuple[float, float]]:
-        """Convert address to coordinates"""
+    def __init__(
+        self,
+        gazetteer: Optional[Gazetteer] = None,
+        cache: Optional[GeocodeCache] = None,
+        offline_only: bool = False
+    ):
+        self._geocoder = None
+        self.gazetteer = gazetteer or Gazetteer()
+        self.cache = cache or GeocodeCache(
+            settings.geocode_cache_path,
+            ttl_seconds=settings.geocode_cache_ttl_seconds,
+            negative_ttl_seconds=settings.geocode_negative_ttl_seconds
+        )
+        self.offline_only = offline_only
+        self._nominatim_lock = threading.Lock()
+        self._last_nominatim_call = 0.0
+    
+    @property
+    def geocoder(self):
+        """Nominatim client, built on first geocoding request"""
+        if self._geocoder is None:
+            from geopy.geocoders import Nominatim
+            self._geocoder = Nominatim(user_agent="consumer_intent_detector")
+        return self._geocoder
+    
+    def geocode_location(self, location: str, allow_network: bool = True) -> Optional[Tuple[float, float]]:
+        """Convert address to coordinates: gazetteer, then cache, then Nominatim"""
+        if not location:
+            return None
+        
+        query = normalize_location_query(location)
+        coords = self.gazetteer.lookup(query)
+        if coords:
+            return coords
+        
+        hit, coords = self.cache.get(query)
+        if hit or self.offline_only or not allow_network:
+            return coords
+        
         try:
-            result = self.geocoder.geocode(location)
-            if result:
-                return (result.latitude, result.longitude)
+            result = self._nominatim_geocode(location)
         except Exception as e:
+            # Transient failures are not cached, so the next call retries
             logger.warning(f"Geocoding failed for '{location}': {e}")
-        return None
+            return None
+        
+        coords = (result.latitude, result.longitude) if result else None
+        self.cache.set(query, coords)
+        return coords
+    
+    def _nominatim_geocode(self, location: str):
+        with self._nominatim_lock:
+            wait = self._last_nominatim_call + self.NOMINATIM_MIN_INTERVAL_SECONDS - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                return self.geocoder.geocode(location)
+            finally:
+                self._last_nominatim_call = time.monotonic()
     
     def is_within_radius(
         self,
@@ -27,6 +80,8 @@ class GeofencingService:
         radius_miles: float
     ) -> bool:
         """Check if two points are within radius"""
+        from geopy.distance import geodesic
+        
         try:
             distance = geodesic(point1, point2).miles
             return distance <= radius_miles
@@ -46,14 +101,22 @@ class GeofencingService:
             logger.warning(f"Could not geocode target location: {target_location}")
             return listings
         
-        filtered = []
-        for listing in listings:
-            if listing.latitude and listing.longitude:
-                listing_coords = (listing.latitude, listing.longitude)
-                if self.is_within_radius(target_coords, listing_coords, radius_miles):
-                    filtered.append(listing)
+        located = [listing for listing in listings if listing.latitude and listing.longitude]
+        if not located:
+            return []
+        
+        # One vectorized haversine pass instead of a geodesic call per listing
+        from services.spatial_index import points_within_radius
         
-        return filtered
+        mask = points_within_radius(
+            [listing.latitude for listing in located],
+            [listing.longitude for listing in located],
+            target_coords,
+            radius_miles
+        )
+        return [listing for listing, inside in zip(located, mask) if inside]
 
 
-geofencing_service = GeofencingService()
+get_geofencing_service = LazySingleton(
+    lambda: GeofencingService(offline_only=settings.geocode_offline_only)
+)
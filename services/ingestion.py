@@ -0,0 +1,97 @@
+import time
+from typing import Awaitable, Callable, Optional
+from app.config import settings
+from app.models import DataSource
+from connectors.registry import get_connector
+from services.normalizer import DataNormalizer
+from services.ai_enrichment import AIEnrichmentService
+from services.jobs import IngestionJob, get_job_registry
+from app.database import get_db_manager
+from utils.logger import logger
+from utils.metrics import SCRAPE_DURATION, SCRAPED_LISTINGS, observe_since
+
+
+Checkpoint = Callable[[IngestionJob], Awaitable[None]]
+
+
+async def process_ingestion(job: IngestionJob):
+    """Run one ingestion job, recording per-stage progress on it"""
+    registry = get_job_registry()
+
+    for source in job.request.sources:
+        try:
+            await ingest_source(job, source, checkpoint=registry.checkpoint)
+        except Exception as e:
+            logger.error(f"Error processing source {source}: {e}")
+
+    logger.info(f"✅ Ingestion complete: {job.counters['persisted']} consumer intents detected")
+
+
+async def ingest_source(
+    job: IngestionJob,
+    source: DataSource,
+    page: int = 1,
+    checkpoint: Optional[Checkpoint] = None
+):
+    """Fetch, normalize, enrich and persist one page of listings from one source"""
+    request = job.request
+    db_manager = get_db_manager()
+
+    connector = get_connector(source)
+    if not connector:
+        logger.warning(f"No connector for source: {source}")
+        job.source_fetched()
+        return
+
+    # Step 1: Fetch raw listings
+    logger.info(f"📥 Fetching listings from {source}...")
+    job.enter_stage('fetch', source.value)
+    started = time.perf_counter()
+    raw_listings = await connector.fetch_listings(
+        location=request.location,
+        radius_miles=request.radius_miles,
+        max_results=request.max_listings,
+        page=page
+    )
+    observe_since(SCRAPE_DURATION, started, source.value)
+    SCRAPED_LISTINGS.labels(source.value).inc(len(raw_listings))
+    job.increment('fetched', len(raw_listings))
+    job.source_fetched()
+
+    # Step 2: Normalize data
+    logger.info(f"🔄 Normalizing {len(raw_listings)} listings...")
+    job.enter_stage('normalize')
+    records = DataNormalizer.normalize_records(raw_listings)
+    job.increment('parsed', len(raw_listings))
+    job.increment('normalized', len(records))
+    job.increment('failed', len(raw_listings) - len(records))
+    del raw_listings
+    if checkpoint is not None:
+        await checkpoint(job)
+
+    for record in records:
+        try:
+            # Market reference first, so the listing's own price is not part of it
+            market = await db_manager.aassess_listing_price(record) if settings.market_prices_enabled else None
+
+            job.enter_stage('persist')
+            await db_manager.asave_listing_record(record)
+
+            # Step 3: AI enrichment (the intent embeds a pydantic listing)
+            logger.info("🤖 Enriching with AI: %s...", record.listing_id, extra={'event': 'listing.enrich'})
+            job.enter_stage('enrich')
+            intent = await AIEnrichmentService.enrich_listing(
+                record.to_model(), on_usage=job.add_token_usage, market=market
+            )
+            job.increment('enriched')
+
+            job.enter_stage('persist')
+            await db_manager.asave_consumer_intent(intent)
+            job.increment('persisted')
+
+        except Exception as e:
+            logger.error(f"Failed to process listing: {e}")
+            job.increment('failed')
+
+        if checkpoint is not None:
+            await checkpoint(job)
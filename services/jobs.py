@@ -0,0 +1,290 @@
+"""
+Ingestion job registry: ids, lifecycle state, per-stage progress counters and
+a concurrency limit for background ingestion runs.
+
+Progress lives in memory so status reads are O(1); snapshots are written to
+the `ingestion_jobs` collection on every state change and at most every
+`ingestion_job_persist_interval_seconds` while running, so a job's last known
+state survives a restart.
+"""
+import asyncio
+import contextvars
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from app.config import settings
+from app.models import IngestionRequest, JobStatus
+from utils.helpers import LazySingleton
+from utils.logger import logger
+from utils.metrics import INGESTION_JOBS, INGESTION_JOBS_FINISHED
+from utils.profiling import ProfileCapture, create_capture
+
+
+COUNTERS = ('fetched', 'parsed', 'normalized', 'enriched', 'persisted', 'failed')
+FINISHED_STATUSES = (JobStatus.DONE, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class JobQueueFullError(Exception):
+    """Raised when submitting while the queue of waiting jobs is full"""
+
+
+class IngestionJob:
+    """Progress of one ingestion run; mutated only from the event loop"""
+
+    def __init__(self, request: IngestionRequest):
+        self.job_id = uuid.uuid4().hex
+        self.request = request
+        self.status = JobStatus.QUEUED
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.stage: Optional[str] = None
+        self.source: Optional[str] = None
+        self.sources_fetched = 0
+        self.stage_seconds: Dict[str, float] = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.task: Optional[asyncio.Task] = None
+        self.profile: Optional[ProfileCapture] = None
+        self._started = None
+        self._stage_started = None
+        self._persisted_at = 0.0
+
+    def increment(self, counter: str, amount: int = 1):
+        self.counters[counter] += amount
+
+    def add_token_usage(self, prompt_tokens: int, completion_tokens: int):
+        self.prompt_tokens += prompt_tokens or 0
+        self.completion_tokens += completion_tokens or 0
+
+    def enter_stage(self, stage: Optional[str], source: Optional[str] = None):
+        """Switch the current stage, accumulating time spent in the previous one"""
+        now = time.monotonic()
+        if self.stage is not None:
+            self.stage_seconds[self.stage] = self.stage_seconds.get(self.stage, 0.0) + now - self._stage_started
+        self.stage = stage
+        self._stage_started = now
+        if source is not None:
+            self.source = source
+
+    def source_fetched(self):
+        self.sources_fetched += 1
+
+    def elapsed_seconds(self) -> float:
+        if self._started is None:
+            return 0.0
+        if self.finished_at is not None:
+            return (self.finished_at - self.started_at).total_seconds()
+        return time.monotonic() - self._started
+
+    def eta_seconds(self) -> Optional[float]:
+        """Remaining time at the current processing rate, assuming unfetched sources return max_listings"""
+        if self.status != JobStatus.RUNNING:
+            return None
+        processed = self.counters['persisted'] + self.counters['failed']
+        elapsed = self.elapsed_seconds()
+        if processed == 0 or elapsed <= 0:
+            return None
+        unfetched = len(self.request.sources) - self.sources_fetched
+        expected = self.counters['fetched'] + unfetched * self.request.max_listings
+        return round(max(expected - processed, 0) / (processed / elapsed), 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-compatible view served by the status endpoint and persisted"""
+        elapsed = self.elapsed_seconds()
+        stage_seconds = dict(self.stage_seconds)
+        if self.stage is not None and self._stage_started is not None:
+            stage_seconds[self.stage] = stage_seconds.get(self.stage, 0.0) + time.monotonic() - self._stage_started
+        return {
+            "job_id": self.job_id,
+            "status": self.status.value,
+            "error": self.error,
+            "request": self.request.model_dump(mode='json'),
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "elapsed_seconds": round(elapsed, 1),
+            "current_stage": self.stage,
+            "current_source": self.source,
+            "current_stage_seconds": round(time.monotonic() - self._stage_started, 1) if self.stage else None,
+            "sources_fetched": self.sources_fetched,
+            "counters": dict(self.counters),
+            "rates_per_sec": {
+                name: round(value / elapsed, 2) if elapsed > 0 else 0.0
+                for name, value in self.counters.items()
+            },
+            "stage_seconds": {name: round(seconds, 1) for name, seconds in stage_seconds.items()},
+            "eta_seconds": self.eta_seconds(),
+            "tokens": {
+                "prompt": self.prompt_tokens,
+                "completion": self.completion_tokens,
+                "total": self.prompt_tokens + self.completion_tokens,
+            },
+            "profile_id": self.profile.profile_id if self.profile else None,
+        }
+
+    def mark_running(self):
+        self.status = JobStatus.RUNNING
+        self.started_at = datetime.now()
+        self._started = time.monotonic()
+
+    def mark_finished(self, status: JobStatus, error: Optional[str] = None):
+        self.enter_stage(None)
+        self.status = status
+        self.error = error
+        self.finished_at = datetime.now()
+        if self.started_at is None:
+            self.started_at = self.finished_at
+
+
+JobRunner = Callable[[IngestionJob], Awaitable[None]]
+
+
+class JobRegistry:
+    """Tracks ingestion jobs and runs at most `max_concurrent` of them at once"""
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queued: int,
+        history: int,
+        persist_interval_seconds: float,
+        persist: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.history = history
+        self.persist_interval_seconds = persist_interval_seconds
+        self._persist = persist
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @classmethod
+    def from_settings(cls) -> "JobRegistry":
+        return cls(
+            max_concurrent=settings.ingestion_max_concurrent_jobs,
+            max_queued=settings.ingestion_max_queued_jobs,
+            history=settings.ingestion_job_history,
+            persist_interval_seconds=settings.ingestion_job_persist_interval_seconds,
+            persist=_persist_to_firestore
+        )
+
+    def submit(
+        self,
+        request: IngestionRequest,
+        runner: JobRunner,
+        profile: Optional[List[str]] = None
+    ) -> IngestionJob:
+        """
+        Register a job and schedule it; it stays queued until a slot is free
+
+        profile lists the profile kinds to capture while it runs (default:
+        profiling_kinds when profiling_ingestion_jobs is set).
+        """
+        if self.count(JobStatus.QUEUED) >= self.max_queued:
+            raise JobQueueFullError(f"{self.max_queued} ingestion jobs are already queued")
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        job = IngestionJob(request)
+        if profile is None and settings.profiling_ingestion_jobs:
+            profile = settings.profiling_kinds
+        job.profile = create_capture(f"job-{job.job_id}", profile or [])
+        self._jobs[job.job_id] = job
+        self._trim_history()
+        # A job outlives the request that submitted it, so it does not inherit the
+        # request's context variables (such as a request profiler)
+        job.task = asyncio.create_task(self._run(job, runner), context=contextvars.Context())
+        self._update_gauges()
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> List[IngestionJob]:
+        return list(self._jobs.values())
+
+    def count(self, status: JobStatus) -> int:
+        return sum(1 for job in self._jobs.values() if job.status == status)
+
+    def cancel(self, job_id: str) -> Optional[IngestionJob]:
+        """Request cancellation; returns the job, or None if it is unknown"""
+        job = self._jobs.get(job_id)
+        if job is not None and job.status not in FINISHED_STATUSES and job.task is not None:
+            job.task.cancel()
+        return job
+
+    async def checkpoint(self, job: IngestionJob):
+        """Persist progress if the last snapshot is older than the persist interval"""
+        if time.monotonic() - job._persisted_at >= self.persist_interval_seconds:
+            await self._save(job)
+
+    async def shutdown(self):
+        """Cancel unfinished jobs and wait for them to record their final state"""
+        tasks = [job.task for job in self._jobs.values() if job.task is not None and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job: IngestionJob, runner: JobRunner):
+        try:
+            await self._save(job)
+            async with self._semaphore:
+                job.mark_running()
+                self._update_gauges()
+                logger.info(f"🏃 Ingestion job {job.job_id} started")
+                await self._save(job)
+                await self._run_profiled(job, runner)
+        except asyncio.CancelledError:
+            job.mark_finished(JobStatus.CANCELLED)
+            logger.info(f"🛑 Ingestion job {job.job_id} cancelled")
+        except Exception as e:
+            job.mark_finished(JobStatus.FAILED, str(e))
+            logger.error(f"Ingestion job {job.job_id} failed: {e}")
+        else:
+            job.mark_finished(JobStatus.DONE)
+            logger.info(f"✅ Ingestion job {job.job_id} done: {job.counters}")
+        self._update_gauges()
+        INGESTION_JOBS_FINISHED.labels(job.status.value).inc()
+        await self._save(job)
+
+    async def _run_profiled(self, job: IngestionJob, runner: JobRunner):
+        if job.profile is None:
+            await runner(job)
+            return
+        job.profile.start()
+        try:
+            await runner(job)
+        finally:
+            job.profile.stop()
+
+    async def _save(self, job: IngestionJob):
+        job._persisted_at = time.monotonic()
+        if self._persist is None:
+            return
+        try:
+            await self._persist(job.snapshot())
+        except Exception as e:
+            logger.warning(f"Could not persist ingestion job {job.job_id}: {e}")
+
+    def _update_gauges(self):
+        for status in (JobStatus.QUEUED, JobStatus.RUNNING):
+            INGESTION_JOBS.labels(status.value).set(self.count(status))
+
+    def _trim_history(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED_STATUSES]
+        for job_id in finished[:max(len(finished) - self.history, 0)]:
+            del self._jobs[job_id]
+
+
+async def _persist_to_firestore(snapshot: Dict[str, Any]):
+    from app.database import get_db_manager
+
+    await get_db_manager().asave_ingestion_job(snapshot)
+
+
+get_job_registry = LazySingleton(JobRegistry.from_settings)
@@ -0,0 +1,126 @@
+"""
+APScheduler job store backed by a local SQLite file.
+
+Same table layout and pickled job state as APScheduler's SQLAlchemyJobStore,
+using the standard-library sqlite3 driver so persistent schedules do not need
+SQLAlchemy.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+from apscheduler.job import Job
+from apscheduler.jobstores.base import BaseJobStore, ConflictingIdError, JobLookupError
+from apscheduler.util import datetime_to_utc_timestamp, utc_timestamp_to_datetime
+
+
+class SQLiteJobStore(BaseJobStore):
+    """Persistent job store; survives restarts so missed runs can be coalesced"""
+
+    def __init__(self, path: str, tablename: str = 'apscheduler_jobs', pickle_protocol: int = pickle.HIGHEST_PROTOCOL):
+        super().__init__()
+        self.path = path
+        self.tablename = tablename
+        self.pickle_protocol = pickle_protocol
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def start(self, scheduler, alias):
+        super().start(scheduler, alias)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.tablename} ("
+                "id TEXT PRIMARY KEY, next_run_time REAL, job_state BLOB NOT NULL)"
+            )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_{self.tablename}_next_run_time ON {self.tablename} (next_run_time)"
+            )
+
+    def lookup_job(self, job_id):
+        row = self._execute(f"SELECT job_state FROM {self.tablename} WHERE id = ?", (job_id,)).fetchone()
+        return self._reconstitute_job(row[0]) if row else None
+
+    def get_due_jobs(self, now):
+        return self._get_jobs("WHERE next_run_time <= ?", (datetime_to_utc_timestamp(now),))
+
+    def get_next_run_time(self):
+        row = self._execute(
+            f"SELECT next_run_time FROM {self.tablename} WHERE next_run_time IS NOT NULL "
+            "ORDER BY next_run_time LIMIT 1"
+        ).fetchone()
+        return utc_timestamp_to_datetime(row[0]) if row else None
+
+    def get_all_jobs(self):
+        jobs = self._get_jobs()
+        self._fix_paused_jobs_sorting(jobs)
+        return jobs
+
+    def add_job(self, job):
+        try:
+            self._execute(
+                f"INSERT INTO {self.tablename} (id, next_run_time, job_state) VALUES (?, ?, ?)",
+                (job.id, datetime_to_utc_timestamp(job.next_run_time), self._dump(job))
+            )
+        except sqlite3.IntegrityError:
+            raise ConflictingIdError(job.id)
+
+    def update_job(self, job):
+        cursor = self._execute(
+            f"UPDATE {self.tablename} SET next_run_time = ?, job_state = ? WHERE id = ?",
+            (datetime_to_utc_timestamp(job.next_run_time), self._dump(job), job.id)
+        )
+        if cursor.rowcount == 0:
+            raise JobLookupError(job.id)
+
+    def remove_job(self, job_id):
+        cursor = self._execute(f"DELETE FROM {self.tablename} WHERE id = ?", (job_id,))
+        if cursor.rowcount == 0:
+            raise JobLookupError(job_id)
+
+    def remove_all_jobs(self):
+        self._execute(f"DELETE FROM {self.tablename}")
+
+    def shutdown(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params)
+
+    def _dump(self, job) -> bytes:
+        return pickle.dumps(job.__getstate__(), self.pickle_protocol)
+
+    def _reconstitute_job(self, job_state):
+        job_state = pickle.loads(job_state)
+        job_state['jobstore'] = self
+        job = Job.__new__(Job)
+        job.__setstate__(job_state)
+        job._scheduler = self._scheduler
+        job._jobstore_alias = self._alias
+        return job
+
+    def _get_jobs(self, where: str = '', params: tuple = ()):
+        rows = self._execute(
+            f"SELECT id, job_state FROM {self.tablename} {where} ORDER BY next_run_time", params
+        ).fetchall()
+
+        jobs = []
+        failed_job_ids = []
+        for job_id, job_state in rows:
+            try:
+                jobs.append(self._reconstitute_job(job_state))
+            except BaseException:
+                self._logger.exception('Unable to restore job "%s" -- removing it', job_id)
+                failed_job_ids.append(job_id)
+
+        for job_id in failed_job_ids:
+            self._execute(f"DELETE FROM {self.tablename} WHERE id = ?", (job_id,))
+        return jobs
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} (path={self.path})>"
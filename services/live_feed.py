@@ -0,0 +1,234 @@
+"""
+Live feed of newly detected intents, for SSE / WebSocket subscribers.
+
+Every saved intent is published with an event id. Each subscriber has query
+filters (the IntentQueryRequest filters, matched with the same rules the
+cache uses for invalidation) and a bounded buffer. A subscriber that falls
+more than `live_feed_buffer_size` events behind is told it lagged and is
+disconnected; it resumes from its last event id and the gap is replayed from
+the recent-events buffer.
+
+Backends:
+- local (default): events are fanned out inside the process that saved the
+  intent. Event ids are "<process start ms>-<sequence>", so ids from before a
+  restart sort before new ones.
+- Redis stream (LIVE_FEED_REDIS_URL): every API and ingest-worker process
+  appends to one stream, so subscribers on any API worker see intents saved
+  anywhere. Event ids are the stream ids.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from app.config import settings
+from services.cache import intent_matches_filters, normalize_query_filters
+from utils.helpers import LazySingleton
+from utils.logger import logger
+from utils.metrics import LIVE_FEED_SUBSCRIBERS
+
+
+@dataclass(slots=True)
+class FeedEvent:
+    event_id: str
+    doc: Dict[str, Any]
+
+    @property
+    def key(self) -> Tuple[int, ...]:
+        return event_key(self.event_id)
+
+
+LAGGED = object()
+
+
+def event_key(event_id: Optional[str]) -> Tuple[int, ...]:
+    """Sortable form of an event id ("1700000000000-12"); malformed or missing ids sort first"""
+    try:
+        return tuple(int(part) for part in event_id.split('-'))
+    except (AttributeError, ValueError):
+        return (0,)
+
+
+class Subscription:
+    """One client's filters and bounded buffer; events are consumed with get()"""
+
+    def __init__(self, filters: Dict[str, Any], buffer_size: int, last_event_id: Optional[str] = None):
+        self.filters = filters
+        self.lagged = False
+        self.loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self._backlog: Deque[FeedEvent] = deque()
+        self._last_key = event_key(last_event_id) if last_event_id else None
+
+    def matches(self, doc: Dict[str, Any]) -> bool:
+        return intent_matches_filters(doc, self.filters)
+
+    def offer(self, event: FeedEvent):
+        """Buffer an event (event loop thread only); a full buffer marks the subscriber as lagged"""
+        if self.lagged:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Buffered events are still delivered; get() reports LAGGED after them
+            self.lagged = True
+
+    def replay(self, events: List[FeedEvent]):
+        self._backlog.extend(event for event in events if self.matches(event.doc))
+
+    async def get(self):
+        """Next event in id order, or LAGGED once the buffer overflowed and drained"""
+        while True:
+            if self._backlog:
+                event = self._backlog.popleft()
+            elif self.lagged and self._queue.empty():
+                return LAGGED
+            else:
+                event = await self._queue.get()
+            # Live events can overlap the replayed backlog; skip anything already sent
+            if self._last_key is not None and event.key <= self._last_key:
+                continue
+            self._last_key = event.key
+            return event
+
+
+class IntentFeed:
+    """Publishes saved intents and fans them out to the subscriptions of this process"""
+
+    def __init__(self, buffer_size: int, replay_size: int, redis_client=None, stream_key: str = 'intent_feed'):
+        self.buffer_size = buffer_size
+        self.replay_size = replay_size
+        self.redis = redis_client
+        self.stream_key = stream_key
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._recent: Deque[FeedEvent] = deque(maxlen=replay_size)
+        self._epoch = int(time.time() * 1000)
+        self._sequence = 0
+        self._reader: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(cls) -> "IntentFeed":
+        client = None
+        if settings.live_feed_redis_url:
+            import redis  # optional dependency, only needed for the cross-worker backend
+            client = redis.Redis.from_url(settings.live_feed_redis_url)
+        return cls(
+            buffer_size=settings.live_feed_buffer_size,
+            replay_size=settings.live_feed_replay_size,
+            redis_client=client
+        )
+
+    # ---- publishing (any thread) ----
+
+    def publish(self, doc: Dict[str, Any]):
+        """Publish a saved intent document"""
+        if self.redis is not None:
+            try:
+                self.redis.xadd(
+                    self.stream_key, {'doc': json.dumps(doc, default=str)},
+                    maxlen=self.replay_size, approximate=True
+                )
+            except Exception as e:
+                logger.warning(f"Live feed publish failed: {e}")
+            return
+
+        with self._lock:
+            self._sequence += 1
+            event = FeedEvent(f"{self._epoch}-{self._sequence}", doc)
+            self._recent.append(event)
+            subscriptions = list(self._subscriptions)
+        self._dispatch(event, subscriptions)
+
+    # ---- subscribing (event loop) ----
+
+    async def subscribe(self, filters: Dict[str, Any], last_event_id: Optional[str] = None) -> Subscription:
+        """Register a subscription; with last_event_id, newer matching events are replayed first"""
+        subscription = Subscription(normalize_query_filters(filters), self.buffer_size, last_event_id)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        LIVE_FEED_SUBSCRIBERS.inc()
+
+        if self.redis is not None:
+            await self._ensure_reader()
+        if last_event_id and event_key(last_event_id) != (0,):
+            subscription.replay(await self._events_after(last_event_id))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription not in self._subscriptions:
+                return
+            self._subscriptions.discard(subscription)
+        LIVE_FEED_SUBSCRIBERS.dec()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+
+    # ---- internals ----
+
+    def _dispatch(self, event: FeedEvent, subscriptions: List[Subscription]):
+        for subscription in subscriptions:
+            if subscription.matches(event.doc):
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+
+    async def _events_after(self, last_event_id: str) -> List[FeedEvent]:
+        if self.redis is not None:
+            entries = await asyncio.to_thread(self.redis.xrange, self.stream_key, f"({last_event_id}", '+')
+            return [self._from_entry(entry_id, fields) for entry_id, fields in entries]
+        last_key = event_key(last_event_id)
+        with self._lock:
+            return [event for event in self._recent if event.key > last_key]
+
+    async def _ensure_reader(self):
+        if self._reader is not None and not self._reader.done():
+            return
+        # Start from the current tail (not '$' at first read), so nothing published
+        # between a subscriber's replay and the reader's first read is missed
+        tail = await asyncio.to_thread(self.redis.xrevrange, self.stream_key, '+', '-', count=1)
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read_stream(_decode(tail[0][0]) if tail else '0-0'))
+
+    async def _read_stream(self, last_id: str):
+        """Follow the Redis stream and fan new entries out to this process's subscriptions"""
+        while True:
+            try:
+                response = await asyncio.to_thread(
+                    self.redis.xread, {self.stream_key: last_id}, count=500, block=5000
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Live feed stream read failed: {e}")
+                await asyncio.sleep(1)
+                continue
+
+            for _, entries in response or []:
+                for entry_id, fields in entries:
+                    event = self._from_entry(entry_id, fields)
+                    last_id = event.event_id
+                    with self._lock:
+                        subscriptions = list(self._subscriptions)
+                    for subscription in subscriptions:
+                        if subscription.matches(event.doc):
+                            subscription.offer(event)
+
+    @staticmethod
+    def _from_entry(entry_id, fields) -> FeedEvent:
+        return FeedEvent(_decode(entry_id), json.loads(fields.get(b'doc', fields.get('doc'))))
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+get_intent_feed = LazySingleton(IntentFeed.from_settings)
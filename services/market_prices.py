@@ -0,0 +1,337 @@
+"""
+Market price index: price distributions of recent listings by segment, for
+judging whether a listing is a deal.
+
+A segment is (make, model, year bucket, mileage bucket, region). Each segment
+holds a fixed-size quantile sketch: counts over log-spaced price bins, each
+bin ~RELATIVE_ACCURACY wide, so adding a listing is one increment and
+percentiles and quantiles are read from a cumulative count of a few hundred
+bins no matter how many listings the segment has seen. Listings also count
+towards the coarser segments (dropping region, then mileage, then year), and
+lookups fall back to the finest segment with at least `min_samples` listings.
+
+Listings saved in this process are added as they are persisted; listings
+saved by other processes are picked up by a periodic delta load of listings
+scraped after the newest one read from storage (with an overlap window for
+late commits). Listings older than the lookback window are removed on refresh.
+"""
+import heapq
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from app.config import settings
+from utils.logger import logger
+
+# Fields read when loading listings into the index
+MARKET_PRICE_FIELDS = ['listing_id', 'make', 'model', 'year', 'mileage', 'state', 'price', 'scraped_at']
+
+PRICE_MIN = 500.0
+PRICE_MAX = 1_000_000.0
+RELATIVE_ACCURACY = 0.02
+QUANTILES = {'p10': 0.1, 'p25': 0.25, 'median': 0.5, 'p75': 0.75, 'p90': 0.9}
+
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+_BINS = int(math.ceil(math.log(PRICE_MAX / PRICE_MIN) / _LOG_GAMMA)) + 1
+
+Loader = Callable[[Optional[str]], Iterator[List[Dict[str, Any]]]]
+SegmentKey = Tuple[Any, ...]
+
+
+def _price_bin(price: float) -> int:
+    return min(_BINS - 1, max(0, int(math.log(max(price, PRICE_MIN) / PRICE_MIN) / _LOG_GAMMA)))
+
+
+def _bin_price(index: int) -> float:
+    """Representative price of a bin (geometric midpoint, within RELATIVE_ACCURACY of any price in it)"""
+    return PRICE_MIN * _GAMMA ** (index + 0.5)
+
+
+def _timestamp(value) -> Optional[float]:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return None
+
+
+class _PriceSketch:
+    """Listing counts over log-spaced price bins"""
+
+    __slots__ = ('counts', 'total', '_cumulative')
+
+    def __init__(self):
+        self.counts = np.zeros(_BINS, dtype=np.int32)
+        self.total = 0
+        self._cumulative: Optional[np.ndarray] = None
+
+    def add(self, index: int, count: int = 1):
+        self.counts[index] += count
+        self.total += count
+        self._cumulative = None
+
+    def without(self, index: int) -> "_PriceSketch":
+        """Copy with one listing in bin `index` removed"""
+        copy = _PriceSketch()
+        copy.counts[:] = self.counts
+        copy.total = self.total
+        copy.add(index, -1)
+        return copy
+
+    def cumulative(self) -> np.ndarray:
+        if self._cumulative is None:
+            self._cumulative = np.cumsum(self.counts)
+        return self._cumulative
+
+    def percentile(self, price: float) -> float:
+        """Share of listings priced below `price` (half of its own bin), 0-100"""
+        index = _price_bin(price)
+        below = self.cumulative()[index - 1] if index else 0
+        return 100.0 * (below + 0.5 * self.counts[index]) / self.total
+
+    def quantile(self, q: float) -> float:
+        index = int(np.searchsorted(self.cumulative(), q * self.total))
+        return _bin_price(min(index, _BINS - 1))
+
+
+class MarketPriceIndex:
+    """Per-segment price sketches of recent listings answering percentile lookups"""
+
+    def __init__(
+        self,
+        loader: Loader,
+        lookback_days: float = 90.0,
+        year_bucket: int = 3,
+        mileage_bucket: int = 25000,
+        min_samples: int = 5,
+        refresh_seconds: float = 300.0,
+        refresh_overlap_seconds: float = 300.0
+    ):
+        self.loader = loader
+        self.lookback = lookback_days * 86400
+        self.year_bucket = year_bucket
+        self.mileage_bucket = mileage_bucket
+        self.min_samples = min_samples
+        self.refresh_seconds = refresh_seconds
+        self.refresh_overlap = refresh_overlap_seconds
+
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+        self._segments: Dict[SegmentKey, _PriceSketch] = {}
+        # listing_id -> (scraped timestamp, price bin, sketches it is counted in)
+        self._listings: Dict[str, Tuple[float, int, Tuple[_PriceSketch, ...]]] = {}
+        # (scraped timestamp, listing_id) min-heap for expiry; entries of re-scraped listings go stale
+        self._expiry: List[Tuple[float, str]] = []
+        # Newest scraped_at read from storage; local saves do not move it, so
+        # listings other processes commit meanwhile are still picked up
+        self._watermark: Optional[str] = None
+        self._loading = False
+        self._loaded = False
+        self._last_refresh = 0.0
+        self._refreshing = False
+
+    @classmethod
+    def from_settings(cls, loader: Loader) -> "MarketPriceIndex":
+        return cls(
+            loader,
+            lookback_days=settings.market_lookback_days,
+            year_bucket=settings.market_year_bucket,
+            mileage_bucket=settings.market_mileage_bucket,
+            min_samples=settings.market_min_samples,
+            refresh_seconds=settings.market_refresh_seconds,
+            refresh_overlap_seconds=settings.market_refresh_overlap_seconds
+        )
+
+    def __len__(self) -> int:
+        return len(self._listings)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def segment_keys(
+        self,
+        make: Optional[str],
+        model: Optional[str],
+        year: Optional[int] = None,
+        mileage: Optional[int] = None,
+        region: Optional[str] = None
+    ) -> List[SegmentKey]:
+        """Segments a vehicle falls in, finest first; empty without make and model"""
+        make, model = (make or '').strip().lower(), (model or '').strip().lower()
+        if not make or not model:
+            return []
+        keys = [(make, model)]
+        if year is None:
+            return keys
+        years = int(year) // self.year_bucket * self.year_bucket
+        keys.insert(0, (make, model, years))
+        if mileage is None:
+            return keys
+        miles = int(mileage) // self.mileage_bucket * self.mileage_bucket
+        keys.insert(0, (make, model, years, miles))
+        if region:
+            keys.insert(0, (make, model, years, miles, region.strip().upper()))
+        return keys
+
+    # ---- updates ----
+
+    def on_listing_saved(self, doc: Dict[str, Any]):
+        """Add a saved listing; ignored until the index is first used"""
+        if self._loaded or self._loading:
+            with self._lock:
+                self._upsert(doc)
+
+    def ensure_loaded(self):
+        """Load listings scraped within the lookback window on first use (blocking)"""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            self._loading = True
+            started = time.perf_counter()
+            since = datetime.fromtimestamp(time.time() - self.lookback).isoformat()
+            try:
+                self._load(since)
+            finally:
+                self._loading = False
+            self._loaded = True
+            self._last_refresh = time.monotonic()
+            logger.info(
+                f"💲 Market price index loaded: {len(self)} listings in {len(self._segments)} segments "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+
+    def refresh(self):
+        """
+        Load listings scraped after the newest one read so far, less an overlap
+        for late commits (re-read listings replace themselves), and drop those
+        past the lookback window
+        """
+        with self._load_lock:
+            try:
+                since = None
+                if self._watermark is not None:
+                    since = datetime.fromtimestamp(_timestamp(self._watermark) - self.refresh_overlap).isoformat()
+                self._load(since)
+                with self._lock:
+                    self._expire(time.time() - self.lookback)
+            except Exception as e:
+                logger.warning(f"Market price index refresh failed: {e}")
+            finally:
+                self._last_refresh = time.monotonic()
+                self._refreshing = False
+
+    def _load(self, since: Optional[str]):
+        for chunk in self.loader(since):
+            with self._lock:
+                for doc in chunk:
+                    self._upsert(doc)
+                    scraped_at = doc.get('scraped_at')
+                    if scraped_at is not None and (self._watermark is None or str(scraped_at) > self._watermark):
+                        self._watermark = str(scraped_at)
+
+    def _upsert(self, doc: Dict[str, Any]):
+        listing_id, price = doc.get('listing_id'), doc.get('price')
+        scraped = _timestamp(doc.get('scraped_at'))
+        if not listing_id or scraped is None:
+            return
+
+        # A re-scraped listing replaces its previous price and moves to the newest end
+        self._remove(listing_id)
+        if not price or price <= 0:
+            return
+        keys = self.segment_keys(doc.get('make'), doc.get('model'), doc.get('year'), doc.get('mileage'), doc.get('state'))
+        if not keys:
+            return
+
+        index = _price_bin(price)
+        sketches = tuple(self._segments.setdefault(key, _PriceSketch()) for key in keys)
+        for sketch in sketches:
+            sketch.add(index)
+        self._listings[listing_id] = (scraped, index, sketches)
+        heapq.heappush(self._expiry, (scraped, listing_id))
+
+    def _remove(self, listing_id: str):
+        entry = self._listings.pop(listing_id, None)
+        if entry is not None:
+            _, index, sketches = entry
+            for sketch in sketches:
+                sketch.add(index, -1)
+
+    def _expire(self, cutoff: float):
+        while self._expiry and self._expiry[0][0] < cutoff:
+            scraped, listing_id = heapq.heappop(self._expiry)
+            entry = self._listings.get(listing_id)
+            if entry is not None and entry[0] == scraped:
+                self._remove(listing_id)
+
+    def _maybe_refresh(self):
+        if not self.refresh_seconds or self._refreshing:
+            return
+        if time.monotonic() - self._last_refresh < self.refresh_seconds:
+            return
+        self._refreshing = True
+        threading.Thread(target=self.refresh, name="market-price-refresh", daemon=True).start()
+
+    # ---- lookups ----
+
+    def lookup(
+        self,
+        make: Optional[str],
+        model: Optional[str],
+        year: Optional[int] = None,
+        mileage: Optional[int] = None,
+        region: Optional[str] = None,
+        price: Optional[float] = None,
+        exclude_listing_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Price distribution of the finest segment with at least `min_samples`
+        listings, plus the percentile of `price` in it; None without enough data.
+        The listing `exclude_listing_id`, if held, is left out of the distribution.
+        """
+        self.ensure_loaded()
+        self._maybe_refresh()
+
+        with self._lock:
+            excluded = self._listings.get(exclude_listing_id) if exclude_listing_id else None
+            for key in self.segment_keys(make, model, year, mileage, region):
+                sketch = self._segments.get(key)
+                if sketch is not None and excluded is not None and any(sketch is held for held in excluded[2]):
+                    sketch = sketch.without(excluded[1])
+                if sketch is None or sketch.total < self.min_samples:
+                    continue
+                result = {
+                    'segment': self._describe(key),
+                    'listings': sketch.total,
+                    **{name: round(sketch.quantile(q)) for name, q in QUANTILES.items()},
+                }
+                if price:
+                    result['percentile'] = round(sketch.percentile(price), 1)
+                return result
+        return None
+
+    def assess(self, listing) -> Optional[Dict[str, Any]]:
+        """lookup() for a NormalizedListing or ListingRecord at its own price, leaving the listing itself out"""
+        if not listing.price:
+            return None
+        return self.lookup(
+            listing.make, listing.model, listing.year, listing.mileage, listing.state, listing.price,
+            exclude_listing_id=listing.listing_id
+        )
+
+    def _describe(self, key: SegmentKey) -> Dict[str, Any]:
+        segment = {'make': key[0], 'model': key[1]}
+        if len(key) > 2:
+            segment['years'] = [key[2], key[2] + self.year_bucket - 1]
+        if len(key) > 3:
+            segment['mileage'] = [key[3], key[3] + self.mileage_bucket - 1]
+        if len(key) > 4:
+            segment['region'] = key[4]
+        return segment
@@ -1,8 +1,20 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import hashlib
+import time
+from pydantic import TypeAdapter, ValidationError
 from app.models import RawListing, NormalizedListing, DataSource
+from app.records import ListingRecord
+from services.geofencing import get_geofencing_service
+from utils.helpers import (
+    clean_price, clean_mileage, parse_date, parse_location, parse_vehicle_title,
+    extract_email, extract_phone_from_description
+)
 from utils.logger import logger
+from utils.metrics import NORMALIZE_DURATION, NORMALIZED_LISTINGS, observe_since
+
+
+_listing_list_adapter = TypeAdapter(List[NormalizedListing])
 
 
 class DataNormalizer:
@@ -11,6 +23,69 @@ class DataNormalizer:
     @staticmethod
     def normalize_listing(raw_listing: RawListing) -> NormalizedListing:
         """Convert raw listing to normalized format"""
+        normalized = NormalizedListing.model_validate(DataNormalizer._build_row(raw_listing))
+        
+        logger.debug("Normalized listing: %s", normalized.listing_id, extra={'event': 'listing.normalized'})
+        return normalized
+    
+    @staticmethod
+    def normalize_batch(raw_listings: List[RawListing]) -> List[NormalizedListing]:
+        """
+        Normalize many listings with one validation pass.
+        
+        Rows that fail validation are dropped (and logged) rather than failing
+        the whole batch.
+        """
+        started = time.perf_counter()
+        geocode_memo: Dict[str, Optional[Tuple[float, float]]] = {}
+        rows = [DataNormalizer._build_row(raw, geocode_memo) for raw in raw_listings]
+        
+        try:
+            listings = _listing_list_adapter.validate_python(rows)
+        except ValidationError as e:
+            bad_rows = {error['loc'][0] for error in e.errors() if error['loc']}
+            logger.warning(f"Dropping {len(bad_rows)} of {len(rows)} listings that failed validation")
+            listings = _listing_list_adapter.validate_python(
+                [row for index, row in enumerate(rows) if index not in bad_rows]
+            )
+        
+        DataNormalizer._record_batch('batch', started, len(raw_listings), len(listings))
+        return listings
+    
+    @staticmethod
+    def normalize_records(raw_listings: List[RawListing]) -> List[ListingRecord]:
+        """
+        Normalize into compact ListingRecords for the ingestion pipeline,
+        skipping pydantic validation; listings whose fields cannot be coerced
+        are dropped.
+        """
+        started = time.perf_counter()
+        geocode_memo: Dict[str, Optional[Tuple[float, float]]] = {}
+        records = []
+        dropped = 0
+        for raw in raw_listings:
+            try:
+                records.append(ListingRecord.from_row(DataNormalizer._build_row(raw, geocode_memo)))
+            except (TypeError, ValueError, KeyError):
+                dropped += 1
+        
+        if dropped:
+            logger.warning(f"Dropping {dropped} of {len(raw_listings)} listings with invalid fields")
+        DataNormalizer._record_batch('records', started, len(raw_listings), len(records))
+        return records
+    
+    @staticmethod
+    def _record_batch(method: str, started: float, total: int, normalized: int):
+        observe_since(NORMALIZE_DURATION, started, method)
+        NORMALIZED_LISTINGS.labels(method, 'ok').inc(normalized)
+        NORMALIZED_LISTINGS.labels(method, 'dropped').inc(total - normalized)
+    
+    @staticmethod
+    def _build_row(
+        raw_listing: RawListing,
+        geocode_memo: Optional[Dict[str, Optional[Tuple[float, float]]]] = None
+    ) -> Dict[str, Any]:
+        """Map a raw listing onto NormalizedListing fields, parsing loosely formatted values"""
         raw_data = raw_listing.raw_data
         
         # Generate unique listing ID
@@ -20,40 +95,64 @@ class DataNormalizer:
             raw_data.get('title', '')
         )
         
+        # Year/make/model from the title when the source has no structured fields
+        year, make, model = raw_data.get('year'), raw_data.get('make'), raw_data.get('model')
+        if year is None or not make or not model:
+            title_year, title_make, title_model = parse_vehicle_title(raw_data.get('title', ''))
+            year = year if year is not None else title_year
+            make = make or title_make
+            model = model or title_model
+        
         # Extract location components
         location = raw_data.get('location', '')
         city, state, zip_code = DataNormalizer._parse_location(location)
         
-        # Build normalized listing
-        normalized = NormalizedListing(
-            listing_id=listing_id,
-            source=raw_listing.source,
-            url=raw_data.get('url', raw_listing.url),
-            title=raw_data.get('title', 'Unknown'),
-            price=raw_data.get('price'),
-            year=raw_data.get('year'),
-            make=raw_data.get('make'),
-            model=raw_data.get('model'),
-            mileage=raw_data.get('mileage'),
-            condition=raw_data.get('condition'),
-            location=location,
-            city=city,
-            state=state,
-            zip_code=zip_code,
-            latitude=raw_data.get('latitude'),
-            longitude=raw_data.get('longitude'),
-            seller_name=raw_data.get('seller_name'),
-            seller_type=raw_data.get('seller_type', 'unknown'),
-            phone=raw_data.get('phone'),
-            email=raw_data.get('email'),
-            description=raw_data.get('description'),
-            images=raw_data.get('images', []),
-            listing_date=DataNormalizer._parse_date(raw_data.get('listing_date')),
-            scraped_at=raw_listing.scraped_at
-        )
+        # Coordinates from the offline gazetteer/cache when the source omits them
+        latitude, longitude = raw_data.get('latitude'), raw_data.get('longitude')
+        if (latitude is None or longitude is None) and location:
+            if geocode_memo is not None and location in geocode_memo:
+                coords = geocode_memo[location]
+            else:
+                coords = get_geofencing_service().geocode_location(location, allow_network=False)
+                if geocode_memo is not None:
+                    geocode_memo[location] = coords
+            if coords:
+                latitude, longitude = coords
         
-        logger.debug(f"Normalized listing: {listing_id}")
-        return normalized
+        # Contact details are often only in the free-text description
+        description = raw_data.get('description')
+        phone = raw_data.get('phone')
+        email = raw_data.get('email')
+        if description:
+            phone = phone or extract_phone_from_description(description)
+            email = email or extract_email(description)
+        
+        return {
+            'listing_id': listing_id,
+            'source': raw_listing.source,
+            'url': raw_data.get('url', raw_listing.url),
+            'title': raw_data.get('title', 'Unknown'),
+            'price': clean_price(raw_data.get('price')),
+            'year': year,
+            'make': make,
+            'model': model,
+            'mileage': clean_mileage(raw_data.get('mileage')),
+            'condition': raw_data.get('condition'),
+            'location': location,
+            'city': city,
+            'state': state,
+            'zip_code': zip_code,
+            'latitude': latitude,
+            'longitude': longitude,
+            'seller_name': raw_data.get('seller_name'),
+            'seller_type': raw_data.get('seller_type', 'unknown'),
+            'phone': phone,
+            'email': email,
+            'description': description,
+            'images': raw_data.get('images', []),
+            'listing_date': DataNormalizer._parse_date(raw_data.get('listing_date')),
+            'scraped_at': raw_listing.scraped_at
+        }
     
     @staticmethod
     def _generate_listing_id(source: DataSource, url: str, title: str) -> str:
@@ -64,24 +163,9 @@ class DataNormalizer:
     @staticmethod
     def _parse_location(location_str: str) -> tuple:
         """Extract city, state, zip from location string"""
-        if not location_str:
-            return None, None, None
-        
-        parts = location_str.split(',')
-        city = parts[0].strip() if len(parts) > 0 else None
-        state = parts[1].strip() if len(parts) > 1 else None
-        zip_code = parts[2].strip() if len(parts) > 2 else None
-        
-        return city, state, zip_code
+        return parse_location(location_str)
     
     @staticmethod
-    def _parse_date(date_str: Any) -> datetime:
+    def _parse_date(date_str: Any) -> Optional[datetime]:
         """Parse date string to datetime"""
-        if isinstance(date_str, datetime):
-            return date_str
-        if not date_str:
-            return None
-        try:
-            return datetime.fromisoformat(str(date_str))
-        except:
-            return None
+        return parse_date(date_str)
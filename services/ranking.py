@@ -0,0 +1,408 @@
+"""
+Lead ranking: top-K intents by a weighted score, answered from an in-memory
+columnar snapshot.
+
+Each active intent (detected within `ranking_max_age_days`) is one row of NumPy
+feature columns. The score is a weighted sum of confidence, urgency, freshness,
+contact availability, budget fit and deal (how low the listing is priced for its
+market segment). Everything except freshness is fixed per intent, so it is
+folded into one precomputed column. Freshness halves every
+`ranking_freshness_half_life_hours` and factors into a per-row constant times a
+per-query scalar:
+
+    2^(-(now - t) / h) = 2^(-(now - t0) / h) * 2^((t - t0) / h)
+
+so a query computes `static + c * growth` over the filtered rows, selects the
+top K with argpartition (linear time) and sorts only those K.
+
+Rows are upserted by intent id as intents are saved in this process; intents
+saved by other processes (ingest-workers, other API workers) are picked up by a
+periodic delta load of intents detected after the newest one read from storage
+(with an overlap window for late commits).
+"""
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from app.config import settings
+from services.spatial_index import _bounding_box, haversine_miles
+from utils.logger import logger
+
+
+# Fields read when loading intents into the snapshot
+RANKING_FIELDS = [
+    'intent_id', 'city', 'intent_type', 'urgency', 'confidence_score', 'detected_at',
+    'contact_available', 'budget_min', 'budget_max', 'source_listing.price', 'market_price_percentile',
+    'latitude', 'longitude'
+]
+
+URGENCY_SCORES = {'high': 1.0, 'medium': 0.5, 'low': 0.0}
+WEIGHT_NAMES = ('confidence', 'urgency', 'freshness', 'contact', 'budget_fit', 'deal')
+
+# Filters matching more rows than this score all rows and use a sampled threshold
+DENSE_SELECTION_ROWS = 50000
+THRESHOLD_SAMPLE_PER_K = 64
+REBASE_HALF_LIVES = 50
+
+# (intent_id, score, distance_miles or None)
+RankedIntent = Tuple[str, float, Optional[float]]
+Loader = Callable[[Optional[str]], Iterator[List[Dict[str, Any]]]]
+
+
+def budget_fit(price: Optional[float], budget_min: Optional[float], budget_max: Optional[float]) -> float:
+    """1.0 when the listing price is within the budget, falling to 0 at 50% outside it; 0.5 when unknown"""
+    if price is None or (budget_min is None and budget_max is None):
+        return 0.5
+    low = budget_min if budget_min is not None else 0.0
+    high = budget_max if budget_max is not None else math.inf
+    if low <= price <= high:
+        return 1.0
+    bound = high if price > high else low
+    if bound <= 0:
+        return 0.0
+    return max(0.0, 1.0 - abs(price - bound) / (0.5 * bound))
+
+
+def deal_score(percentile: Optional[float]) -> float:
+    """1.0 for the cheapest listing in its market segment, 0 for the most expensive; 0.5 when unknown"""
+    if percentile is None:
+        return 0.5
+    return min(1.0, max(0.0, 1.0 - percentile / 100.0))
+
+
+def _timestamp(value) -> Optional[float]:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return None
+
+
+class _Vocabulary:
+    """Category string -> small int code, for vectorized equality filters"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        key = (value or '').strip().lower()
+        if key not in self.codes:
+            self.codes[key] = len(self.codes)
+        return self.codes[key]
+
+    def lookup(self, value: str) -> int:
+        """Code of an existing category, or -1 (matches no row)"""
+        return self.codes.get(value.strip().lower(), -1)
+
+
+class LeadRanker:
+    """Columnar snapshot of intent scoring features answering filtered top-K queries"""
+
+    _COLUMNS = {
+        'static': np.float32,
+        'growth': np.float32,
+        'detected': np.float64,
+        'confidence': np.float32,
+        'urgency': np.int16,
+        'intent_type': np.int16,
+        'city': np.int32,
+        'latitude': np.float64,
+        'longitude': np.float64,
+    }
+
+    def __init__(
+        self,
+        loader: Loader,
+        weights: Dict[str, float],
+        half_life_hours: float = 72.0,
+        max_age_days: float = 30.0,
+        refresh_seconds: float = 30.0,
+        refresh_overlap_seconds: float = 300.0,
+        initial_capacity: int = 1024
+    ):
+        unknown = set(weights) - set(WEIGHT_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown ranking weights: {', '.join(sorted(unknown))}")
+        self.loader = loader
+        self.weights = {name: float(weights.get(name, 0.0)) for name in WEIGHT_NAMES}
+        self.half_life = half_life_hours * 3600
+        self.max_age = max_age_days * 86400
+        self.refresh_seconds = refresh_seconds
+        self.refresh_overlap = refresh_overlap_seconds
+
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+        self._size = 0
+        self._columns = {name: np.zeros(initial_capacity, dtype=dtype) for name, dtype in self._COLUMNS.items()}
+        self._active = np.zeros(initial_capacity, dtype=bool)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._cities = _Vocabulary()
+        self._intent_types = _Vocabulary()
+        self._urgencies = _Vocabulary()
+        self._epoch = time.time()  # t0 of the growth column
+        # Newest detected_at read from storage; local saves do not move it, so
+        # intents other processes commit meanwhile are still picked up
+        self._watermark: Optional[str] = None
+        self._loading = False
+        self._loaded = False
+        self._last_refresh = 0.0
+        self._refreshing = False
+
+    @classmethod
+    def from_settings(cls, loader: Loader) -> "LeadRanker":
+        return cls(
+            loader,
+            weights=settings.ranking_weights,
+            half_life_hours=settings.ranking_freshness_half_life_hours,
+            max_age_days=settings.ranking_max_age_days,
+            refresh_seconds=settings.ranking_refresh_seconds,
+            refresh_overlap_seconds=settings.ranking_refresh_overlap_seconds
+        )
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    # ---- updates ----
+
+    def on_intent_saved(self, doc: Dict[str, Any]):
+        """Upsert a saved intent; ignored until the snapshot is first used"""
+        if self._loaded or self._loading:
+            with self._lock:
+                self._upsert(doc)
+
+    def ensure_loaded(self):
+        """Load active intents on first use (blocking)"""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            self._loading = True
+            started = time.perf_counter()
+            since = datetime.fromtimestamp(time.time() - self.max_age).isoformat()
+            try:
+                self._load(since)
+            finally:
+                self._loading = False
+            self._loaded = True
+            self._last_refresh = time.monotonic()
+            logger.info(f"🏆 Lead ranking snapshot loaded: {len(self)} intents in {time.perf_counter() - started:.1f}s")
+
+    def refresh(self):
+        """
+        Load intents detected after the newest one read so far, less an overlap
+        for intents committed late with an earlier detected_at (rows are
+        upserted by id, so re-read intents are not duplicated), and drop
+        expired rows
+        """
+        with self._load_lock:
+            try:
+                since = None
+                if self._watermark is not None:
+                    since = datetime.fromtimestamp(_timestamp(self._watermark) - self.refresh_overlap).isoformat()
+                self._load(since)
+                with self._lock:
+                    self._compact()
+            except Exception as e:
+                logger.warning(f"Lead ranking refresh failed: {e}")
+            finally:
+                self._last_refresh = time.monotonic()
+                self._refreshing = False
+
+    def _load(self, since: Optional[str]):
+        for chunk in self.loader(since):
+            with self._lock:
+                for doc in chunk:
+                    self._upsert(doc)
+                    detected_at = doc.get('detected_at')
+                    if detected_at is not None and (self._watermark is None or str(detected_at) > self._watermark):
+                        self._watermark = str(detected_at)
+
+    def _upsert(self, doc: Dict[str, Any]):
+        intent_id = doc.get('intent_id')
+        detected = _timestamp(doc.get('detected_at'))
+        if not intent_id or detected is None:
+            return
+
+        row = self._rows.get(intent_id)
+        if row is None:
+            if self._size == len(self._active):
+                self._grow(2 * self._size)
+            row = self._size
+            self._size += 1
+            self._rows[intent_id] = row
+            self._ids.append(intent_id)
+
+        confidence = float(doc.get('confidence_score') or 0.0)
+        urgency = str(doc.get('urgency') or '')
+        listing = doc.get('source_listing') or {}
+        weights = self.weights
+        columns = self._columns
+        columns['static'][row] = (
+            weights['confidence'] * confidence
+            + weights['urgency'] * URGENCY_SCORES.get(urgency, 0.0)
+            + weights['contact'] * (1.0 if doc.get('contact_available') else 0.0)
+            + weights['budget_fit'] * budget_fit(listing.get('price'), doc.get('budget_min'), doc.get('budget_max'))
+            + weights['deal'] * deal_score(doc.get('market_price_percentile'))
+        )
+        columns['growth'][row] = 2.0 ** ((detected - self._epoch) / self.half_life)
+        columns['detected'][row] = detected
+        columns['confidence'][row] = confidence
+        columns['urgency'][row] = self._urgencies.code(urgency)
+        columns['intent_type'][row] = self._intent_types.code(doc.get('intent_type'))
+        columns['city'][row] = self._cities.code(doc.get('city'))
+        latitude, longitude = doc.get('latitude'), doc.get('longitude')
+        columns['latitude'][row] = latitude if latitude is not None else np.nan
+        columns['longitude'][row] = longitude if longitude is not None else np.nan
+        self._active[row] = True
+
+    def _grow(self, capacity: int):
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+        active = np.zeros(capacity, dtype=bool)
+        active[:self._size] = self._active[:self._size]
+        self._active = active
+
+    def _compact(self):
+        """Drop expired rows"""
+        n = self._size
+        cutoff = time.time() - self.max_age
+        keep = np.flatnonzero(self._active[:n] & (self._columns['detected'][:n] >= cutoff))
+        if len(keep) < n:
+            for name, column in self._columns.items():
+                column[:len(keep)] = column[keep]
+            self._active[:len(keep)] = True
+            self._active[len(keep):] = False
+            self._ids = [self._ids[row] for row in keep]
+            self._rows = {intent_id: row for row, intent_id in enumerate(self._ids)}
+            self._size = len(keep)
+
+    def _rebase(self, now: float):
+        """Move t0 to now; float32 growth values overflow past ~127 half-lives"""
+        self._epoch = now
+        detected = self._columns['detected'][:self._size]
+        self._columns['growth'][:self._size] = np.exp2((detected - now) / self.half_life)
+
+    def _maybe_refresh(self):
+        if not self.refresh_seconds or self._refreshing:
+            return
+        if time.monotonic() - self._last_refresh < self.refresh_seconds:
+            return
+        self._refreshing = True
+        threading.Thread(target=self.refresh, name="lead-ranking-refresh", daemon=True).start()
+
+    # ---- queries ----
+
+    def top_k(self, filters: Dict[str, Any], k: int, now: Optional[float] = None) -> List[RankedIntent]:
+        """Best-scoring intents matching the query filters (see DatabaseManager._query_filters), best first"""
+        self.ensure_loaded()
+        self._maybe_refresh()
+        now = time.time() if now is None else now
+
+        with self._lock:
+            if now - self._epoch > REBASE_HALF_LIVES * self.half_life:
+                self._rebase(now)
+            n = self._size
+            static, growth = self._columns['static'][:n], self._columns['growth'][:n]
+            scale = np.float32(self.weights['freshness'] * 2.0 ** (-(now - self._epoch) / self.half_life))
+
+            mask, rows, distances = self._select(filters, now)
+            if rows is None:
+                count = np.count_nonzero(mask)
+                if count == 0:
+                    return []
+                if count > DENSE_SELECTION_ROWS:
+                    # Broad filters: score every row and skip the gather into a filtered copy
+                    scores = static + scale * growth
+                    rows = _masked_top_k(scores, mask, k, count)
+                    return [(self._ids[row], float(scores[row]), None) for row in rows]
+                rows = np.flatnonzero(mask)
+
+            if rows.size == 0:
+                return []
+            scores = static[rows] + scale * growth[rows]
+            top = _top_k(scores, k)
+            return [
+                (self._ids[rows[i]], float(scores[i]), float(distances[i]) if distances is not None else None)
+                for i in top
+            ]
+
+    def _select(self, filters: Dict[str, Any], now: float) -> Tuple[Optional[np.ndarray], Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Rows matching the filters: (mask, None, None) for attribute filters, or
+        (None, rows, distances) for radius queries
+        """
+        n = self._size
+        columns = {name: column[:n] for name, column in self._columns.items()}
+        mask = self._active[:n] & (columns['detected'] >= now - self.max_age)
+
+        if filters.get('min_confidence'):
+            mask &= columns['confidence'] >= filters['min_confidence']
+        for column, vocabulary, value in (
+            ('city', self._cities, (filters.get('location') or '').split(',')[0]),
+            ('intent_type', self._intent_types, filters.get('intent_type')),
+            ('urgency', self._urgencies, filters.get('urgency')),
+        ):
+            if value:
+                mask &= columns[column] == vocabulary.lookup(value)
+        if filters.get('start_date'):
+            mask &= columns['detected'] >= _timestamp(filters['start_date'])
+        if filters.get('end_date'):
+            mask &= columns['detected'] <= _timestamp(filters['end_date'])
+
+        lats, lons = columns['latitude'], columns['longitude']
+        boxes = [filters['bbox']] if filters.get('bbox') else []
+        radius = filters.get('radius_miles')
+        if radius is not None:
+            # Bounding box over all rows, exact distance on the survivors only
+            latitude, longitude = filters['latitude'], filters['longitude']
+            boxes.append(_bounding_box(latitude, longitude, radius))
+        for min_lat, min_lon, max_lat, max_lon in boxes:
+            in_lon = (lons >= min_lon) & (lons <= max_lon) if min_lon <= max_lon else (lons >= min_lon) | (lons <= max_lon)
+            mask &= (lats >= min_lat) & (lats <= max_lat) & in_lon
+
+        if radius is None:
+            return mask, None, None
+
+        rows = np.flatnonzero(mask)
+        distances = haversine_miles(latitude, longitude, lats[rows], lons[rows])
+        within = distances <= radius
+        return None, rows[within], distances[within]
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest scores, best first"""
+    if scores.size > k:
+        top = np.argpartition(scores, scores.size - k)[scores.size - k:]
+    else:
+        top = np.arange(scores.size)
+    return top[np.argsort(-scores[top], kind='stable')]
+
+
+def _masked_top_k(scores: np.ndarray, mask: np.ndarray, k: int, count: int) -> np.ndarray:
+    """
+    Rows of the k highest scores where mask is set, best first. A threshold
+    taken from a strided sample leaves a few times k candidates, so only those
+    are partitioned instead of every matching row.
+    """
+    step = max(1, len(scores) // (THRESHOLD_SAMPLE_PER_K * k))
+    sample = scores[::step][mask[::step]]
+    # Expected sample rank of the k-th best row, with a safety margin
+    rank = int(2 * k * sample.size / count) + 16
+    if sample.size > rank:
+        threshold = np.partition(sample, sample.size - rank)[sample.size - rank]
+        candidates = np.flatnonzero((scores >= threshold) & mask)
+        if candidates.size >= k:
+            return candidates[_top_k(scores[candidates], k)]
+    candidates = np.flatnonzero(mask)
+    return candidates[_top_k(scores[candidates], k)]
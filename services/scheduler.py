@@ -0,0 +1,213 @@
+"""
+Recurring ingestion: one APScheduler interval job per (source, region) shard.
+
+Shards sharing an interval are phase-offset evenly across it, anchored to a
+fixed epoch so the phases stay put across restarts, and each run gets up to
+`scheduler_jitter_seconds` of random delay, so steady-state crawling is spread
+over the day instead of arriving in bursts. (The jitter is a delay inside the
+run rather than trigger jitter, which in APScheduler 3 accumulates into drift
+and would erode the phase spread.) A shard never overlaps itself
+(max_instances=1), each source runs at most its configured number of shards at
+once, and the schedule lives in a SQLite job store so runs missed while the
+service was down are coalesced into one on startup.
+"""
+import asyncio
+import random
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+from app.config import settings
+from app.models import DataSource, IngestionRequest
+from services.ingestion import process_ingestion
+from services.jobs import JobQueueFullError, get_job_registry
+from utils.helpers import LazySingleton
+from utils.logger import logger
+
+
+JOB_PREFIX = 'ingest:'
+PHASE_ANCHOR = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+_SLUG_RE = re.compile(r'[^a-z0-9]+')
+
+
+def shard_job_id(source: str, region: str) -> str:
+    return f"{JOB_PREFIX}{source}:{_SLUG_RE.sub('-', region.lower()).strip('-')}"
+
+
+class IngestionScheduler:
+    """Owns the APScheduler instance and the per-source concurrency budgets"""
+
+    def __init__(
+        self,
+        sources: List[str],
+        regions: List[str],
+        interval_minutes: int,
+        source_interval_minutes: Dict[str, int],
+        source_concurrency: Dict[str, int],
+        jitter_seconds: int,
+        misfire_grace_seconds: int,
+        jobstore_path: str
+    ):
+        self.sources = [DataSource(source).value for source in sources]
+        self.regions = regions
+        self.interval_minutes = interval_minutes
+        self.source_interval_minutes = source_interval_minutes
+        self.source_concurrency = source_concurrency
+        self.jitter_seconds = jitter_seconds
+        self.misfire_grace_seconds = misfire_grace_seconds
+        self.jobstore_path = jobstore_path
+        self._scheduler = None
+        self._source_slots: Dict[str, asyncio.Semaphore] = {}
+
+    @classmethod
+    def from_settings(cls) -> "IngestionScheduler":
+        return cls(
+            sources=settings.scheduler_sources,
+            regions=settings.scheduler_regions,
+            interval_minutes=settings.scheduler_interval_minutes,
+            source_interval_minutes=settings.scheduler_source_interval_minutes,
+            source_concurrency=settings.scheduler_source_concurrency,
+            jitter_seconds=settings.scheduler_jitter_seconds,
+            misfire_grace_seconds=settings.scheduler_misfire_grace_seconds,
+            jobstore_path=settings.scheduler_jobstore_path
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._scheduler is not None and self._scheduler.running
+
+    def shard_plan(self) -> List[Dict[str, Any]]:
+        """Every configured shard with its interval and phase offset"""
+        shards = [(source, region) for region in self.regions for source in self.sources]
+        by_interval: Dict[int, List[Tuple[str, str]]] = {}
+        for source, region in shards:
+            interval = self.source_interval_minutes.get(source, self.interval_minutes)
+            by_interval.setdefault(interval, []).append((source, region))
+
+        plan = []
+        for interval, members in by_interval.items():
+            for index, (source, region) in enumerate(members):
+                plan.append({
+                    "job_id": shard_job_id(source, region),
+                    "source": source,
+                    "region": region,
+                    "interval_minutes": interval,
+                    "offset_seconds": interval * 60 * index // len(members),
+                })
+        return plan
+
+    def start(self):
+        """Start the scheduler and reconcile the persisted jobs with the configured shards"""
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler
+        from services.jobstore import SQLiteJobStore
+
+        self._scheduler = AsyncIOScheduler(
+            jobstores={'default': SQLiteJobStore(self.jobstore_path)},
+            job_defaults={
+                'coalesce': True,
+                'max_instances': 1,
+                'misfire_grace_time': self.misfire_grace_seconds,
+            },
+            timezone=timezone.utc
+        )
+        # Paused until reconciled, so stale shards cannot fire
+        self._scheduler.start(paused=True)
+        self._sync_jobs()
+        self._scheduler.resume()
+        logger.info(f"⏰ Ingestion scheduler started with {len(self._scheduler.get_jobs())} shards")
+
+    def shutdown(self):
+        if self.running:
+            self._scheduler.shutdown(wait=False)
+
+    def get_schedule(self) -> List[Dict[str, Any]]:
+        jobs = {job.id: job for job in self._scheduler.get_jobs()} if self.running else {}
+        schedule = []
+        for shard in self.shard_plan():
+            job = jobs.get(shard["job_id"])
+            next_run = job.next_run_time if job else None
+            schedule.append({**shard, "next_run_time": next_run.isoformat() if next_run else None})
+        return schedule
+
+    def source_slot(self, source: str) -> asyncio.Semaphore:
+        """Semaphore bounding how many shards of one source crawl at once"""
+        slot = self._source_slots.get(source)
+        if slot is None:
+            slot = self._source_slots[source] = asyncio.Semaphore(self.source_concurrency.get(source, 1))
+        return slot
+
+    def _sync_jobs(self):
+        from apscheduler.triggers.interval import IntervalTrigger
+
+        plan = {shard["job_id"]: shard for shard in self.shard_plan()}
+
+        for job in self._scheduler.get_jobs():
+            if job.id.startswith(JOB_PREFIX) and job.id not in plan:
+                logger.info(f"Removing unconfigured ingestion shard {job.id}")
+                job.remove()
+
+        for job_id, shard in plan.items():
+            trigger = IntervalTrigger(
+                minutes=shard["interval_minutes"],
+                start_date=PHASE_ANCHOR + timedelta(seconds=shard["offset_seconds"]),
+                timezone=timezone.utc
+            )
+            existing = self._scheduler.get_job(job_id)
+            if existing is not None and _same_trigger(existing.trigger, trigger):
+                # Keep the stored next_run_time so a run missed while down still fires (coalesced)
+                continue
+            self._scheduler.add_job(
+                'services.scheduler:run_shard',
+                trigger=trigger,
+                args=[shard["source"], shard["region"]],
+                id=job_id,
+                name=f"Ingest {shard['source']} / {shard['region']}",
+                replace_existing=True
+            )
+
+
+def _same_trigger(current, desired) -> bool:
+    return (
+        getattr(current, 'interval', None) == desired.interval
+        and getattr(current, 'start_date', None) == desired.start_date
+    )
+
+
+async def run_shard(source: str, region: str):
+    """Scheduled entry point: crawl one shard and wait for the ingestion job to finish"""
+    scheduler = get_ingestion_scheduler()
+    if scheduler.jitter_seconds:
+        await asyncio.sleep(random.uniform(0, scheduler.jitter_seconds))
+
+    request = IngestionRequest(
+        location=region,
+        radius_miles=settings.default_radius_miles,
+        sources=[DataSource(source)],
+        max_listings=settings.scheduler_max_listings
+    )
+
+    if settings.ingestion_backend == "queue":
+        # The run id names the schedule slot, so several API replicas running the
+        # scheduler enqueue the same tasks once
+        from services.work_queue import enqueue_request, get_work_queue
+
+        shard = next(s for s in scheduler.shard_plan() if s["job_id"] == shard_job_id(source, region))
+        interval = shard["interval_minutes"] * 60
+        elapsed = (datetime.now(timezone.utc) - PHASE_ANCHOR).total_seconds() - shard["offset_seconds"]
+        run_id = f"{shard['job_id']}@{int(elapsed // interval)}"
+        enqueued = await asyncio.to_thread(enqueue_request, get_work_queue(), request, run_id)
+        logger.info(f"⏰ Scheduled crawl of {source} / {region} enqueued: {enqueued}")
+        return
+
+    async with scheduler.source_slot(source):
+        try:
+            job = get_job_registry().submit(request, process_ingestion)
+        except JobQueueFullError as e:
+            logger.warning(f"Skipping scheduled crawl of {source} / {region}: {e}")
+            return
+
+        logger.info(f"⏰ Scheduled crawl of {source} / {region} started as job {job.job_id}")
+        await job.task
+
+
+get_ingestion_scheduler = LazySingleton(IngestionScheduler.from_settings)
@@ -0,0 +1,311 @@
+"""
+Spatial indexing for radius queries over large point sets.
+
+Points are bucketed by a Z-order (geohash-style) integer cell id and kept
+sorted by it, so every coarser cell maps to one contiguous slice of the
+sorted arrays. A radius query covers the circle's bounding box with a few
+coarse cells, gathers the candidate slices, and runs an exact vectorized
+haversine check on the candidates only.
+"""
+import math
+from typing import Iterable, List, Sequence, Tuple
+import numpy as np
+
+
+EARTH_RADIUS_MILES = 3958.7613
+MILES_PER_DEGREE_LAT = 69.0
+
+_GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def haversine_miles(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in miles; accepts scalars or broadcastable arrays"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def points_within_radius(lats, lons, center: Tuple[float, float], radius_miles: float) -> np.ndarray:
+    """Boolean mask of points within radius of center (brute force, vectorized)"""
+    return haversine_miles(center[0], center[1], lats, lons) <= radius_miles
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = 9) -> str:
+    """Standard base32 geohash string"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits <<= 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return ''.join(chars)
+
+
+def decode_geohash_bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """(min_lat, min_lon, max_lat, max_lon) of a geohash cell"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _GEOHASH_BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            target = lon_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            target[1 - bit] = mid
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def geohash_cover(
+    latitude: float,
+    longitude: float,
+    radius_miles: float,
+    max_cells: int = 16
+) -> List[str]:
+    """
+    Geohash prefixes whose union covers the circle's bounding box, at the
+    finest precision that needs no more than `max_cells` cells.
+    """
+    return geohash_cover_box(*_bounding_box(latitude, longitude, radius_miles), max_cells=max_cells)
+
+
+def geohash_cover_box(
+    min_lat: float,
+    min_lon: float,
+    max_lat: float,
+    max_lon: float,
+    max_cells: int = 16
+) -> List[str]:
+    """Geohash prefixes covering a lat/lon box (min_lon > max_lon means it crosses 180°)"""
+    lon_span = max_lon - min_lon if max_lon >= min_lon else max_lon + 360.0 - min_lon
+
+    cover = None
+    for precision in range(1, 13):
+        lat_bits = (precision * 5) // 2
+        lon_bits = precision * 5 - lat_bits
+        lat_samples = _samples(min_lat, max_lat - min_lat, 180.0 / (1 << lat_bits))
+        lon_samples = _samples(min_lon, lon_span, 360.0 / (1 << lon_bits))
+        if len(lat_samples) * len(lon_samples) > max_cells:
+            break
+        cover = sorted({
+            encode_geohash(lat, ((lon + 180.0) % 360.0) - 180.0, precision)
+            for lat in lat_samples for lon in lon_samples
+        })
+    return cover or list(_GEOHASH_BASE32)
+
+
+def geohash_ranges(prefixes: Iterable[str]) -> List[Tuple[str, str]]:
+    """
+    [low, high) string ranges matching every geohash under the given prefixes,
+    with cells that are adjacent in geohash order merged into one range
+    """
+    ranges: List[Tuple[str, str]] = []
+    for prefix in sorted(prefixes):
+        high = _next_geohash(prefix)
+        if ranges and ranges[-1][1] == prefix:
+            ranges[-1] = (ranges[-1][0], high)
+        else:
+            ranges.append((prefix, high))
+    return ranges
+
+
+def _next_geohash(prefix: str) -> str:
+    """Smallest geohash of the same length after every geohash starting with prefix"""
+    chars = list(prefix)
+    for i in range(len(chars) - 1, -1, -1):
+        index = _GEOHASH_BASE32.index(chars[i])
+        if index + 1 < len(_GEOHASH_BASE32):
+            chars[i] = _GEOHASH_BASE32[index + 1]
+            return ''.join(chars)
+        chars[i] = _GEOHASH_BASE32[0]
+    return prefix + '~'  # the last cell: '~' sorts after every base32 character
+
+
+def _samples(start: float, span: float, step: float) -> List[float]:
+    """Points no more than `step` apart across [start, start + span], so every cell is hit"""
+    return [start + i * step for i in range(int(span / step) + 1)] + [start + span]
+
+
+def _bounding_box(latitude: float, longitude: float, radius_miles: float) -> Tuple[float, float, float, float]:
+    dlat = radius_miles / MILES_PER_DEGREE_LAT
+    min_lat = max(-90.0, latitude - dlat)
+    max_lat = min(90.0, latitude + dlat)
+
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if cos_lat < 1e-6 or radius_miles / (MILES_PER_DEGREE_LAT * cos_lat) >= 180.0:
+        return min_lat, -180.0, max_lat, 180.0 - 1e-9
+
+    dlon = radius_miles / (MILES_PER_DEGREE_LAT * cos_lat)
+    min_lon = ((longitude - dlon + 180.0) % 360.0) - 180.0
+    max_lon = ((longitude + dlon + 180.0) % 360.0) - 180.0
+    return min_lat, min_lon, max_lat, max_lon
+
+
+def _spread_bits(values: np.ndarray) -> np.ndarray:
+    """Insert a zero bit between each of the low 32 bits (Morton encoding)"""
+    x = values.astype(np.uint64) & np.uint64(0xFFFFFFFF)
+    x = (x | (x << np.uint64(16))) & np.uint64(0x0000FFFF0000FFFF)
+    x = (x | (x << np.uint64(8))) & np.uint64(0x00FF00FF00FF00FF)
+    x = (x | (x << np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    x = (x | (x << np.uint64(2))) & np.uint64(0x3333333333333333)
+    x = (x | (x << np.uint64(1))) & np.uint64(0x5555555555555555)
+    return x
+
+
+class SpatialIndex:
+    """
+    Static Z-order index over (latitude, longitude) points.
+
+    `bits_per_axis` sets the finest cell resolution; 16 bits gives cells of
+    roughly 0.2 x 0.4 miles at mid latitudes, far below typical search radii.
+    """
+
+    def __init__(self, latitudes: Sequence[float], longitudes: Sequence[float], bits_per_axis: int = 16):
+        lats = np.asarray(latitudes, dtype=np.float64)
+        lons = np.asarray(longitudes, dtype=np.float64)
+        if lats.shape != lons.shape:
+            raise ValueError("latitudes and longitudes must have the same length")
+
+        self.bits_per_axis = bits_per_axis
+        cells = self._cell_ids(lats, lons, bits_per_axis)
+        self._order = np.argsort(cells, kind='stable')
+        self._cells = cells[self._order]
+        self._lats = lats[self._order]
+        self._lons = lons[self._order]
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    @staticmethod
+    def _cell_ids(lats: np.ndarray, lons: np.ndarray, bits: int) -> np.ndarray:
+        scale = float(1 << bits)
+        max_index = (1 << bits) - 1
+        iy = np.clip(((lats + 90.0) / 180.0 * scale).astype(np.int64), 0, max_index)
+        ix = np.clip(((lons + 180.0) / 360.0 * scale).astype(np.int64), 0, max_index)
+        return (_spread_bits(ix) << np.uint64(1)) | _spread_bits(iy)
+
+    def query_radius(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_miles: float,
+        sort_by_distance: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices (into the original input order) and distances of points within radius"""
+        candidates = self._candidate_positions(latitude, longitude, radius_miles)
+        if candidates.size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        distances = haversine_miles(latitude, longitude, self._lats[candidates], self._lons[candidates])
+        mask = distances <= radius_miles
+        positions, distances = candidates[mask], distances[mask]
+
+        if sort_by_distance:
+            order = np.argsort(distances, kind='stable')
+            positions, distances = positions[order], distances[order]
+        return self._order[positions], distances
+
+    def query_radius_batch(
+        self,
+        centers: Iterable[Tuple[float, float]],
+        radius_miles,
+        sort_by_distance: bool = False
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        query_radius for many centers; radius_miles may be a scalar or one per center
+
+        Each center's candidate cell ranges are found with a few binary
+        searches; the candidates of all centers then go through a single
+        vectorized haversine pass and are split back per center.
+        """
+        centers = np.asarray(list(centers), dtype=np.float64).reshape(-1, 2)
+        count = len(centers)
+        radii = np.broadcast_to(np.asarray(radius_miles, dtype=np.float64), (count,))
+        if count == 0:
+            return []
+
+        ranges = [self._candidate_ranges(lat, lon, radius) for (lat, lon), radius in zip(centers, radii)]
+        starts = np.concatenate([range_starts for range_starts, _ in ranges])
+        lengths = np.concatenate([range_ends - range_starts for range_starts, range_ends in ranges])
+        owners = np.repeat(np.arange(count), [range_starts.size for range_starts, _ in ranges])
+
+        # Candidates stay grouped by center, in the order query_radius would visit them
+        positions = _expand_ranges(starts, lengths)
+        query = np.repeat(owners, lengths)
+        distances = haversine_miles(centers[query, 0], centers[query, 1], self._lats[positions], self._lons[positions])
+        keep = distances <= radii[query]
+        positions, distances, query = positions[keep], distances[keep], query[keep]
+
+        if sort_by_distance:
+            order = np.lexsort((distances, query))
+            positions, distances, query = positions[order], distances[order], query[order]
+
+        bounds = np.searchsorted(query, np.arange(count + 1), side='left')
+        return [(self._order[positions[a:b]], distances[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def _candidate_positions(self, latitude: float, longitude: float, radius_miles: float) -> np.ndarray:
+        starts, ends = self._candidate_ranges(latitude, longitude, radius_miles)
+        return _expand_ranges(starts, ends - starts)
+
+    def _candidate_ranges(self, latitude: float, longitude: float, radius_miles: float) -> Tuple[np.ndarray, np.ndarray]:
+        """[start, end) slices of the sorted arrays holding every point that may be within radius"""
+        min_lat, min_lon, max_lat, max_lon = _bounding_box(latitude, longitude, radius_miles)
+        lon_span = max_lon - min_lon if max_lon >= min_lon else max_lon + 360.0 - min_lon
+        lat_span = max_lat - min_lat
+
+        # Coarsest level whose cells are at least a quarter of the box: at most ~5x5 cells
+        level = self.bits_per_axis
+        while level > 0 and (180.0 / (1 << level) < lat_span / 4 or 360.0 / (1 << level) < lon_span / 4):
+            level -= 1
+
+        scale = 1 << level
+        y0 = int((min_lat + 90.0) / 180.0 * scale)
+        y1 = min(int((max_lat + 90.0) / 180.0 * scale), scale - 1)
+        x0 = int((min_lon + 180.0) / 360.0 * scale) % scale
+        x_count = min(int(lon_span / 360.0 * scale) + 2, scale)
+
+        xs = (x0 + np.arange(x_count)) % scale
+        ys = np.arange(y0, y1 + 1)
+        grid_x, grid_y = np.meshgrid(xs, ys)
+        coarse = np.unique((_spread_bits(grid_x.ravel()) << np.uint64(1)) | _spread_bits(grid_y.ravel()))
+
+        # A coarse cell is a contiguous id range at full resolution
+        shift = np.uint64(2 * (self.bits_per_axis - level))
+        starts = np.searchsorted(self._cells, coarse << shift, side='left')
+        ends = np.searchsorted(self._cells, (coarse + np.uint64(1)) << shift, side='left')
+        return starts.astype(np.int64), ends.astype(np.int64)
+
+
+def _expand_ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Concatenation of arange(start, start + length) over all ranges, without a Python loop"""
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    range_offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return np.repeat(starts - range_offsets, lengths) + np.arange(total)
@@ -0,0 +1,461 @@
+"""
+Leased work queue for distributed ingestion.
+
+A task is one (source, location, page) crawl. Workers lease tasks for a fixed
+time and must heartbeat to keep them; a lease that expires (crashed or stuck
+worker) makes the task available again. Each lease counts as an attempt:
+failures are retried with a delay until `max_attempts`, then the task is
+parked as dead. Completion is idempotent and only accepted from the current
+lease holder, so a worker whose lease was taken over cannot double-complete.
+
+Backends: SQLite (single box, any number of local worker processes) and
+Redis (several machines). Pick one with WORK_QUEUE_URL.
+"""
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional
+from app.config import settings
+from app.models import IngestionRequest
+from utils.helpers import LazySingleton
+
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+DEAD = 'dead'
+STATUSES = (PENDING, LEASED, DONE, DEAD)
+
+
+@dataclass
+class WorkTask:
+    task_id: str
+    run_id: str
+    source: str
+    location: str
+    page: int
+    radius_miles: int
+    max_listings: int
+    status: str = PENDING
+    attempts: int = 0
+    lease_owner: Optional[str] = None
+    lease_expires_at: Optional[float] = None
+    last_error: Optional[str] = None
+
+    @staticmethod
+    def make_id(run_id: str, source: str, location: str, page: int) -> str:
+        """Deterministic id, so enqueueing the same crawl twice is a no-op"""
+        return hashlib.md5(f"{run_id}|{source}|{location}|{page}".encode()).hexdigest()
+
+    def to_request(self) -> IngestionRequest:
+        return IngestionRequest(
+            location=self.location,
+            radius_miles=self.radius_miles,
+            sources=[self.source],
+            max_listings=self.max_listings
+        )
+
+
+def plan_tasks(run_id: str, request: IngestionRequest, page_size: int) -> List[WorkTask]:
+    """Split an ingestion request into one task per (source, page)"""
+    pages = max(1, math.ceil(request.max_listings / page_size))
+    return [
+        WorkTask(
+            task_id=WorkTask.make_id(run_id, source.value, request.location, page),
+            run_id=run_id,
+            source=source.value,
+            location=request.location,
+            page=page,
+            radius_miles=request.radius_miles,
+            max_listings=page_size
+        )
+        for source in request.sources
+        for page in range(1, pages + 1)
+    ]
+
+
+class WorkQueue(ABC):
+    """Interface every work queue backend implements"""
+
+    def __init__(self, max_attempts: int = 3):
+        self.max_attempts = max_attempts
+
+    @abstractmethod
+    def enqueue(self, tasks: Iterable[WorkTask]) -> int:
+        """Add tasks, skipping ids already present; returns how many were new"""
+
+    @abstractmethod
+    def lease(self, worker_id: str, lease_seconds: float, limit: int = 1) -> List[WorkTask]:
+        """Claim up to `limit` available tasks (pending, or leased with an expired lease)"""
+
+    @abstractmethod
+    def heartbeat(self, task_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Extend a lease; False means the worker no longer holds it"""
+
+    @abstractmethod
+    def complete(self, task_id: str, worker_id: str) -> bool:
+        """Mark done; False if already done or the lease belongs to someone else"""
+
+    @abstractmethod
+    def fail(self, task_id: str, worker_id: str, error: str, retry_delay_seconds: float) -> Optional[str]:
+        """Record a failed attempt; returns the new status (pending or dead), None if not the holder"""
+
+    @abstractmethod
+    def release(self, task_id: str, worker_id: str) -> bool:
+        """Give a leased task back without counting the attempt (worker shutdown)"""
+
+    @abstractmethod
+    def stats(self, run_id: Optional[str] = None) -> Dict[str, int]:
+        """Task counts by status, overall or for one run"""
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    Work queue in a local SQLite file.
+
+    Leases are taken inside BEGIN IMMEDIATE transactions, so any number of
+    worker processes on the same machine can share the file safely.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3):
+        super().__init__(max_attempts)
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS work_tasks ("
+                "task_id TEXT PRIMARY KEY, run_id TEXT NOT NULL, source TEXT NOT NULL, location TEXT NOT NULL, "
+                "page INTEGER NOT NULL, radius_miles INTEGER NOT NULL, max_listings INTEGER NOT NULL, "
+                "status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, available_at REAL NOT NULL, "
+                "lease_owner TEXT, lease_expires_at REAL, last_error TEXT, "
+                "created_at REAL NOT NULL, completed_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_work_tasks_status ON work_tasks (status, available_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_work_tasks_run ON work_tasks (run_id)")
+            self._conn = conn
+        return self._conn
+
+    def _transaction(self, func):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+
+    def enqueue(self, tasks: Iterable[WorkTask]) -> int:
+        now = time.time()
+        rows = [
+            (t.task_id, t.run_id, t.source, t.location, t.page, t.radius_miles, t.max_listings, PENDING, now, now)
+            for t in tasks
+        ]
+
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO work_tasks (task_id, run_id, source, location, page, radius_miles, "
+                "max_listings, status, available_at, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            return conn.total_changes - before
+
+        return self._transaction(insert)
+
+    def lease(self, worker_id: str, lease_seconds: float, limit: int = 1) -> List[WorkTask]:
+        def claim(conn):
+            now = time.time()
+            conn.execute(
+                "UPDATE work_tasks SET status = ?, lease_owner = NULL, last_error = COALESCE(last_error, 'lease expired') "
+                "WHERE status = ? AND lease_expires_at < ? AND attempts >= ?",
+                (DEAD, LEASED, now, self.max_attempts)
+            )
+            ids = [row[0] for row in conn.execute(
+                "SELECT task_id FROM work_tasks WHERE (status = ? AND available_at <= ?) "
+                "OR (status = ? AND lease_expires_at < ?) ORDER BY available_at LIMIT ?",
+                (PENDING, now, LEASED, now, limit)
+            )]
+            conn.executemany(
+                "UPDATE work_tasks SET status = ?, lease_owner = ?, lease_expires_at = ?, attempts = attempts + 1 "
+                "WHERE task_id = ?",
+                [(LEASED, worker_id, now + lease_seconds, task_id) for task_id in ids]
+            )
+            return self._load(conn, ids)
+
+        return self._transaction(claim)
+
+    def heartbeat(self, task_id: str, worker_id: str, lease_seconds: float) -> bool:
+        return self._transaction(lambda conn: conn.execute(
+            "UPDATE work_tasks SET lease_expires_at = ? WHERE task_id = ? AND status = ? AND lease_owner = ?",
+            (time.time() + lease_seconds, task_id, LEASED, worker_id)
+        ).rowcount == 1)
+
+    def complete(self, task_id: str, worker_id: str) -> bool:
+        return self._transaction(lambda conn: conn.execute(
+            "UPDATE work_tasks SET status = ?, lease_owner = NULL, lease_expires_at = NULL, completed_at = ? "
+            "WHERE task_id = ? AND status = ? AND lease_owner = ?",
+            (DONE, time.time(), task_id, LEASED, worker_id)
+        ).rowcount == 1)
+
+    def fail(self, task_id: str, worker_id: str, error: str, retry_delay_seconds: float) -> Optional[str]:
+        def record(conn):
+            row = conn.execute(
+                "SELECT attempts FROM work_tasks WHERE task_id = ? AND status = ? AND lease_owner = ?",
+                (task_id, LEASED, worker_id)
+            ).fetchone()
+            if row is None:
+                return None
+            status = DEAD if row[0] >= self.max_attempts else PENDING
+            conn.execute(
+                "UPDATE work_tasks SET status = ?, lease_owner = NULL, lease_expires_at = NULL, last_error = ?, "
+                "available_at = ? WHERE task_id = ?",
+                (status, error, time.time() + retry_delay_seconds, task_id)
+            )
+            return status
+
+        return self._transaction(record)
+
+    def release(self, task_id: str, worker_id: str) -> bool:
+        return self._transaction(lambda conn: conn.execute(
+            "UPDATE work_tasks SET status = ?, lease_owner = NULL, lease_expires_at = NULL, "
+            "attempts = attempts - 1, available_at = ? WHERE task_id = ? AND status = ? AND lease_owner = ?",
+            (PENDING, time.time(), task_id, LEASED, worker_id)
+        ).rowcount == 1)
+
+    def stats(self, run_id: Optional[str] = None) -> Dict[str, int]:
+        query = "SELECT status, COUNT(*) FROM work_tasks"
+        params: tuple = ()
+        if run_id is not None:
+            query += " WHERE run_id = ?"
+            params = (run_id,)
+        with self._lock:
+            rows = self._connection().execute(query + " GROUP BY status", params).fetchall()
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update(dict(rows))
+        return counts
+
+    @staticmethod
+    def _load(conn, ids: List[str]) -> List[WorkTask]:
+        if not ids:
+            return []
+        columns = [
+            'task_id', 'run_id', 'source', 'location', 'page', 'radius_miles', 'max_listings',
+            'status', 'attempts', 'lease_owner', 'lease_expires_at', 'last_error'
+        ]
+        placeholders = ','.join('?' * len(ids))
+        rows = conn.execute(
+            f"SELECT {', '.join(columns)} FROM work_tasks WHERE task_id IN ({placeholders}) ORDER BY available_at",
+            ids
+        ).fetchall()
+        return [WorkTask(**dict(zip(columns, row))) for row in rows]
+
+
+# Redis scripts: every state change is one atomic script, keyed by a prefix
+_REDIS_ENQUEUE = """
+local key = ARGV[1] .. ':task:' .. ARGV[2]
+if redis.call('EXISTS', key) == 1 then return 0 end
+redis.call('HSET', key, 'data', ARGV[3], 'status', 'pending', 'attempts', 0, 'owner', '', 'last_error', '')
+redis.call('ZADD', ARGV[1] .. ':ready', ARGV[4], ARGV[2])
+redis.call('SADD', ARGV[1] .. ':run:' .. ARGV[5], ARGV[2])
+return 1
+"""
+
+_REDIS_LEASE = """
+local prefix, now, limit, worker, expires, max_attempts = ARGV[1], tonumber(ARGV[2]), tonumber(ARGV[3]), ARGV[4], ARGV[5], tonumber(ARGV[6])
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', prefix .. ':leased', '-inf', now)) do
+    local key = prefix .. ':task:' .. id
+    redis.call('ZREM', prefix .. ':leased', id)
+    if tonumber(redis.call('HGET', key, 'attempts')) >= max_attempts then
+        redis.call('HSET', key, 'status', 'dead', 'owner', '', 'last_error', 'lease expired')
+        redis.call('HINCRBY', prefix .. ':counts', 'dead', 1)
+    else
+        redis.call('HSET', key, 'status', 'pending', 'owner', '')
+        redis.call('ZADD', prefix .. ':ready', now, id)
+    end
+end
+local ids = redis.call('ZRANGEBYSCORE', prefix .. ':ready', '-inf', now, 'LIMIT', 0, limit)
+for _, id in ipairs(ids) do
+    local key = prefix .. ':task:' .. id
+    redis.call('ZREM', prefix .. ':ready', id)
+    redis.call('ZADD', prefix .. ':leased', expires, id)
+    redis.call('HSET', key, 'status', 'leased', 'owner', worker, 'lease_expires_at', expires)
+    redis.call('HINCRBY', key, 'attempts', 1)
+end
+return ids
+"""
+
+_REDIS_HEARTBEAT = """
+local key = ARGV[1] .. ':task:' .. ARGV[2]
+if redis.call('HGET', key, 'status') ~= 'leased' or redis.call('HGET', key, 'owner') ~= ARGV[3] then return 0 end
+redis.call('HSET', key, 'lease_expires_at', ARGV[4])
+redis.call('ZADD', ARGV[1] .. ':leased', ARGV[4], ARGV[2])
+return 1
+"""
+
+_REDIS_COMPLETE = """
+local key = ARGV[1] .. ':task:' .. ARGV[2]
+if redis.call('HGET', key, 'status') ~= 'leased' or redis.call('HGET', key, 'owner') ~= ARGV[3] then return 0 end
+redis.call('HSET', key, 'status', 'done', 'owner', '')
+redis.call('ZREM', ARGV[1] .. ':leased', ARGV[2])
+redis.call('HINCRBY', ARGV[1] .. ':counts', 'done', 1)
+return 1
+"""
+
+_REDIS_FAIL = """
+local key = ARGV[1] .. ':task:' .. ARGV[2]
+if redis.call('HGET', key, 'status') ~= 'leased' or redis.call('HGET', key, 'owner') ~= ARGV[3] then return false end
+redis.call('ZREM', ARGV[1] .. ':leased', ARGV[2])
+redis.call('HSET', key, 'owner', '', 'last_error', ARGV[4])
+if tonumber(redis.call('HGET', key, 'attempts')) >= tonumber(ARGV[6]) then
+    redis.call('HSET', key, 'status', 'dead')
+    redis.call('HINCRBY', ARGV[1] .. ':counts', 'dead', 1)
+    return 'dead'
+end
+redis.call('HSET', key, 'status', 'pending')
+redis.call('ZADD', ARGV[1] .. ':ready', ARGV[5], ARGV[2])
+return 'pending'
+"""
+
+_REDIS_RELEASE = """
+local key = ARGV[1] .. ':task:' .. ARGV[2]
+if redis.call('HGET', key, 'status') ~= 'leased' or redis.call('HGET', key, 'owner') ~= ARGV[3] then return 0 end
+redis.call('ZREM', ARGV[1] .. ':leased', ARGV[2])
+redis.call('HSET', key, 'status', 'pending', 'owner', '')
+redis.call('HINCRBY', key, 'attempts', -1)
+redis.call('ZADD', ARGV[1] .. ':ready', ARGV[4], ARGV[2])
+return 1
+"""
+
+
+class RedisWorkQueue(WorkQueue):
+    """
+    Work queue on Redis, for workers spread over several machines.
+
+    Ready tasks sit in a sorted set scored by availability time and leased
+    tasks in one scored by lease expiry; task state is a hash per task. The
+    scripts build keys from a prefix, so the queue must live on one Redis node
+    (no Cluster slot routing).
+    """
+
+    def __init__(self, client, max_attempts: int = 3, prefix: str = 'work_queue'):
+        super().__init__(max_attempts)
+        self.client = client
+        self.prefix = prefix
+        self._scripts = {
+            name: client.register_script(source)
+            for name, source in (
+                ('enqueue', _REDIS_ENQUEUE), ('lease', _REDIS_LEASE), ('heartbeat', _REDIS_HEARTBEAT),
+                ('complete', _REDIS_COMPLETE), ('fail', _REDIS_FAIL), ('release', _REDIS_RELEASE),
+            )
+        }
+
+    @classmethod
+    def from_url(cls, url: str, max_attempts: int = 3) -> "RedisWorkQueue":
+        import redis  # optional dependency, only needed for the Redis backend
+        return cls(redis.Redis.from_url(url), max_attempts)
+
+    def enqueue(self, tasks: Iterable[WorkTask]) -> int:
+        now = time.time()
+        added = 0
+        for task in tasks:
+            data = json.dumps({
+                k: v for k, v in asdict(task).items()
+                if k not in ('status', 'attempts', 'lease_owner', 'lease_expires_at', 'last_error')
+            })
+            added += int(self._scripts['enqueue'](args=[self.prefix, task.task_id, data, now, task.run_id]))
+        return added
+
+    def lease(self, worker_id: str, lease_seconds: float, limit: int = 1) -> List[WorkTask]:
+        now = time.time()
+        ids = self._scripts['lease'](args=[self.prefix, now, limit, worker_id, now + lease_seconds, self.max_attempts])
+        return [task for task in (self._load(_text(task_id)) for task_id in ids) if task is not None]
+
+    def heartbeat(self, task_id: str, worker_id: str, lease_seconds: float) -> bool:
+        return bool(self._scripts['heartbeat'](args=[self.prefix, task_id, worker_id, time.time() + lease_seconds]))
+
+    def complete(self, task_id: str, worker_id: str) -> bool:
+        return bool(self._scripts['complete'](args=[self.prefix, task_id, worker_id]))
+
+    def fail(self, task_id: str, worker_id: str, error: str, retry_delay_seconds: float) -> Optional[str]:
+        status = self._scripts['fail'](args=[
+            self.prefix, task_id, worker_id, error, time.time() + retry_delay_seconds, self.max_attempts
+        ])
+        return _text(status) if status else None
+
+    def release(self, task_id: str, worker_id: str) -> bool:
+        return bool(self._scripts['release'](args=[self.prefix, task_id, worker_id, time.time()]))
+
+    def stats(self, run_id: Optional[str] = None) -> Dict[str, int]:
+        counts = dict.fromkeys(STATUSES, 0)
+        if run_id is None:
+            counts[PENDING] = self.client.zcard(f"{self.prefix}:ready")
+            counts[LEASED] = self.client.zcard(f"{self.prefix}:leased")
+            for status, count in self.client.hgetall(f"{self.prefix}:counts").items():
+                counts[_text(status)] = int(count)
+            return counts
+
+        pipeline = self.client.pipeline()
+        for task_id in self.client.smembers(f"{self.prefix}:run:{run_id}"):
+            pipeline.hget(f"{self.prefix}:task:{_text(task_id)}", 'status')
+        for status in pipeline.execute():
+            if status is not None:
+                counts[_text(status)] += 1
+        return counts
+
+    def _load(self, task_id: str) -> Optional[WorkTask]:
+        fields = {_text(k): _text(v) for k, v in self.client.hgetall(f"{self.prefix}:task:{task_id}").items()}
+        if not fields:
+            return None
+        return WorkTask(
+            **json.loads(fields['data']),
+            status=fields['status'],
+            attempts=int(fields['attempts']),
+            lease_owner=fields.get('owner') or None,
+            lease_expires_at=float(fields['lease_expires_at']) if fields.get('lease_expires_at') else None,
+            last_error=fields.get('last_error') or None
+        )
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def create_work_queue(url: str, max_attempts: int = 3) -> WorkQueue:
+    """Backend for a queue URL: sqlite:///path/to/file or redis://host:port/db"""
+    if url.startswith('sqlite:///'):
+        return SQLiteWorkQueue(url[len('sqlite:///'):], max_attempts)
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisWorkQueue.from_url(url, max_attempts)
+    raise ValueError(f"Unsupported work queue URL: {url}")
+
+
+def enqueue_request(queue: WorkQueue, request: IngestionRequest, run_id: Optional[str] = None) -> Dict[str, Any]:
+    """Enqueue an ingestion request as page tasks; reusing a run_id makes this idempotent"""
+    run_id = run_id or uuid.uuid4().hex
+    tasks = plan_tasks(run_id, request, settings.work_queue_page_size)
+    added = queue.enqueue(tasks)
+    return {"run_id": run_id, "tasks": len(tasks), "new_tasks": added}
+
+
+def _create_work_queue() -> WorkQueue:
+    return create_work_queue(settings.work_queue_url, settings.work_queue_max_attempts)
+
+
+get_work_queue = LazySingleton(_create_work_queue)
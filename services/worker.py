@@ -0,0 +1,206 @@
+"""
+ingest-worker: pulls (source, location, page) tasks from the work queue and
+runs them through the ingestion pipeline.
+
+Usage:
+    python -m services.worker                     # one worker, WORKER_CONCURRENCY tasks at a time
+    python -m services.worker --processes 4       # four worker processes on this machine
+    python -m services.worker --burst             # exit once the queue is drained
+    python -m services.worker --metrics-port 9100 # also serve Prometheus metrics
+
+Start as many workers as needed, on one machine or many; they coordinate only
+through the queue (WORK_QUEUE_URL).
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import uuid
+from typing import Dict, Optional
+from app.config import settings
+from app.models import DataSource
+from services.ingestion import ingest_source
+from services.jobs import IngestionJob
+from services.work_queue import DEAD, WorkQueue, WorkTask, get_work_queue
+from utils.logger import logger, shutdown_logging
+from utils.metrics import MULTIPROCESS, WORKER_TASKS, release_process, serve_metrics
+from utils.profiling import create_capture
+
+
+class LeaseLostError(Exception):
+    """Raised inside a task when its lease has been taken over by another worker"""
+
+
+class IngestWorker:
+    """Leases tasks and processes up to `concurrency` of them at once, heartbeating each lease"""
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        worker_id: Optional[str] = None,
+        concurrency: int = 4,
+        lease_seconds: float = 120,
+        poll_interval_seconds: float = 2.0,
+        retry_delay_seconds: float = 30
+    ):
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.retry_delay_seconds = retry_delay_seconds
+        self.stats = {'completed': 0, 'failed': 0, 'lost': 0, 'intents': 0}
+        self._active: Dict[str, asyncio.Task] = {}
+        self._stopping = asyncio.Event()
+
+    @classmethod
+    def from_settings(cls, worker_id: Optional[str] = None) -> "IngestWorker":
+        return cls(
+            queue=get_work_queue(),
+            worker_id=worker_id,
+            concurrency=settings.worker_concurrency,
+            lease_seconds=settings.work_queue_lease_seconds,
+            poll_interval_seconds=settings.worker_poll_interval_seconds,
+            retry_delay_seconds=settings.work_queue_retry_delay_seconds
+        )
+
+    def stop(self):
+        self._stopping.set()
+
+    async def run(self, burst: bool = False):
+        """Work until stop() (or, with burst, until nothing is left to lease)"""
+        logger.info(f"👷 ingest-worker {self.worker_id} started (concurrency {self.concurrency})")
+        while not self._stopping.is_set():
+            free = self.concurrency - len(self._active)
+            tasks = await asyncio.to_thread(self.queue.lease, self.worker_id, self.lease_seconds, free) if free else []
+            for task in tasks:
+                self._active[task.task_id] = asyncio.create_task(self._process(task))
+
+            if burst and not tasks and not self._active:
+                break
+            if not tasks:
+                # Idle or full: wait for a slot to free up or the next poll, jittered so workers don't poll in step
+                delay = self.poll_interval_seconds * random.uniform(0.5, 1.5)
+                waiters = [asyncio.create_task(self._stopping.wait())]
+                waiters += list(self._active.values())
+                await asyncio.wait(waiters, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                waiters[0].cancel()
+
+        await self._drain()
+        logger.info(f"👋 ingest-worker {self.worker_id} stopped: {self.stats}")
+
+    async def _drain(self):
+        """Hand unfinished tasks back to the queue so another worker picks them up"""
+        running = list(self._active.values())
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+    async def _process(self, task: WorkTask):
+        job = IngestionJob(task.to_request())
+        job.mark_running()
+        lease_lost = asyncio.Event()
+        heartbeat = asyncio.create_task(self._heartbeat(task, lease_lost))
+
+        async def checkpoint(_job: IngestionJob):
+            if lease_lost.is_set():
+                raise LeaseLostError(task.task_id)
+
+        profile = create_capture(f"task-{task.task_id}", settings.profiling_kinds) if settings.profiling_ingestion_jobs else None
+        if profile is not None:
+            profile.start()
+        try:
+            await ingest_source(job, DataSource(task.source), page=task.page, checkpoint=checkpoint)
+            if await asyncio.to_thread(self.queue.complete, task.task_id, self.worker_id):
+                self.stats['completed'] += 1
+                self.stats['intents'] += job.counters['persisted']
+                WORKER_TASKS.labels('completed').inc()
+                logger.info(f"✅ Task {task.source} / {task.location} p{task.page} done: {job.counters}")
+            else:
+                self.stats['lost'] += 1
+                WORKER_TASKS.labels('lost').inc()
+                logger.warning(f"Task {task.task_id} finished after its lease was taken over")
+        except LeaseLostError:
+            self.stats['lost'] += 1
+            WORKER_TASKS.labels('lost').inc()
+            logger.warning(f"Lost lease on task {task.task_id}; abandoning it")
+        except asyncio.CancelledError:
+            await asyncio.to_thread(self.queue.release, task.task_id, self.worker_id)
+            WORKER_TASKS.labels('released').inc()
+            raise
+        except Exception as e:
+            self.stats['failed'] += 1
+            status = await asyncio.to_thread(
+                self.queue.fail, task.task_id, self.worker_id, str(e), self.retry_delay_seconds
+            )
+            WORKER_TASKS.labels('dead' if status == DEAD else 'failed').inc()
+            log = logger.error if status == DEAD else logger.warning
+            log(f"Task {task.task_id} failed (attempt {task.attempts}, now {status}): {e}")
+        finally:
+            heartbeat.cancel()
+            self._active.pop(task.task_id, None)
+            if profile is not None:
+                profile.stop()
+
+    async def _heartbeat(self, task: WorkTask, lease_lost: asyncio.Event):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            held = await asyncio.to_thread(self.queue.heartbeat, task.task_id, self.worker_id, self.lease_seconds)
+            if not held:
+                lease_lost.set()
+                return
+
+
+def run_worker(worker_id: Optional[str] = None, burst: bool = False, metrics_port: Optional[int] = None):
+    """Process entry point: run one worker until SIGINT/SIGTERM (or the queue drains, with burst)"""
+    async def main():
+        worker = IngestWorker.from_settings(worker_id)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, worker.stop)
+        await worker.run(burst=burst)
+
+    if metrics_port:
+        serve_metrics(metrics_port)
+    try:
+        asyncio.run(main())
+    finally:
+        release_process()
+        shutdown_logging()  # child processes exit without running atexit
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="ingest-worker", description="Run distributed ingestion workers")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to start on this machine")
+    parser.add_argument("--worker-id", help="Worker id prefix (default: host-pid-random)")
+    parser.add_argument("--burst", action="store_true", help="Exit once no tasks are left")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port")
+    args = parser.parse_args()
+
+    if args.processes == 1:
+        run_worker(args.worker_id, args.burst, args.metrics_port)
+    else:
+        # One endpoint for all children, aggregated through PROMETHEUS_MULTIPROC_DIR
+        if args.metrics_port:
+            if not MULTIPROCESS:
+                parser.error("--metrics-port with --processes needs PROMETHEUS_MULTIPROC_DIR set")
+            serve_metrics(args.metrics_port)
+        processes = [
+            multiprocessing.Process(
+                target=run_worker,
+                args=(f"{args.worker_id}-{index}" if args.worker_id else None, args.burst),
+                name=f"ingest-worker-{index}"
+            )
+            for index in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+
+        # Children stop gracefully on SIGTERM (Ctrl-C already reaches the whole process group)
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: [process.terminate() for process in processes if process.is_alive()])
+        for process in processes:
+            process.join()
@@ -0,0 +1,23 @@
+import os
+import sys
+
+# Keep test runs from writing the application log file; must be set before app.config is imported
+os.environ.setdefault('LOG_FILE', '')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fake_firestore import FakeFirestore
+
+
+@pytest.fixture
+def db_manager(monkeypatch):
+    """DatabaseManager on an in-memory Firestore, with caching off"""
+    from app.database import DatabaseManager
+    from services.cache import IntentCache
+
+    monkeypatch.setattr(DatabaseManager, '_initialize_firestore', lambda self: setattr(self, 'db', FakeFirestore()))
+    manager = DatabaseManager()
+    manager.cache = IntentCache(enabled=False)
+    yield manager
+    manager.close()
@@ -0,0 +1,24 @@
+"""Loader stand-in for the in-memory indexes' delta refresh"""
+import time
+from datetime import datetime
+
+
+class Storage:
+    """Documents as another process would see them, streamed like DatabaseManager.stream_*_since"""
+
+    def __init__(self, order_field):
+        self.order_field = order_field
+        self.docs = {}
+        self.loads = []
+
+    def save(self, doc, id_field):
+        self.docs[doc[id_field]] = doc
+
+    def loader(self, since):
+        self.loads.append(since)
+        docs = sorted(self.docs.values(), key=lambda doc: doc[self.order_field])
+        yield [doc for doc in docs if since is None or doc[self.order_field] > since]
+
+
+def ago(seconds):
+    return datetime.fromtimestamp(time.time() - seconds).isoformat()
@@ -0,0 +1,314 @@
+"""
+In-memory stand-in for the Firestore client surface the app uses: nested
+collections, set/merge with Increment transforms, batches, get_all, queries
+(where / order_by / limit / select / start_after) and collection groups.
+
+Query ordering follows Firestore: explicit order_by fields, then the field of
+an inequality filter, then the document path.
+"""
+import operator
+from typing import Any, Dict, List, Optional, Tuple
+
+_OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+_INEQUALITIES = ('<', '<=', '>', '>=', '!=')
+_MISSING = object()
+
+
+def _is_increment(value: Any) -> bool:
+    return type(value).__name__ == 'Increment' and hasattr(value, 'value')
+
+
+def _resolve(value: Any, current: Any = _MISSING) -> Any:
+    if _is_increment(value):
+        return (current if isinstance(current, (int, float)) else 0) + value.value
+    if isinstance(value, dict):
+        base = current if isinstance(current, dict) else {}
+        return {key: _resolve(item, base.get(key, _MISSING)) for key, item in value.items()}
+    return value
+
+
+def _merge(current: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(current)
+    for key, value in update.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = _resolve(value, merged.get(key, _MISSING))
+    return merged
+
+
+def _field(doc: Dict[str, Any], path: str) -> Any:
+    value: Any = doc
+    for part in path.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _project(doc: Dict[str, Any], paths: List[str]) -> Dict[str, Any]:
+    projected: Dict[str, Any] = {}
+    for path in paths:
+        value = _field(doc, path)
+        if value is _MISSING:
+            continue
+        target = projected
+        parts = path.split('.')
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = value
+    return projected
+
+
+class FakeSnapshot:
+    def __init__(self, reference: "FakeDocumentReference", data: Optional[Dict[str, Any]]):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return dict(self._data) if self._data is not None else None
+
+    def get(self, path: str) -> Any:
+        value = _field(self._data or {}, path)
+        return None if value is _MISSING else value
+
+
+class FakeDocumentReference:
+    def __init__(self, client: "FakeFirestore", path: Tuple[str, ...]):
+        self._client = client
+        self.path = path
+        self.id = path[-1]
+
+    @property
+    def parent(self) -> "FakeCollectionReference":
+        return FakeCollectionReference(self._client, self.path[:-1])
+
+    def collection(self, name: str) -> "FakeCollectionReference":
+        return FakeCollectionReference(self._client, self.path + (name,))
+
+    def set(self, data: Dict[str, Any], merge: bool = False):
+        current = self._client.docs.get(self.path)
+        if merge and current is not None:
+            self._client.docs[self.path] = _merge(current, data)
+        else:
+            self._client.docs[self.path] = _resolve(data)
+
+    def update(self, data: Dict[str, Any]):
+        if self.path not in self._client.docs:
+            raise KeyError(f"No document to update: {'/'.join(self.path)}")
+        self.set(data, merge=True)
+
+    def delete(self):
+        self._client.docs.pop(self.path, None)
+
+    def get(self, field_paths: Optional[List[str]] = None) -> FakeSnapshot:
+        data = self._client.docs.get(self.path)
+        if data is not None and field_paths:
+            data = _project(data, list(field_paths))
+        return FakeSnapshot(self, data)
+
+
+class FakeQuery:
+    def __init__(
+        self,
+        client: "FakeFirestore",
+        path: Optional[Tuple[str, ...]] = None,
+        group: Optional[str] = None,
+        filters: Tuple = (),
+        orders: Tuple = (),
+        limit_count: Optional[int] = None,
+        projection: Optional[List[str]] = None,
+        cursor: Optional[FakeSnapshot] = None
+    ):
+        self._client = client
+        self._path = path
+        self._group = group
+        self._filters = filters
+        self._orders = orders
+        self._limit = limit_count
+        self._projection = projection
+        self._cursor = cursor
+
+    def _copy(self, **changes) -> "FakeQuery":
+        values = {
+            'path': self._path,
+            'group': self._group,
+            'filters': self._filters,
+            'orders': self._orders,
+            'limit_count': self._limit,
+            'projection': self._projection,
+            'cursor': self._cursor,
+        }
+        values.update(changes)
+        return FakeQuery(self._client, **values)
+
+    def where(self, field: str, op: str, value: Any) -> "FakeQuery":
+        return self._copy(filters=self._filters + ((field, op, value),))
+
+    def order_by(self, field: str, direction: str = 'ASCENDING') -> "FakeQuery":
+        return self._copy(orders=self._orders + ((field, direction == 'DESCENDING'),))
+
+    def limit(self, count: int) -> "FakeQuery":
+        return self._copy(limit_count=count)
+
+    def select(self, field_paths: List[str]) -> "FakeQuery":
+        return self._copy(projection=list(field_paths))
+
+    def start_after(self, snapshot: FakeSnapshot) -> "FakeQuery":
+        return self._copy(cursor=snapshot)
+
+    def _in_scope(self, path: Tuple[str, ...]) -> bool:
+        if self._group is not None:
+            return len(path) >= 2 and path[-2] == self._group
+        return path[:-1] == self._path
+
+    def _matches(self, doc: Dict[str, Any]) -> bool:
+        for field, op, value in self._filters:
+            current = _field(doc, field)
+            if current is _MISSING or current is None:
+                return False
+            try:
+                if not _OPERATORS[op](current, value):
+                    return False
+            except TypeError:
+                return False
+        return True
+
+    def _sort_fields(self) -> List[Tuple[str, bool]]:
+        fields = list(self._orders)
+        for field, op, _ in self._filters:
+            if op in _INEQUALITIES and field not in [name for name, _ in fields]:
+                fields.append((field, False))
+        return fields
+
+    def _sort_key(self, path: Tuple[str, ...], doc: Dict[str, Any], fields: List[Tuple[str, bool]]):
+        key = []
+        for field, descending in fields:
+            value = _field(doc, field)
+            key.append(_Descending(value) if descending else _Ascending(value))
+        key.append(_Ascending(path))
+        return tuple(key)
+
+    def stream(self):
+        fields = self._sort_fields()
+        matches = [
+            (path, doc) for path, doc in self._client.docs.items()
+            if self._in_scope(path) and self._matches(doc)
+        ]
+        matches.sort(key=lambda item: self._sort_key(item[0], item[1], fields))
+
+        if self._cursor is not None:
+            cursor_path = self._cursor.reference.path
+            cursor_doc = self._client.docs.get(cursor_path, self._cursor.to_dict() or {})
+            cursor_key = self._sort_key(cursor_path, cursor_doc, fields)
+            matches = [item for item in matches if self._sort_key(item[0], item[1], fields) > cursor_key]
+        if self._limit is not None:
+            matches = matches[:self._limit]
+
+        for path, doc in matches:
+            self._client.reads += 1
+            data = _project(doc, self._projection) if self._projection is not None else dict(doc)
+            yield FakeSnapshot(FakeDocumentReference(self._client, path), data)
+
+    def get(self) -> List[FakeSnapshot]:
+        return list(self.stream())
+
+
+class FakeCollectionReference(FakeQuery):
+    def __init__(self, client: "FakeFirestore", path: Tuple[str, ...]):
+        super().__init__(client, path=path)
+        self.id = path[-1]
+
+    @property
+    def parent(self) -> Optional[FakeDocumentReference]:
+        return FakeDocumentReference(self._client, self._path[:-1]) if len(self._path) > 1 else None
+
+    def document(self, document_id: str) -> FakeDocumentReference:
+        return FakeDocumentReference(self._client, self._path + (document_id,))
+
+    def list_documents(self, page_size: Optional[int] = None) -> List[FakeDocumentReference]:
+        """Documents directly in the collection, including missing ones that only have subcollections"""
+        depth = len(self._path)
+        ids = {path[depth] for path in self._client.docs if len(path) > depth and path[:depth] == self._path}
+        return [self.document(document_id) for document_id in sorted(ids)]
+
+
+class FakeWriteBatch:
+    def __init__(self):
+        self._writes = []
+
+    def set(self, reference: FakeDocumentReference, data: Dict[str, Any], merge: bool = False):
+        self._writes.append(lambda: reference.set(data, merge=merge))
+
+    def update(self, reference: FakeDocumentReference, data: Dict[str, Any]):
+        self._writes.append(lambda: reference.update(data))
+
+    def delete(self, reference: FakeDocumentReference):
+        self._writes.append(reference.delete)
+
+    def commit(self):
+        for write in self._writes:
+            write()
+        self._writes = []
+
+
+class FakeFirestore:
+    def __init__(self):
+        self.docs: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        self.get_all_calls = 0
+        self.reads = 0  # documents returned by queries
+
+    def collection(self, name: str) -> FakeCollectionReference:
+        return FakeCollectionReference(self, (name,))
+
+    def collection_group(self, name: str) -> FakeQuery:
+        return FakeQuery(self, group=name)
+
+    def batch(self) -> FakeWriteBatch:
+        return FakeWriteBatch()
+
+    def get_all(self, references, field_paths: Optional[List[str]] = None):
+        self.get_all_calls += 1
+        for reference in references:
+            yield reference.get(field_paths)
+
+
+class _Ascending:
+    """Sort wrapper: missing and None values first, then by value"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def _rank(self):
+        missing = self.value is _MISSING or self.value is None
+        return (0, '') if missing else (1, self.value)
+
+    def __lt__(self, other):
+        return self._rank() < other._rank()
+
+    def __gt__(self, other):
+        return self._rank() > other._rank()
+
+    def __eq__(self, other):
+        return self._rank() == other._rank()
+
+
+class _Descending(_Ascending):
+    __slots__ = ()
+
+    def __lt__(self, other):
+        return self._rank() > other._rank()
+
+    def __gt__(self, other):
+        return self._rank() < other._rank()
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+from fake_firestore import FakeFirestore
+from services.aggregates import IntentAggregates
+
+
+def _record(aggregates, db, intent_id, city, days_ago, urgency='high'):
+    batch = db.batch()
+    aggregates.add_to_batch(batch, {
+        'intent_id': intent_id,
+        'city': city,
+        'intent_type': 'car_buyer',
+        'urgency': urgency,
+        'confidence_score': 0.8,
+        'detected_at': (datetime.now() - timedelta(days=days_ago)).isoformat(),
+    })
+    batch.commit()
+
+
+def _aggregates():
+    db = FakeFirestore()
+    aggregates = IntentAggregates(db, num_shards=3, breakdown_days=5)
+    for i, (city, days_ago, urgency) in enumerate([
+        ('Tucson', 0, 'high'), ('Tucson', 1, 'low'), ('Phoenix', 0, 'high'), ('Phoenix', 10, 'high'), ('Mesa', 2, 'medium'),
+    ]):
+        _record(aggregates, db, f'intent-{i}', city, days_ago, urgency)
+    return db, aggregates
+
+
+def test_summary_totals_cities_and_days():
+    _, aggregates = _aggregates()
+    summary = aggregates.get_summary(top_cities=10)
+
+    assert summary['total_intents'] == 5
+    assert summary['high_urgency_count'] == 3
+    assert {entry['city']: entry['count'] for entry in summary['top_cities']} == {'phoenix': 2, 'tucson': 2, 'mesa': 1}
+    assert len(summary['by_day']) == 5
+    assert sum(summary['by_day'].values()) == 4
+
+
+def test_summary_for_recent_days_and_city():
+    _, aggregates = _aggregates()
+
+    recent = aggregates.get_summary(days=2, top_cities=10)
+    assert recent['total_intents'] == 3
+    assert {entry['city']: entry['count'] for entry in recent['top_cities']} == {'tucson': 2, 'phoenix': 1}
+
+    tucson = aggregates.get_summary(city='tucson', top_cities=10)
+    assert tucson['total_intents'] == 2
+    assert tucson['by_urgency'] == {'high': 1, 'low': 1}
+    assert tucson['top_cities'] == [{'city': 'tucson', 'count': 2}]
+
+
+def test_summary_reads_only_fixed_shards_without_top_cities():
+    db, aggregates = _aggregates()
+    for i in range(50):
+        _record(aggregates, db, f'more-{i}', f'City {i}', 0)
+    db.reads = 0
+
+    summary = aggregates.get_summary()
+    assert summary['total_intents'] == 55
+    assert summary['top_cities'] == []
+    assert db.reads == 0
+
+    assert len(aggregates.get_summary(top_cities=3)['top_cities']) == 3
+
+
+def _fields(doc):
+    return sum(_fields(value) if isinstance(value, dict) else 1 for value in doc.values())
+
+
+def test_shard_documents_stay_fixed_size():
+    db, aggregates = _aggregates()
+    largest = max(_fields(doc) for doc in db.docs.values())
+    for i in range(50):
+        _record(aggregates, db, f'more-{i}', f'City {i}', i)
+    assert max(_fields(doc) for doc in db.docs.values()) == largest
@@ -0,0 +1,55 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.models import DataSource, IntentUrgency, NormalizedListing
+from services.ai_enrichment import AIEnrichmentService, get_llm_client
+
+
+class FakeCompletions:
+    def __init__(self, output):
+        self.output = output
+
+    async def create(self, **kwargs):
+        message = SimpleNamespace(content=json.dumps(self.output))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+@pytest.fixture
+def llm():
+    output = {'urgency': 'high', 'confidence_score': 0.8, 'keywords': ['sedan']}
+    get_llm_client.override(SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(output))))
+    yield
+    get_llm_client.override(None)
+
+
+def _listing(**contact):
+    return NormalizedListing(
+        listing_id='listing-1',
+        source=DataSource.CRAIGSLIST,
+        url='https://tucson.craigslist.org/cto/1.html',
+        title='2019 Toyota Camry',
+        price=18500,
+        location='Tucson, AZ',
+        city='Tucson',
+        state='AZ',
+        scraped_at='2026-10-19T12:00:00',
+        **contact
+    )
+
+
+def test_phone_only_listing_keeps_only_known_contact_fields(llm):
+    intent = asyncio.run(AIEnrichmentService.enrich_listing(_listing(phone='520-555-0199')))
+
+    assert intent.urgency == IntentUrgency.HIGH
+    assert intent.contact_available
+    assert intent.contact_info == {'phone': '520-555-0199'}
+
+
+def test_listing_without_contact_has_no_contact_info(llm):
+    intent = asyncio.run(AIEnrichmentService.enrich_listing(_listing(seller_name='Pat')))
+
+    assert not intent.contact_available
+    assert intent.contact_info is None
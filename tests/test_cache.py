@@ -0,0 +1,129 @@
+from datetime import datetime
+
+import fakeredis
+
+from app.models import IntentType, IntentUrgency
+from services.cache import MISSING, IntentCache, SharedCacheBackend, normalize_query_filters
+
+
+def _intent(intent_id, city='Tucson', **fields):
+    doc = {
+        'intent_id': intent_id,
+        'city': city,
+        'intent_type': 'car_buyer',
+        'urgency': 'high',
+        'confidence_score': 0.9,
+        'detected_at': '2026-10-19T12:00:00',
+    }
+    doc.update(fields)
+    return doc
+
+
+def test_query_key_ignores_order_unset_filters_and_spelling():
+    a = IntentCache.query_key({
+        'location': 'Tucson, AZ',
+        'intent_type': IntentType.CAR_BUYER,
+        'start_date': datetime(2026, 10, 1),
+        'urgency': None,
+        'order_by_distance': False,
+    })
+    b = IntentCache.query_key({
+        'start_date': '2026-10-01T00:00:00',
+        'intent_type': 'car_buyer',
+        'location': ' Tucson ',
+    })
+    assert a == b
+
+
+def test_query_key_keeps_city_case():
+    # Firestore's city filter is case-sensitive, so these are different queries
+    assert IntentCache.query_key({'location': 'Tucson'}) != IntentCache.query_key({'location': 'tucson'})
+
+
+def test_normalize_query_filters_reads_enum_values():
+    normalized = normalize_query_filters({'urgency': IntentUrgency.HIGH, 'limit': 10, 'bbox': None})
+    assert normalized == {'urgency': 'high', 'limit': 10}
+
+
+def test_query_hit_after_set():
+    cache = IntentCache()
+    filters = {'location': 'Tucson', 'limit': 10}
+    assert cache.get_query(filters) is MISSING
+    cache.set_query(filters, [_intent('a')])
+    assert cache.get_query({'limit': 10, 'location': 'Tucson, AZ'}) == [_intent('a')]
+
+
+def test_saved_intent_drops_only_matching_queries():
+    cache = IntentCache()
+    tucson = {'location': 'Tucson'}
+    phoenix = {'location': 'Phoenix'}
+    homes = {'location': 'Tucson', 'intent_type': 'home_buyer'}
+    confident = {'location': 'Tucson', 'min_confidence': 0.95}
+    for filters in (tucson, phoenix, homes, confident):
+        cache.set_query(filters, [])
+
+    cache.on_intent_saved(_intent('a'))
+
+    assert cache.get_query(tucson) is MISSING
+    assert cache.get_query(phoenix) == []
+    assert cache.get_query(homes) == []
+    assert cache.get_query(confident) == []
+    assert cache.get_intent('a') == _intent('a')
+
+
+def test_saved_intent_drops_radius_queries_it_falls_in():
+    cache = IntentCache()
+    near = {'latitude': 32.22, 'longitude': -110.97, 'radius_miles': 10}
+    far = {'latitude': 33.45, 'longitude': -112.07, 'radius_miles': 10}
+    cache.set_query(near, [])
+    cache.set_query(far, [])
+
+    cache.on_intent_saved(_intent('a', latitude=32.25, longitude=-110.95))
+
+    assert cache.get_query(near) is MISSING
+    assert cache.get_query(far) == []
+
+
+def test_shared_queries_invalidated_across_workers():
+    client = fakeredis.FakeRedis()
+    first = IntentCache(shared=SharedCacheBackend(client))
+    second = IntentCache(shared=SharedCacheBackend(client))
+    filters = {'location': 'Tucson'}
+
+    first.set_query(filters, [_intent('a')])
+    assert second.get_query(filters) == [_intent('a')]
+
+    first.on_intent_saved(_intent('b', city='Phoenix'))
+    # The generation bump retires shared entries; second's local copy expires on its own TTL
+    assert IntentCache(shared=SharedCacheBackend(client)).get_query(filters) is MISSING
+
+
+def test_disabled_cache_never_hits():
+    cache = IntentCache(enabled=False)
+    cache.set_query({'location': 'Tucson'}, [])
+    cache.set_intent('a', _intent('a'))
+    assert cache.get_query({'location': 'Tucson'}) is MISSING
+    assert cache.get_intent('a') is MISSING
+
+
+class DownRedis:
+    """Redis client whose server is unreachable"""
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            raise ConnectionError("Connection refused")
+        return call
+
+
+def test_unreachable_shared_tier_falls_back_to_local():
+    cache = IntentCache(shared=SharedCacheBackend(DownRedis()))
+    filters = {'location': 'Tucson'}
+
+    assert cache.get_query(filters) is MISSING
+    cache.set_query(filters, [_intent('a')])
+    assert cache.get_query(filters) == [_intent('a')]
+
+    cache.set_intent('a', _intent('a'))
+    assert cache.get_intents(['a', 'b']) == {'a': _intent('a')}
+    cache.on_intent_saved(_intent('b'))
+    assert cache.get_query(filters) is MISSING
@@ -0,0 +1,148 @@
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.database import DatabaseManager, QueryTooBroadError, geo_day_key
+from services.spatial_index import encode_geohash, geohash_cover, geohash_ranges, haversine_miles
+
+CENTER = (32.22, -110.97)
+
+
+def _seed(db_manager, count=1500, spread=1.0, seed=7, days=20):
+    """Intents spread around CENTER, detected over the last `days` days"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    docs = []
+    for i in range(count):
+        latitude = CENTER[0] + rng.uniform(-spread, spread)
+        longitude = CENTER[1] + rng.uniform(-spread, spread)
+        doc = {
+            'intent_id': f'intent-{i}',
+            'city': rng.choice(['Tucson', 'Marana']),
+            'intent_type': 'car_buyer',
+            'urgency': 'high',
+            'confidence_score': 0.9,
+            'detected_at': (now - timedelta(minutes=rng.uniform(0, days * 1440))).isoformat(),
+            'latitude': latitude,
+            'longitude': longitude,
+            'geohash': encode_geohash(latitude, longitude, settings.geohash_precision),
+        }
+        doc['geo_day_key'] = geo_day_key(doc['detected_at'], doc['geohash'])
+        db_manager.db.collection('consumer_intents').document(doc['intent_id']).set(doc)
+        docs.append(doc)
+    return docs
+
+
+def _within(docs, radius_miles):
+    lats = np.array([doc['latitude'] for doc in docs])
+    lons = np.array([doc['longitude'] for doc in docs])
+    distances = haversine_miles(CENTER[0], CENTER[1], lats, lons)
+    return {doc['intent_id'] for doc, distance in zip(docs, distances) if distance <= radius_miles}
+
+
+@pytest.mark.parametrize('radius_miles', [1, 10, 40])
+def test_cover_ranges_contain_every_point_in_radius(radius_miles):
+    rng = random.Random(radius_miles)
+    ranges = geohash_ranges(geohash_cover(*CENTER, radius_miles, max_cells=settings.geo_max_cover_cells))
+    for _ in range(2000):
+        latitude = CENTER[0] + rng.uniform(-1, 1)
+        longitude = CENTER[1] + rng.uniform(-1, 1)
+        if haversine_miles(CENTER[0], CENTER[1], latitude, longitude) > radius_miles:
+            continue
+        geohash = encode_geohash(latitude, longitude, settings.geohash_precision)
+        assert any(low <= geohash < high for low, high in ranges)
+
+
+@pytest.mark.parametrize('radius_miles', [8, 25, 60])
+def test_radius_query_matches_brute_force(db_manager, monkeypatch, radius_miles):
+    # Small pages, so every cell takes several reads
+    monkeypatch.setattr(settings, 'geo_scan_page_size', 25)
+    docs = _seed(db_manager)
+
+    filters = DatabaseManager._query_filters(
+        latitude=CENTER[0], longitude=CENTER[1], radius_miles=radius_miles, limit=len(docs)
+    )
+    results = db_manager._fetch_intents(filters)
+
+    assert {doc['intent_id'] for doc in results} == _within(docs, radius_miles)
+    assert all(doc['distance_miles'] <= radius_miles for doc in results)
+
+
+def test_radius_query_applies_filters_and_order(db_manager):
+    docs = _seed(db_manager)
+    filters = DatabaseManager._query_filters(
+        location='Marana', latitude=CENTER[0], longitude=CENTER[1], radius_miles=30,
+        order_by_distance=True, limit=20
+    )
+    results = db_manager._fetch_intents(filters)
+
+    expected = _within([doc for doc in docs if doc['city'] == 'Marana'], 30)
+    assert len(results) == 20
+    assert {doc['intent_id'] for doc in results} <= expected
+    distances = [doc['distance_miles'] for doc in results]
+    assert distances == sorted(distances)
+
+
+def test_bbox_query_matches_brute_force(db_manager):
+    docs = _seed(db_manager)
+    bbox = (32.0, -111.2, 32.5, -110.8)
+    results = db_manager._fetch_intents(DatabaseManager._query_filters(bbox=bbox, limit=len(docs)))
+
+    expected = {
+        doc['intent_id'] for doc in docs
+        if bbox[0] <= doc['latitude'] <= bbox[2] and bbox[1] <= doc['longitude'] <= bbox[3]
+    }
+    assert {doc['intent_id'] for doc in results} == expected
+
+
+def test_recent_query_stops_after_enough_days(db_manager):
+    docs = _seed(db_manager)
+    filters = DatabaseManager._query_filters(latitude=CENTER[0], longitude=CENTER[1], radius_miles=60, limit=10)
+    results = db_manager._fetch_intents(filters)
+
+    newest = sorted(
+        (doc for doc in docs if doc['intent_id'] in _within(docs, 60)),
+        key=lambda doc: doc['detected_at'], reverse=True
+    )[:10]
+    assert [doc['intent_id'] for doc in results] == [doc['intent_id'] for doc in newest]
+    # Only the newest days were read, not the whole window
+    assert db_manager.db.reads < len(docs) / 4
+
+
+def test_query_window_defaults_to_recent_days(db_manager):
+    docs = _seed(db_manager, days=60)
+    radius = dict(latitude=CENTER[0], longitude=CENTER[1], radius_miles=60, limit=len(docs))
+
+    recent = db_manager._fetch_intents(DatabaseManager._query_filters(**radius))
+    cutoff = (datetime.now() - timedelta(days=settings.geo_default_window_days)).date().isoformat()
+    assert recent and all(doc['detected_at'] >= cutoff for doc in recent)
+
+    start = datetime.now() - timedelta(days=61)
+    everything = db_manager._fetch_intents(DatabaseManager._query_filters(start_date=start, **radius))
+    assert {doc['intent_id'] for doc in everything} == _within(docs, 60)
+
+
+def test_too_long_window_rejected_before_reading(db_manager):
+    _seed(db_manager)
+    filters = DatabaseManager._query_filters(
+        latitude=CENTER[0], longitude=CENTER[1], radius_miles=5,
+        start_date=datetime.now() - timedelta(days=settings.geo_max_window_days + 1)
+    )
+    with pytest.raises(QueryTooBroadError):
+        db_manager._fetch_intents(filters)
+    assert db_manager.db.reads == 0
+
+
+def test_backfill_makes_older_intents_searchable(db_manager):
+    docs = _seed(db_manager, count=200)
+    for doc in db_manager.db.docs.values():
+        doc.pop('geo_day_key')
+    filters = DatabaseManager._query_filters(latitude=CENTER[0], longitude=CENTER[1], radius_miles=60, limit=len(docs))
+    assert db_manager._fetch_intents(filters) == []
+
+    assert db_manager.backfill_geo_day_keys(page_size=50) == len(docs)
+    assert {doc['intent_id'] for doc in db_manager._fetch_intents(filters)} == _within(docs, 60)
+    assert db_manager.backfill_geo_day_keys() == 0
@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+from delta_loader import Storage, ago
+from services.market_prices import MarketPriceIndex
+
+
+def _listing(listing_id, scraped_at, price=20000):
+    return {
+        'listing_id': listing_id,
+        'make': 'Toyota',
+        'model': 'Camry',
+        'year': 2019,
+        'mileage': 40000,
+        'state': 'AZ',
+        'price': price,
+        'scraped_at': scraped_at,
+    }
+
+
+def test_refresh_picks_up_listings_other_processes_saved():
+    storage = Storage('scraped_at')
+    storage.save(_listing('old', ago(3600)), 'listing_id')
+    index = MarketPriceIndex(storage.loader, min_samples=1, refresh_seconds=0, refresh_overlap_seconds=300)
+    index.ensure_loaded()
+
+    local = _listing('local', ago(0))
+    storage.save(local, 'listing_id')
+    index.on_listing_saved(local)
+    storage.save(_listing('remote', ago(60)), 'listing_id')
+
+    index.refresh()
+
+    assert len(index) == 3
+    assert index.lookup('Toyota', 'Camry')['listings'] == 3
+
+
+def test_refresh_expires_by_scrape_time_not_arrival():
+    storage = Storage('scraped_at')
+    storage.save(_listing('fresh', ago(60)), 'listing_id')
+    index = MarketPriceIndex(storage.loader, lookback_days=1, min_samples=1, refresh_seconds=0)
+    index.ensure_loaded()
+
+    # Arrives after the fresh listing but was scraped long ago
+    index.on_listing_saved(_listing('stale', ago(2 * 86400)))
+    assert len(index) == 2
+
+    index.refresh()
+
+    assert len(index) == 1
+    assert index.lookup('Toyota', 'Camry')['listings'] == 1
+
+
+def test_assess_leaves_the_listing_out():
+    storage = Storage('scraped_at')
+    for i, price in enumerate([10000, 10000, 10000, 30000]):
+        storage.save(_listing(f'listing-{i}', ago(60), price=price), 'listing_id')
+    index = MarketPriceIndex(storage.loader, min_samples=3, refresh_seconds=0)
+
+    listing = SimpleNamespace(
+        listing_id='listing-3', make='Toyota', model='Camry', year=2019, mileage=40000, state='AZ', price=30000
+    )
+    market = index.assess(listing)
+
+    assert market['listings'] == 3
+    assert market['percentile'] == 100.0
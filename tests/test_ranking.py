@@ -0,0 +1,52 @@
+from app.database import DatabaseManager
+from delta_loader import Storage, ago
+from services.ranking import LeadRanker
+
+
+def _intent(intent_id, detected_at, confidence=0.9):
+    return {
+        'intent_id': intent_id,
+        'city': 'Tucson',
+        'intent_type': 'car_buyer',
+        'urgency': 'high',
+        'confidence_score': confidence,
+        'detected_at': detected_at,
+    }
+
+
+def _ranked_ids(ranker):
+    return {intent_id for intent_id, _, _ in ranker.top_k(DatabaseManager._query_filters(min_confidence=0.0), 100)}
+
+
+def test_refresh_picks_up_intents_other_processes_saved():
+    storage = Storage('detected_at')
+    storage.save(_intent('old', ago(3600)), 'intent_id')
+    ranker = LeadRanker(storage.loader, {'confidence': 1.0}, refresh_seconds=0, refresh_overlap_seconds=300)
+    ranker.ensure_loaded()
+
+    # Saved here just now, while another process committed an intent detected a minute earlier
+    local = _intent('local', ago(0))
+    storage.save(local, 'intent_id')
+    ranker.on_intent_saved(local)
+    storage.save(_intent('remote', ago(60)), 'intent_id')
+
+    ranker.refresh()
+
+    assert _ranked_ids(ranker) == {'old', 'local', 'remote'}
+    # The local save did not move the watermark past the remote intent
+    assert storage.loads[-1] < ago(3600)
+
+
+def test_refresh_upserts_reread_intents():
+    storage = Storage('detected_at')
+    storage.save(_intent('a', ago(30), confidence=0.5), 'intent_id')
+    ranker = LeadRanker(storage.loader, {'confidence': 1.0}, refresh_seconds=0, refresh_overlap_seconds=300)
+    ranker.ensure_loaded()
+
+    storage.save(_intent('a', ago(30), confidence=0.8), 'intent_id')
+    ranker.refresh()
+    ranker.refresh()
+
+    [(intent_id, score, _)] = ranker.top_k(DatabaseManager._query_filters(min_confidence=0.0), 10)
+    assert len(ranker) == 1
+    assert intent_id == 'a' and abs(score - 0.8) < 1e-6
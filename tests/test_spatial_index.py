@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from services.spatial_index import SpatialIndex, points_within_radius
+
+
+@pytest.fixture(scope='module')
+def points():
+    rng = np.random.default_rng(3)
+    return rng.uniform(31.0, 34.0, 20000), rng.uniform(-113.0, -109.0, 20000)
+
+
+def test_query_radius_matches_brute_force(points):
+    lats, lons = points
+    index = SpatialIndex(lats, lons)
+    indices, distances = index.query_radius(32.22, -110.97, 25)
+
+    expected = np.flatnonzero(points_within_radius(lats, lons, (32.22, -110.97), 25))
+    assert sorted(indices.tolist()) == expected.tolist()
+    assert (distances <= 25).all()
+
+
+@pytest.mark.parametrize('sort_by_distance', [False, True])
+def test_batch_matches_single_queries(points, sort_by_distance):
+    index = SpatialIndex(*points)
+    rng = np.random.default_rng(4)
+    centers = list(zip(rng.uniform(31.5, 33.5, 40), rng.uniform(-112.5, -109.5, 40)))
+    radii = rng.uniform(0.5, 60, 40)
+
+    batch = index.query_radius_batch(centers, radii, sort_by_distance)
+
+    assert len(batch) == len(centers)
+    for (latitude, longitude), radius, (indices, distances) in zip(centers, radii, batch):
+        single_indices, single_distances = index.query_radius(latitude, longitude, radius, sort_by_distance)
+        assert indices.tolist() == single_indices.tolist()
+        assert np.allclose(distances, single_distances)
+
+
+def test_batch_with_no_centers_or_no_matches(points):
+    index = SpatialIndex(*points)
+    assert index.query_radius_batch([], 10) == []
+    [(indices, distances)] = index.query_radius_batch([(0.0, 0.0)], 10)
+    assert indices.size == 0 and distances.size == 0
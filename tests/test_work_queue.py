@@ -0,0 +1,98 @@
+import fakeredis
+import pytest
+
+from services.work_queue import DEAD, DONE, LEASED, PENDING, RedisWorkQueue, SQLiteWorkQueue, WorkTask
+
+# A negative lease is already expired when the next lease() runs
+EXPIRED = -1
+
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def queue(request, tmp_path):
+    if request.param == 'sqlite':
+        return SQLiteWorkQueue(str(tmp_path / 'work_queue.sqlite3'), max_attempts=2)
+    return RedisWorkQueue(fakeredis.FakeRedis(), max_attempts=2)
+
+
+def _task(page=1, run_id='run-1'):
+    return WorkTask(
+        task_id=WorkTask.make_id(run_id, 'craigslist.org', 'Tucson, AZ', page),
+        run_id=run_id,
+        source='craigslist.org',
+        location='Tucson, AZ',
+        page=page,
+        radius_miles=25,
+        max_listings=25
+    )
+
+
+def test_enqueue_skips_known_tasks(queue):
+    assert queue.enqueue([_task(1), _task(2)]) == 2
+    assert queue.enqueue([_task(1), _task(3)]) == 1
+    assert queue.stats('run-1')[PENDING] == 3
+
+
+def test_lease_is_exclusive_until_complete(queue):
+    queue.enqueue([_task()])
+
+    [task] = queue.lease('worker-a', 60)
+    assert task.status == LEASED and task.lease_owner == 'worker-a' and task.attempts == 1
+    assert queue.lease('worker-b', 60) == []
+    assert not queue.heartbeat(task.task_id, 'worker-b', 60)
+    assert not queue.complete(task.task_id, 'worker-b')
+
+    assert queue.heartbeat(task.task_id, 'worker-a', 60)
+    assert queue.complete(task.task_id, 'worker-a')
+    assert not queue.complete(task.task_id, 'worker-a')
+    assert queue.stats('run-1')[DONE] == 1
+
+
+def test_expired_lease_is_taken_over(queue):
+    queue.enqueue([_task()])
+    [task] = queue.lease('worker-a', EXPIRED)
+
+    [taken] = queue.lease('worker-b', 60)
+    assert taken.task_id == task.task_id
+    assert taken.lease_owner == 'worker-b' and taken.attempts == 2
+    # The first worker lost the lease and can no longer finish or extend it
+    assert not queue.complete(task.task_id, 'worker-a')
+    assert not queue.heartbeat(task.task_id, 'worker-a', 60)
+    assert queue.complete(task.task_id, 'worker-b')
+
+
+def test_failures_retry_then_go_dead(queue):
+    queue.enqueue([_task()])
+
+    [task] = queue.lease('worker-a', 60)
+    assert queue.fail(task.task_id, 'worker-a', 'timeout', retry_delay_seconds=0) == PENDING
+    [task] = queue.lease('worker-a', 60)
+    assert queue.fail(task.task_id, 'worker-a', 'timeout', retry_delay_seconds=0) == DEAD
+
+    assert queue.lease('worker-a', 60) == []
+    assert queue.stats('run-1')[DEAD] == 1
+    assert queue.fail(task.task_id, 'worker-a', 'timeout', retry_delay_seconds=0) is None
+
+
+def test_retry_waits_for_delay(queue):
+    queue.enqueue([_task()])
+    [task] = queue.lease('worker-a', 60)
+    queue.fail(task.task_id, 'worker-a', 'timeout', retry_delay_seconds=3600)
+    assert queue.lease('worker-a', 60) == []
+
+
+def test_expired_lease_on_last_attempt_goes_dead(queue):
+    queue.enqueue([_task()])
+    queue.lease('worker-a', EXPIRED)
+    queue.lease('worker-b', EXPIRED)
+
+    assert queue.lease('worker-c', 60) == []
+    assert queue.stats('run-1')[DEAD] == 1
+
+
+def test_release_does_not_count_attempt(queue):
+    queue.enqueue([_task()])
+    [task] = queue.lease('worker-a', 60)
+    assert queue.release(task.task_id, 'worker-a')
+
+    [task] = queue.lease('worker-b', 60)
+    assert task.attempts == 1
@@ -1,30 +1,151 @@
 import re
-from typing import Optional
+import secrets
+import threading
+from datetime import datetime
+from typing import Any, Callable, Generic, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+# Compiled once at import; these run for every scraped listing
+PHONE_RE = re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b')
+PHONE_DESCRIPTION_RE = re.compile(r'(?<!\d)\(?(\d{3})\)?[\s.-]?(\d{3})[\s.-]?(\d{4})(?!\d)')
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+NUMBER_RE = re.compile(r'\d[\d,]*(?:\.\d+)?')
+LOCATION_RE = re.compile(r'^\s*([^,(]+?)\s*,\s*([A-Za-z]{2})\b[\s,]*(\d{5})?')
+VEHICLE_TITLE_RE = re.compile(r'^\s*(?:(?:new|used|certified)\s+)?((?:19|20)\d{2})\s+(\S+)((?:\s+\S+){0,3})', re.IGNORECASE)
+
+DATE_FORMATS = ('%m/%d/%Y', '%m/%d/%y', '%b %d, %Y', '%B %d, %Y', '%Y/%m/%d')
+TWO_WORD_MAKES = frozenset({'alfa romeo', 'aston martin', 'land rover', 'rolls royce'})
+MODEL_PREFIXES = frozenset({'grand', 'model', 'range', 'super'})  # "Model 3", "Grand Cherokee"
 
 
 def extract_phone(text: str) -> Optional[str]:
     """Extract phone number from text"""
-    pattern = r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'
-    match = re.search(pattern, text)
+    match = PHONE_RE.search(text)
     return match.group(0) if match else None
 
 
+def extract_phone_from_description(text: str) -> Optional[str]:
+    """Extract a phone number in free-form formats, e.g. "(520) 555-0199", as 520-555-0199"""
+    match = PHONE_DESCRIPTION_RE.search(text)
+    return '-'.join(match.groups()) if match else None
+
+
 def extract_email(text: str) -> Optional[str]:
     """Extract email from text"""
-    pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    match = re.search(pattern, text)
+    match = EMAIL_RE.search(text)
     return match.group(0) if match else None
 
 
 def clean_price(price_str: str) -> Optional[float]:
     """Clean and convert price string to float"""
-    if not price_str:
+    if price_str is None or price_str == '':
+        return None
+    if isinstance(price_str, (int, float)):
+        return float(price_str)
+    
+    # First number in the string, ignoring currency symbols and thousands separators
+    match = NUMBER_RE.search(str(price_str))
+    return float(match.group(0).replace(',', '')) if match else None
+
+
+def clean_mileage(mileage_str: str) -> Optional[int]:
+    """Convert a mileage string such as "45,120 mi." to an int"""
+    if mileage_str is None or mileage_str == '':
         return None
+    if isinstance(mileage_str, (int, float)):
+        return int(mileage_str)
     
-    # Remove currency symbols and commas
-    cleaned = re.sub(r'[$,]', '', str(price_str))
+    match = NUMBER_RE.search(str(mileage_str))
+    return int(float(match.group(0).replace(',', ''))) if match else None
+
+
+def parse_date(value: Any) -> Optional[datetime]:
+    """Parse ISO-8601 and a few common listing date formats; None if unparseable"""
+    if isinstance(value, datetime):
+        return value
+    if not value:
+        return None
     
+    text = str(value).strip()
     try:
-        return float(cleaned)
-    except:
-        return None
+        return datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_location(location: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """Split "City, ST 85701" / "City, ST, 85701" / "City, State" into (city, state, zip)"""
+    if not location:
+        return None, None, None
+    
+    match = LOCATION_RE.match(location)
+    if match:
+        return match.group(1), match.group(2).upper(), match.group(3)
+    
+    parts = location.split(',')
+    city = parts[0].strip() if len(parts) > 0 else None
+    state = parts[1].strip() if len(parts) > 1 else None
+    zip_code = parts[2].strip() if len(parts) > 2 else None
+    return city, state, zip_code
+
+
+def parse_vehicle_title(title: str) -> Tuple[Optional[int], Optional[str], Optional[str]]:
+    """Split "2019 Toyota Camry SE" / "Used 2015 Land Rover Discovery" into (year, make, model)"""
+    match = VEHICLE_TITLE_RE.match(title or '')
+    if not match:
+        return None, None, None
+    
+    year, make, rest = match.groups()
+    words = rest.split()
+    if words and f"{make} {words[0]}".lower() in TWO_WORD_MAKES:
+        make = f"{make} {words.pop(0)}"
+    if not words:
+        return int(year), make, None
+    if len(words) > 1 and words[0].lower() in MODEL_PREFIXES:
+        return int(year), make, f"{words[0]} {words[1]}"
+    return int(year), make, words[0]
+
+
+def is_admin_key(value: Optional[str]) -> bool:
+    """Whether value is the configured admin API key (always False when none is configured)"""
+    from app.config import settings
+    
+    if not settings.admin_api_key or not value:
+        return False
+    return secrets.compare_digest(value.encode(), settings.admin_api_key.encode())
+
+
+class LazySingleton(Generic[T]):
+    """Build an object on first call instead of at import, exactly once across threads"""
+    
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._instance: Optional[T] = None
+        self._lock = threading.Lock()
+    
+    def __call__(self) -> T:
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+                instance = self._instance
+        return instance
+    
+    @property
+    def initialized(self) -> bool:
+        return self._instance is not None
+    
+    def override(self, instance: Optional[T]):
+        """Replace the instance (e.g. with a local stand-in); None resets to lazy creation"""
+        with self._lock:
+            self._instance = instance
@@ -1,15 +1,202 @@
+"""
+Application logging.
+
+Records are handed to a bounded in-memory queue and written to stdout and the
+log file by a background thread (QueueHandler / QueueListener), so file and
+console I/O never runs on the event loop or in pipeline workers. When the
+queue is full, records are dropped rather than blocking the caller.
+
+Messages are formatted on the writer thread: pass arguments %-style
+(`logger.info("Saved %s", intent_id)`) instead of f-strings, so records below
+the log level, or sampled out, are never formatted.
+
+LOG_FORMAT=json writes one JSON object per line, including `extra=` fields.
+
+High-volume per-listing messages carry an event name (`extra={'event': ...}`).
+LOG_SAMPLE_RATES keeps a share of an event's records (0.1 keeps every 10th),
+and LOG_EVENT_RATE_LIMIT caps each event at that many records per second.
+Warnings and errors are never sampled. The next record written after skipped
+ones reports how many were skipped.
+"""
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
 from app.config import settings
 
-# Configure logging
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes of every LogRecord; anything else on a record came from extra=
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+class TextFormatter(logging.Formatter):
+    """The classic text line, plus a note when sampled or dropped records preceded it"""
+
+    def format(self, record):
+        line = super().format(record)
+        if getattr(record, 'suppressed', 0):
+            line += f" [+{record.suppressed} similar suppressed]"
+        if getattr(record, 'dropped', 0):
+            line += f" [{record.dropped} records dropped: log queue full]"
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, extra fields and exception"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class EventSampler:
+    """Sampling and per-second rate limiting of records that carry an `event` name"""
+
+    def __init__(self, sample_rates: Dict[str, float], rate_limit: int):
+        # Keep every Nth record of an event; 0 drops the event entirely
+        self.every = {event: round(1 / rate) if rate > 0 else 0 for event, rate in sample_rates.items()}
+        self.rate_limit = rate_limit
+        self._lock = threading.Lock()
+        self._seen: Dict[str, int] = {}
+        self._windows: Dict[str, list] = {}  # event -> [second, records kept in it]
+        self._suppressed: Dict[str, int] = {}
+
+    def admit(self, event: str) -> Optional[int]:
+        """None to skip this record; otherwise how many records of the event were skipped before it"""
+        with self._lock:
+            seen = self._seen[event] = self._seen.get(event, 0) + 1
+            every = self.every.get(event, 1)
+            keep = every > 0 and (seen - 1) % every == 0
+            if keep and self.rate_limit:
+                second = int(time.monotonic())
+                window = self._windows.get(event)
+                if window is None or window[0] != second:
+                    window = self._windows[event] = [second, 0]
+                window[1] += 1
+                keep = window[1] <= self.rate_limit
+            if not keep:
+                self._suppressed[event] = self._suppressed.get(event, 0) + 1
+                return None
+            return self._suppressed.pop(event, 0)
+
+    def reset_lock(self):
+        self._lock = threading.Lock()
+
+
+class SampledLogger(logging.Logger):
+    """Logger that samples event records before creating them, so a skipped record costs one lookup"""
+
+    sampler: Optional[EventSampler] = None
+
+    def _log(self, level, msg, args, exc_info=None, extra=None, **kwargs):
+        if extra and 'event' in extra and level < logging.WARNING and self.sampler is not None:
+            suppressed = self.sampler.admit(extra['event'])
+            if suppressed is None:
+                return
+            if suppressed:
+                extra = {**extra, 'suppressed': suppressed}
+        super()._log(level, msg, args, exc_info=exc_info, extra=extra, **kwargs)
+
+    def findCaller(self, stack_info=False, stacklevel=1):
+        # Caller file/line are not in either format; skip the stack walk for our own records
+        if stack_info:
+            # Count this method and _log above as frames to step over
+            return super().findCaller(stack_info, stacklevel + 2)
+        return "(unknown file)", 0, "(unknown function)", None
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the writer thread as they are; never blocks, drops when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The default prepare() formats the message here, on the caller's thread;
+        # the listener lives in this process, so the record can be passed unformatted
+        return record
+
+    def enqueue(self, record):
+        if self.dropped:
+            record.dropped, self.dropped = self.dropped, 0
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1 + getattr(record, 'dropped', 0)
+
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room instead of failing on a full queue; the writer is draining it
+        self.queue.put(self._sentinel)
+
+
+_listener: Optional[_Listener] = None
+
+
+def _output_handlers():
+    formatter = JsonFormatter() if settings.log_format == 'json' else TextFormatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if settings.log_file:
+        handlers.append(logging.FileHandler(settings.log_file, delay=True))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def _start_writer():
+    global _listener
+    _queue_handler.queue = queue.Queue(settings.log_queue_size)
+    _listener = _Listener(_queue_handler.queue, *_output_handlers(), respect_handler_level=True)
+    _listener.start()
+
+
+def _restart_writer_in_child():
+    # A forked child has no writer thread, and the parent's queue locks may be held
+    SampledLogger.sampler.reset_lock()
+    _start_writer()
+
+
+def shutdown_logging():
+    """Write out queued records and stop the writer thread; for processes that exit without atexit"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+_queue_handler = NonBlockingQueueHandler(queue.Queue(settings.log_queue_size))
+_start_writer()
+
 logging.basicConfig(
     level=getattr(logging, settings.log_level),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('consumer_intent_detector.log')
-    ]
+    handlers=[_queue_handler]
 )
+SampledLogger.sampler = EventSampler(settings.log_sample_rates, settings.log_event_rate_limit)
+atexit.register(shutdown_logging)
+os.register_at_fork(after_in_child=_restart_writer_in_child)
 
+logging.setLoggerClass(SampledLogger)
 logger = logging.getLogger('consumer_intent_detector')
+logging.setLoggerClass(logging.Logger)
@@ -0,0 +1,164 @@
+"""
+Prometheus metrics for the ingestion pipeline and the API.
+
+Metrics are module-level and labelled only by bounded values (route template,
+status code, source, model, operation name), never by ids, URLs or locations.
+Recording a sample is a lock and an add, so instrumentation stays on in
+production; GET /metrics (and ingest-worker --metrics-port) render them.
+
+Multiple processes (uvicorn --workers, ingest-worker --processes): set
+PROMETHEUS_MULTIPROC_DIR to an empty directory shared by the processes of one
+host before starting them. Each process then writes its samples there and any
+of them can serve the aggregate.
+"""
+import os
+import time
+from typing import Optional, Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+from prometheus_client.core import GaugeMetricFamily
+from utils.helpers import LazySingleton
+from utils.logger import logger
+
+
+MULTIPROCESS = 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+
+UNMATCHED_ROUTE = '<unmatched>'
+
+# ---- API ----
+
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route template',
+    ['method', 'route', 'status']
+)
+
+# ---- Pipeline ----
+
+SCRAPE_DURATION = Histogram(
+    'scrape_duration_seconds', 'Time to fetch one page of listings from a source',
+    ['source'], buckets=(1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+)
+SCRAPED_LISTINGS = Counter('scraped_listings_total', 'Listings fetched from a source', ['source'])
+SCRAPE_ERRORS = Counter(
+    'scrape_errors_total', 'Failed page fetches and listing cards that could not be parsed',
+    ['source', 'stage']
+)
+
+NORMALIZE_DURATION = Histogram(
+    'normalize_batch_duration_seconds', 'Time to normalize one batch of raw listings', ['method']
+)
+NORMALIZED_LISTINGS = Counter(
+    'normalized_listings_total', 'Listings normalized (ok) or dropped as invalid', ['method', 'outcome']
+)
+
+LLM_REQUEST_DURATION = Histogram(
+    'llm_request_duration_seconds', 'OpenAI chat completion latency',
+    ['model', 'outcome'], buckets=(0.25, 0.5, 1, 2, 4, 8, 16, 32, 60)
+)
+LLM_TOKENS = Counter('llm_tokens_total', 'OpenAI tokens used', ['model', 'kind'])
+
+DB_OPERATION_DURATION = Histogram(
+    'firestore_operation_duration_seconds', 'Firestore call latency (cache hits excluded)', ['operation']
+)
+
+# ---- Jobs and queues ----
+
+INGESTION_JOBS = Gauge(
+    'ingestion_jobs', 'In-process ingestion jobs by status', ['status'], multiprocess_mode='livesum'
+)
+INGESTION_JOBS_FINISHED = Counter('ingestion_jobs_finished_total', 'Finished ingestion jobs', ['status'])
+WORKER_TASKS = Counter('worker_tasks_total', 'Work queue tasks handled by ingest-workers', ['outcome'])
+LIVE_FEED_SUBSCRIBERS = Gauge(
+    'live_feed_subscribers', 'Open live intent feed subscriptions', multiprocess_mode='livesum'
+)
+
+
+def observe_since(histogram: Histogram, started: float, *labels: str):
+    """Record the seconds elapsed since `started` (a time.perf_counter() value)"""
+    histogram.labels(*labels).observe(time.perf_counter() - started)
+
+
+class WorkQueueCollector:
+    """Work queue depth by task status, read from the queue at scrape time"""
+
+    def collect(self):
+        from app.config import settings
+
+        family = GaugeMetricFamily('work_queue_tasks', 'Work queue tasks by status', labels=['status'])
+        if settings.ingestion_backend == "queue":
+            from services.work_queue import get_work_queue
+
+            try:
+                for status, count in get_work_queue().stats().items():
+                    family.add_metric([status], count)
+            except Exception as e:
+                logger.warning(f"Could not read work queue stats for metrics: {e}")
+        yield family
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request, labelled by matched route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the scope; raw paths would be unbounded
+            route = scope.get('route')
+            observe_since(
+                HTTP_REQUEST_DURATION, started,
+                scope['method'], getattr(route, 'path', UNMATCHED_ROUTE), str(status)
+            )
+
+
+def _create_scrape_registry() -> CollectorRegistry:
+    if MULTIPROCESS:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    registry.register(WorkQueueCollector())
+    return registry
+
+
+get_scrape_registry = LazySingleton(_create_scrape_registry)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Current metrics in the Prometheus text format, with their content type"""
+    return generate_latest(get_scrape_registry()), CONTENT_TYPE_LATEST
+
+
+def serve_metrics(port: int, addr: str = '0.0.0.0'):
+    """Expose /metrics on a separate port (for processes without the API, e.g. ingest-worker)"""
+    from prometheus_client import start_http_server
+
+    start_http_server(port, addr, registry=get_scrape_registry())
+    logger.info(f"📈 Serving metrics on :{port}")
+
+
+def release_process(pid: Optional[int] = None):
+    """Drop an exited process's live gauges from the multiprocess directory"""
+    if MULTIPROCESS:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid or os.getpid())
@@ -0,0 +1,240 @@
+"""
+On-demand profiling of single requests and ingestion jobs.
+
+A capture records a sampling CPU profile (pyinstrument, HTML call tree) and/or
+allocation growth (tracemalloc, top allocating lines) and writes them to
+`profiling_dir` as `<profile_id>.cpu.html` / `<profile_id>.memory.txt`.
+
+Requests are captured when an admin sends `X-Profile: cpu|memory|cpu,memory`,
+or for a random `profiling_request_sample_rate` share of requests. Ingestion
+jobs are captured when started with that header or when
+`profiling_ingestion_jobs` is set. Nothing is captured unless
+`profiling_enabled` is set.
+
+The CPU profiler follows one async task, so concurrent requests do not show up
+in each other's profiles; time spent in worker threads (e.g. Firestore calls
+off the event loop) appears as await time at the call site. tracemalloc is
+process-wide, so a memory capture also counts allocations of work running
+concurrently with it.
+"""
+import os
+import random
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+from app.config import settings
+from utils.helpers import is_admin_key
+from utils.logger import logger
+
+
+KINDS = ('cpu', 'memory')
+PROFILE_HEADER = 'x-profile'
+ADMIN_KEY_HEADER = 'x-admin-key'
+
+_NAME_RE = re.compile(r'[^A-Za-z0-9_-]+')
+_FILE_RE = re.compile(r'^[A-Za-z0-9_-]+\.(cpu\.html|memory\.txt)$')
+
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+
+
+def parse_kinds(value: Optional[str]) -> List[str]:
+    """Profile kinds from an X-Profile value; "1"/"true"/empty select the configured default"""
+    if value is None:
+        return []
+    requested = [kind.strip().lower() for kind in value.split(',') if kind.strip()]
+    if not requested or requested[0] in ('1', 'true', 'yes'):
+        requested = list(settings.profiling_kinds)
+    return [kind for kind in KINDS if kind in requested]
+
+
+def requested_kinds(profile_header: Optional[str], admin_key: Optional[str]) -> List[str]:
+    """Kinds asked for by an X-Profile header; [] if absent, profiling is off or the caller is not an admin"""
+    if not settings.profiling_enabled or profile_header is None or not is_admin_key(admin_key):
+        return []
+    return parse_kinds(profile_header)
+
+
+class ProfileCapture:
+    """One CPU and/or memory capture, started and stopped on the same task"""
+
+    def __init__(self, name: str, kinds: Sequence[str], directory: Optional[str] = None):
+        self.profile_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{_NAME_RE.sub('-', name).strip('-')[:80]}-{uuid.uuid4().hex[:6]}"
+        self.kinds = [kind for kind in KINDS if kind in kinds]
+        self.directory = directory or settings.profiling_dir
+        self._profiler = None
+        self._snapshot = None
+        self._started = None
+
+    def start(self) -> "ProfileCapture":
+        global _tracemalloc_users, _tracemalloc_owned
+
+        if 'memory' in self.kinds:
+            with _tracemalloc_lock:
+                if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    _tracemalloc_owned = True
+                _tracemalloc_users += 1
+            self._snapshot = tracemalloc.take_snapshot()
+
+        if 'cpu' in self.kinds:
+            try:
+                from pyinstrument import Profiler  # optional dependency
+            except ImportError:
+                logger.warning("pyinstrument is not installed; skipping CPU profile")
+                self.kinds.remove('cpu')
+            else:
+                self._profiler = Profiler(interval=settings.profiling_interval_ms / 1000, async_mode='enabled')
+                self._profiler.start()
+
+        self._started = time.perf_counter()
+        return self
+
+    def stop(self) -> List[str]:
+        """Stop capturing and write the profile files; returns their names (never raises)"""
+        global _tracemalloc_users, _tracemalloc_owned
+
+        duration = time.perf_counter() - self._started
+        reports = {}
+
+        if self._profiler is not None:
+            self._profiler.stop()
+            reports['cpu.html'] = self._profiler.output_html()
+            self._profiler = None
+
+        if self._snapshot is not None:
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+            ))
+            current, peak = tracemalloc.get_traced_memory()
+            with _tracemalloc_lock:
+                _tracemalloc_users -= 1
+                if _tracemalloc_users == 0 and _tracemalloc_owned:
+                    tracemalloc.stop()
+                    _tracemalloc_owned = False
+            reports['memory.txt'] = _format_memory_report(
+                self.profile_id, duration, snapshot.compare_to(self._snapshot, 'lineno'), current, peak
+            )
+            self._snapshot = None
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            files = [self._write(suffix, content) for suffix, content in reports.items()]
+            _prune(self.directory, settings.profiling_max_files)
+        except OSError as e:
+            logger.warning(f"Could not write profile {self.profile_id}: {e}")
+            return []
+
+        logger.info(f"🔬 Profile {self.profile_id} written ({duration:.2f}s): {', '.join(files)}")
+        return files
+
+    def _write(self, suffix: str, content: str) -> str:
+        name = f"{self.profile_id}.{suffix}"
+        with open(os.path.join(self.directory, name), 'w', encoding='utf-8') as f:
+            f.write(content)
+        return name
+
+
+def create_capture(name: str, kinds: Sequence[str]) -> Optional[ProfileCapture]:
+    """An unstarted capture, or None when profiling is disabled or nothing was requested"""
+    if not settings.profiling_enabled or not kinds:
+        return None
+    return ProfileCapture(name, kinds)
+
+
+def list_profiles(directory: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Profile files, newest first"""
+    directory = directory or settings.profiling_dir
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and _FILE_RE.match(entry.name):
+            stat = entry.stat()
+            profile_id, kind = entry.name.split('.')[:2]
+            profiles.append({
+                "name": entry.name,
+                "profile_id": profile_id,
+                "kind": kind,
+                "size_bytes": stat.st_size,
+                "created_at": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            })
+    profiles.sort(key=lambda profile: profile["created_at"], reverse=True)
+    return profiles
+
+
+def profile_path(name: str, directory: Optional[str] = None) -> Optional[str]:
+    """Path of a profile file by name; None for unknown or malformed names"""
+    if not _FILE_RE.match(name):
+        return None
+    path = os.path.join(directory or settings.profiling_dir, name)
+    return path if os.path.isfile(path) else None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware capturing profiles of requests that ask for one (or are sampled)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode('latin-1'): value.decode('latin-1') for key, value in scope['headers']}
+        kinds = requested_kinds(headers.get(PROFILE_HEADER), headers.get(ADMIN_KEY_HEADER))
+        if not kinds and settings.profiling_request_sample_rate and random.random() < settings.profiling_request_sample_rate:
+            kinds = list(settings.profiling_kinds)
+        if not kinds:
+            await self.app(scope, receive, send)
+            return
+
+        capture = ProfileCapture(f"{scope['method']}-{scope['path']}", kinds)
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                message['headers'] = list(message.get('headers', [])) + [(b'x-profile-id', capture.profile_id.encode())]
+            await send(message)
+
+        capture.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            capture.stop()
+
+
+def _format_memory_report(profile_id: str, duration: float, stats, current: int, peak: int) -> str:
+    limit = settings.profiling_memory_top_lines
+    growth = sum(stat.size_diff for stat in stats)
+    lines = [
+        f"Allocation profile {profile_id}",
+        f"Duration: {duration:.3f}s",
+        f"Net growth: {growth / 1024:.1f} KiB in {sum(stat.count_diff for stat in stats)} blocks",
+        f"Traced memory: {current / 1024:.1f} KiB now, {peak / 1024:.1f} KiB peak",
+        "",
+        f"Top {limit} lines by allocated size:",
+    ]
+    for stat in stats[:limit]:
+        lines.append(f"{stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8d} blocks  {stat.traceback[0]}")
+    return '\n'.join(lines) + '\n'
+
+
+def _prune(directory: str, max_files: int):
+    """Delete the oldest profile files past max_files"""
+    files = [entry for entry in os.scandir(directory) if entry.is_file() and _FILE_RE.match(entry.name)]
+    if len(files) <= max_files:
+        return
+    files.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in files[:len(files) - max_files]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
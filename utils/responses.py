@@ -0,0 +1,42 @@
+"""
+JSON responses for already-serializable payloads.
+
+Stored intent documents are plain JSON data, so routes that return them skip
+FastAPI's response_model validation and jsonable_encoder pass and render the
+payload in one step, with orjson when it is installed.
+"""
+import json
+from datetime import date, datetime
+from typing import Any
+from starlette.responses import Response
+
+try:
+    import orjson  # several times faster than json for large result sets
+except ImportError:
+    orjson = None
+
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, 'model_dump'):
+        return value.model_dump(mode='json')
+    if hasattr(value, 'value'):
+        return value.value
+    return str(value)
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON; datetimes as ISO strings, pydantic models as dicts"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONResponse(Response):
+    """JSONResponse without revalidation; return it directly from the route"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)